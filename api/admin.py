@@ -1,7 +1,33 @@
 """
 Admin configuration for the API application.
-Defines how API-related models (if any) are displayed in the Django admin interface.
+Lets staff list API tokens and revoke them; keys are never shown again after they are issued.
 """
 from django.contrib import admin
 
-# Register your models here.
+from api.models import APIToken
+
+
+@admin.register(APIToken)
+class APITokenAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the APIToken model.
+    """
+    list_display = ("prefix", "user", "name", "created_at", "revoked_at")
+    list_filter = ("revoked_at",)
+    search_fields = ("prefix", "user__username", "name")
+    readonly_fields = ("user", "prefix", "key_hash", "created_at", "revoked_at")
+    actions = ["revoke_selected"]
+
+    def revoke_selected(self, request, queryset):
+        """
+        Action to revoke a selection of tokens.
+        """
+        self.message_user(request, f"{queryset.revoke()} token(s) revoked.")
+
+    revoke_selected.short_description = "Revoke selected tokens"
+
+    def has_add_permission(self, request):
+        """
+        Tokens are issued with the issue_api_token command, which shows the key once.
+        """
+        return False
@@ -0,0 +1,155 @@
+"""
+Token authentication for the API.
+Resolves ``Authorization: Token <key>`` headers through a per-process LRU cache, so
+authenticated requests read neither the session nor the user table once a token is warm.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from .models import APIToken, hash_key
+
+
+class TokenCache:
+    """
+    Bounded mapping of token digests to user ids with a time-to-live per entry.
+
+    The least recently used entry is dropped once ``maxsize`` is reached. The cache
+    lives in each worker process, so a token revoked elsewhere keeps working in other
+    processes for at most ``ttl`` seconds; ``discard`` drops it from this one at once.
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        """
+        :param ttl: Seconds an entry is trusted before the database is asked again.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key_hash):
+        """
+        Return the user id cached for a token digest, or None if missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key_hash)
+            if entry is None:
+                return None
+            user_id, expires = entry
+            if expires <= self.clock():
+                del self.entries[key_hash]
+                return None
+            self.entries.move_to_end(key_hash)
+            return user_id
+
+    def set(self, key_hash, user_id):
+        """
+        Cache the user id of a token digest, evicting the least recently used entries.
+        """
+        with self.lock:
+            self.entries[key_hash] = (user_id, self.clock() + self.ttl)
+            self.entries.move_to_end(key_hash)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key_hashes):
+        """
+        Drop the given token digests.
+        """
+        with self.lock:
+            for key_hash in key_hashes:
+                self.entries.pop(key_hash, None)
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(settings.API_TOKEN_CACHE_SIZE, settings.API_TOKEN_CACHE_TTL)
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    The user a token belongs to, loaded from the database only when more than its id is needed.
+
+    ``pk``, ``id`` and the authentication flags are answered from the token, which is
+    all that permission checks and the feed views look at.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        """
+        :param user_id: Primary key of the token's user.
+        """
+        super().__init__(lambda: get_user_model().objects.get(pk=user_id))
+        self.__dict__["_user_id"] = user_id
+
+    @property
+    def pk(self):
+        """
+        Return the user's primary key without loading the user.
+        """
+        return self.__dict__["_user_id"]
+
+    id = pk
+
+    def __bool__(self):
+        """
+        Return True, like any user instance, without loading the user.
+        """
+        return True
+
+
+class TokenAuthentication(BaseAuthentication):
+    """
+    Authenticates ``Authorization: Token <key>`` requests with keys issued as APIToken.
+
+    On a cache miss the token is checked with one query; revoked tokens and inactive
+    users fail authentication.
+    """
+    keyword = "Token"
+
+    def authenticate(self, request):
+        """
+        Return the (user, token digest) pair of the request's token, or None without a token header.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+        try:
+            key_hash = hash_key(auth[1].decode())
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+
+        user_id = token_cache.get(key_hash)
+        if user_id is None:
+            user_id = (
+                APIToken.objects.active()
+                .filter(key_hash=key_hash, user__is_active=True)
+                .values_list("user_id", flat=True)
+                .first()
+            )
+            if user_id is None:
+                raise exceptions.AuthenticationFailed("Invalid or revoked token.")
+            token_cache.set(key_hash, user_id)
+        return TokenUser(user_id), key_hash
+
+    def authenticate_header(self, request):
+        """
+        Return the WWW-Authenticate challenge of unauthenticated token requests.
+        """
+        return self.keyword
@@ -0,0 +1,33 @@
+"""
+Management command issuing an API token to a reader.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import APIToken
+
+
+class Command(BaseCommand):
+    """
+    Create an APIToken for a reader and print its key, which cannot be shown again.
+    """
+    help = "Issue an API token to a reader. The key is printed once; store it right away."
+
+    def add_arguments(self, parser):
+        """
+        Register the username argument and the token name option.
+        """
+        parser.add_argument("username")
+        parser.add_argument("--name", default="", help="Label telling the reader's tokens apart.")
+
+    def handle(self, *args, **options):
+        """
+        Issue the token and print its key.
+        """
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No user named {options['username']!r}.")
+        if not user.is_reader:
+            raise CommandError(f"{user.username} is not registered as a reader.")
+        token, key = APIToken.issue(user, options["name"])
+        self.stdout.write(f"prefix={token.prefix} key={key}")
@@ -0,0 +1,32 @@
+"""
+Management command revoking API tokens.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import APIToken
+
+
+class Command(BaseCommand):
+    """
+    Revoke a token by its prefix, or every token of a user.
+    """
+    help = "Revoke API tokens by prefix, or all tokens of --user. Running servers stop accepting them within API_TOKEN_CACHE_TTL seconds."
+
+    def add_arguments(self, parser):
+        """
+        Register the prefix argument and the user option.
+        """
+        parser.add_argument("prefix", nargs="?", help="First characters of the key, as printed when issued.")
+        parser.add_argument("--user", help="Revoke every token of this username instead.")
+
+    def handle(self, *args, **options):
+        """
+        Revoke the matching tokens and print how many were live.
+        """
+        if options["user"]:
+            tokens = APIToken.objects.filter(user__username=options["user"])
+        elif options["prefix"]:
+            tokens = APIToken.objects.filter(prefix=options["prefix"])
+        else:
+            raise CommandError("Give a token prefix or --user.")
+        self.stdout.write(f"revoked={tokens.revoke()}")
@@ -2,6 +2,90 @@
 Models for the API application.
 Stored data specifically required for the API layer that is not part of the core articles or users.
 """
+import hashlib
+import secrets
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+def hash_key(key):
+    """
+    Return the stored digest of a token key.
+
+    Keys are long random strings, so a fast hash is enough: there is nothing to brute-force.
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class APITokenQuerySet(models.QuerySet):
+    """
+    QuerySet with shortcuts for live tokens.
+    """
+
+    def active(self):
+        """
+        Return the tokens that were not revoked.
+        """
+        return self.filter(revoked_at__isnull=True)
+
+    def revoke(self):
+        """
+        Revoke every token of the queryset and return how many were live.
+
+        They are also dropped from this process's token cache; other processes
+        stop accepting them within API_TOKEN_CACHE_TTL seconds.
+        """
+        from .authentication import token_cache
+
+        key_hashes = list(self.active().values_list("key_hash", flat=True))
+        revoked = self.model.objects.filter(key_hash__in=key_hashes).update(revoked_at=timezone.now())
+        token_cache.discard(key_hashes)
+        return revoked
+
+
+class APIToken(models.Model):
+    """
+    A key a client sends in the ``Authorization: Token <key>`` header to use the API as a reader.
+
+    Only a digest of the key is stored; the key itself is shown once, when issued.
+    ``prefix`` (the first characters of the key) identifies a token without revealing it.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="api_tokens")
+    name = models.CharField(max_length=100, blank=True)
+    prefix = models.CharField(max_length=8, db_index=True)
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    objects = APITokenQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        """
+        Return the string representation of the token.
+        """
+        return f"{self.prefix}… ({self.user})"
+
+    @classmethod
+    def issue(cls, user, name=""):
+        """
+        Create a token for a user and return it with its key, which is not stored anywhere.
+
+        Keys never start with "-", so their prefix can be passed to revoke_api_token as is.
+        """
+        key = secrets.token_urlsafe(32)
+        while key.startswith("-"):
+            key = secrets.token_urlsafe(32)
+        token = cls.objects.create(user=user, name=name, prefix=key[:8], key_hash=hash_key(key))
+        return token, key
 
-# Create your models here.
+    @property
+    def is_active(self):
+        """
+        Return whether the token can still be used.
+        """
+        return self.revoked_at is None
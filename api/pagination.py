@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination for the API application.
+Encodes the position of the last returned article as an opaque token so large feeds can be walked page by page.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_page_size(request):
+    """
+    Return the requested page size, clamped to the range 1..MAX_PAGE_SIZE.
+    """
+    try:
+        page_size = int(request.query_params.get("page_size", DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(published_at, pk):
+    """
+    Build an opaque cursor token from the (published_at, id) key of a row.
+    """
+    position = [published_at.isoformat() if published_at else None, pk]
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token back into a (published_at, id) tuple.
+
+    Returns None when no token was supplied and raises NotFound for tokens that cannot be parsed.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        published_at, pk = json.loads(raw)
+        if published_at is not None:
+            published_at = parse_datetime(published_at)
+            if published_at is None:
+                raise ValueError("invalid timestamp")
+        return published_at, int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise NotFound("Invalid cursor")
+
+
+def order_by_key(queryset, pk_field="id"):
+    """
+    Order a queryset newest first on the (published_at, id) key, with unpublished rows last.
+
+    :param pk_field: The field holding the article id, for querysets over other tables.
+    """
+    return queryset.order_by(F("published_at").desc(nulls_last=True), f"-{pk_field}")
+
+
+def filter_after(queryset, cursor, pk_field="id"):
+    """
+    Restrict a key-ordered queryset to the rows that come after the given cursor position.
+    """
+    if cursor is None:
+        return queryset
+    published_at, pk = cursor
+    if published_at is None:
+        return queryset.filter(published_at__isnull=True, **{f"{pk_field}__lt": pk})
+    return queryset.filter(
+        Q(published_at__lt=published_at)
+        | Q(published_at=published_at, **{f"{pk_field}__lt": pk})
+        | Q(published_at__isnull=True)
+    )
+
+
+def next_link(request, cursor_token):
+    """
+    Return the absolute URL of the next page for the given cursor token.
+    """
+    params = request.query_params.copy()
+    params["cursor"] = cursor_token
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
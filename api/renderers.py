@@ -2,9 +2,49 @@
 Custom renderers for the API application.
 Provides support for various output formats, such as XML, to meet diverse client requirements.
 """
-from rest_framework.renderers import BaseRenderer
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 import xml.etree.ElementTree as ET
 
+# Marker for an exhausted iterator
+_EMPTY = object()
+
+
+def _escape_text(text):
+    """
+    Escape element text the same way ElementTree does.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that can also write a list one element at a time.
+    The streamed output is identical to rendering the whole list at once.
+    """
+
+    def render_stream(self, items, accepted_media_type=None, renderer_context=None):
+        """
+        Yield the JSON encoding of an iterable of items as a sequence of byte chunks.
+        """
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # Indented output is only used interactively, so render it in one go.
+            yield self.render(list(items), accepted_media_type, renderer_context)
+            return
+
+        yield b"["
+        for index, item in enumerate(items):
+            if index:
+                yield b","
+            yield self.render(item, accepted_media_type, renderer_context)
+        yield b"]"
+
+
 class MiniXMLRenderer(BaseRenderer):
     """
     A minimal XML renderer for DRF.
@@ -26,6 +66,38 @@ class MiniXMLRenderer(BaseRenderer):
         
         return ET.tostring(root, encoding='utf-8')
 
+    def render_stream(self, items, accepted_media_type=None, renderer_context=None):
+        """
+        Yield the XML for an iterable of items one ``<article>`` at a time.
+        The concatenated chunks are byte-for-byte identical to ``render(list(items))``.
+        """
+        items = iter(items)
+        first = next(items, _EMPTY)
+        if first is _EMPTY:
+            yield b"<root />"
+            return
+
+        yield b"<root>"
+        yield self._article_to_bytes(first)
+        for item in items:
+            yield self._article_to_bytes(item)
+        yield b"</root>"
+
+    def _article_to_bytes(self, data):
+        """
+        Serialize a single dictionary as an ``<article>`` element.
+        """
+        parts = ["<article>"]
+        for key, value in data.items():
+            text = str(value) if value is not None else ""
+            if text:
+                parts.append(f"<{key}>{_escape_text(text)}</{key}>")
+            else:
+                # ElementTree writes childless elements without text in short form
+                parts.append(f"<{key} />")
+        parts.append("</article>")
+        return "".join(parts).encode("utf-8", "xmlcharrefreplace")
+
     def _dict_to_xml(self, parent, data):
         """
         Recursively convert a dictionary to XML elements.
@@ -2,6 +2,8 @@
 Serializers for the API application.
 Handles the conversion of complex model instances into native Python datatypes for JSON and XML responses.
 """
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
 from rest_framework import serializers
 from articles.models import Article
 
@@ -23,3 +25,76 @@ class ArticleSerializer(serializers.ModelSerializer):
             "publisher",
             "published_at",
         ]
+
+
+class ArticleFieldsetSerializer(ArticleSerializer):
+    """
+    ArticleSerializer restricted to a requested subset of its fields.
+
+    Also offers the stored ``excerpt``, which is not part of the default representation.
+    """
+
+    class Meta(ArticleSerializer.Meta):
+        fields = ArticleSerializer.Meta.fields + ["excerpt"]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """
+        Drop every field not listed in ``fields``; None keeps the default representation.
+        """
+        super().__init__(*args, **kwargs)
+        keep = fields if fields is not None else ArticleSerializer.Meta.fields
+        for name in set(self.fields) - set(keep):
+            self.fields.pop(name)
+
+
+def parse_fieldset(value):
+    """
+    Parse a comma-separated ``fields`` query parameter.
+
+    Returns the requested field names in serializer order, or None when the parameter is absent.
+    Raises ValidationError (HTTP 400) for unknown field names.
+    """
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    allowed = ArticleFieldsetSerializer.Meta.fields
+    unknown = sorted(requested - set(allowed))
+    if unknown:
+        raise serializers.ValidationError(
+            {"fields": [f"Unknown field(s): {', '.join(unknown)}"]}
+        )
+    return [name for name in allowed if name in requested]
+
+
+# SQL expressions for fields that are not plain columns on Article.
+# The author expression mirrors User.__str__ and the publisher one Publisher.__str__.
+ARTICLE_ROW_EXPRESSIONS = {
+    "author": Concat(
+        "author__username", Value(" ("), "author__role", Value(")"),
+        output_field=CharField(),
+    ),
+    "publisher": F("publisher__name"),
+}
+
+
+def serialize_article_rows(queryset, fields=None):
+    """
+    Yield ArticleSerializer representations of a queryset without building model instances.
+
+    Rows are read as ``values_list()`` tuples with the author and publisher display
+    strings computed in SQL, then passed through the serializer's own fields so the
+    output is identical to ``ArticleSerializer(queryset, many=True).data``.
+    Only the columns of the requested ``fields`` (see parse_fieldset) are selected.
+    """
+    fields = ArticleFieldsetSerializer(fields=fields).fields
+    names = list(fields)
+    converters = [fields[name].to_representation for name in names]
+    rows = queryset.values_list(
+        *[ARTICLE_ROW_EXPRESSIONS.get(name, F(name)) for name in names]
+    )
+
+    for row in rows.iterator(chunk_size=500):
+        yield {
+            name: None if value is None else convert(value)
+            for name, convert, value in zip(names, converters, row)
+        }
@@ -2,17 +2,38 @@
 Tests for the API application.
 Validates the functionality of API endpoints, security permissions, and response formats.
 """
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from articles.models import Article
+from api.authentication import TokenCache, token_cache
+from api.models import APIToken
+from api.renderers import MiniXMLRenderer
+from api.serializers import ArticleSerializer, serialize_article_rows
+from news_project.testing import QueryBudgetMixin
 from publishers.models import Publisher
 from subscriptions.models import Subscription
 
 User = get_user_model()
 
 
+def streamed_json(response):
+    """
+    Decode the JSON body of a streamed API response.
+    """
+    return json.loads(b"".join(response.streaming_content))
+
+
 class SubscribedArticlesAPITest(TestCase):
     """
     Test suite for the SubscribedArticlesView API endpoint.
@@ -55,7 +76,7 @@ class SubscribedArticlesAPITest(TestCase):
         """
         response = self.client.get("/api/articles/")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(streamed_json(response)), 1)
 
     def test_reader_does_not_see_unsubscribed_articles(self):
         """
@@ -72,7 +93,7 @@ class SubscribedArticlesAPITest(TestCase):
         )
 
         response = self.client.get("/api/articles/")
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(streamed_json(response)), 1)
 
     def test_unapproved_articles_not_returned(self):
         """
@@ -87,7 +108,7 @@ class SubscribedArticlesAPITest(TestCase):
         )
 
         response = self.client.get("/api/articles/")
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(streamed_json(response)), 1)
 
     def test_unauthenticated_user_blocked(self):
         """
@@ -113,14 +134,14 @@ class SubscribedArticlesAPITest(TestCase):
         
         # Initially should not see it (already has 1 from setUp publisher sub)
         response = self.client.get("/api/articles/")
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(streamed_json(response)), 1)
 
         # Subscribe to journalist
         Subscription.objects.create(reader=self.reader, journalist=other_journalist)
         
         # Now should see both
         response = self.client.get("/api/articles/")
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(streamed_json(response)), 2)
 
     def test_api_returns_xml(self):
         """
@@ -131,10 +152,377 @@ class SubscribedArticlesAPITest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response['Content-Type'].startswith('application/xml'))
         # Check if it starts with xml or has root tag
-        self.assertIn(b'<root>', response.content)
-        self.assertIn(b'<article>', response.content)
+        content = b"".join(response.streaming_content)
+        self.assertIn(b'<root>', content)
+        self.assertIn(b'<article>', content)
+
+
+class SubscribedArticlesPaginationTest(TestCase):
+    """
+    Test suite for the keyset pagination of the SubscribedArticlesView API endpoint.
+    """
+    def setUp(self):
+        """
+        Create a reader subscribed to a publisher with several approved articles.
+        """
+        self.client = APIClient()
+        self.reader = User.objects.create_user(username="reader", password="testpass", role="reader")
+        journalist = User.objects.create_user(username="journalist", password="testpass", role="journalist")
+        publisher = Publisher.objects.create(name="Test Publisher")
+        Subscription.objects.create(reader=self.reader, publisher=publisher)
+
+        now = timezone.now()
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {i}",
+                body="Content",
+                author=journalist,
+                publisher=publisher,
+                approved=True,
+                published_at=now - timedelta(minutes=i // 2),
+            )
+            for i in range(5)
+        ]
+        self.client.login(username="reader", password="testpass")
+
+    def test_articles_are_streamed_newest_first(self):
+        """
+        Test that the response is streamed and ordered by (published_at, id) descending.
+        """
+        response = self.client.get("/api/articles/")
+        self.assertTrue(response.streaming)
+        ids = [item["id"] for item in streamed_json(response)]
+        expected = sorted(self.articles, key=lambda a: (a.published_at, a.id), reverse=True)
+        self.assertEqual(ids, [a.id for a in expected])
+        self.assertNotIn("Link", response)
+
+    def test_cursor_walks_every_page_once(self):
+        """
+        Test that following the next links returns every article exactly once.
+        """
+        url = "/api/articles/?page_size=2"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            page = streamed_json(response)
+            self.assertLessEqual(len(page), 2)
+            seen.extend(item["id"] for item in page)
+            link = response.get("Link")
+            url = link[1:link.index(">")] if link else None
+        self.assertEqual(sorted(seen), sorted(a.id for a in self.articles))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_page_size_is_capped(self):
+        """
+        Test that an oversized page_size is clamped to the maximum.
+        """
+        from api.pagination import MAX_PAGE_SIZE
+        response = self.client.get(f"/api/articles/?page_size={MAX_PAGE_SIZE * 10}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(streamed_json(response)), 5)
+
+    def test_invalid_cursor_rejected(self):
+        """
+        Test that a malformed cursor token returns 404.
+        """
+        response = self.client.get("/api/articles/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_sparse_fieldset(self):
+        """
+        Test that ?fields= limits each article to the requested fields, including the excerpt.
+        """
+        response = self.client.get("/api/articles/?fields=title,excerpt,id")
+        page = streamed_json(response)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(list(page[0]), ["id", "title", "excerpt"])
+        self.assertEqual(page[0]["excerpt"], "Content")
+
+    def test_unknown_field_rejected(self):
+        """
+        Test that requesting an unknown field returns 400.
+        """
+        response = self.client.get("/api/articles/?fields=id,password")
+        self.assertEqual(response.status_code, 400)
+
+
+class SubscribedArticlesConditionalGetTest(TestCase):
+    """
+    Test suite for ETag / Last-Modified handling on the SubscribedArticlesView API endpoint.
+    """
+    def setUp(self):
+        """
+        Create a reader subscribed to a publisher with one approved article.
+        """
+        self.client = APIClient()
+        self.reader = User.objects.create_user(username="reader", password="testpass", role="reader")
+        self.journalist = User.objects.create_user(username="journalist", password="testpass", role="journalist")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        Subscription.objects.create(
+            reader=self.reader, publisher=self.publisher,
+            created_at=timezone.now() - timedelta(hours=1),
+        )
+        Article.objects.create(
+            title="Approved", body="...", author=self.journalist, publisher=self.publisher,
+            approved=True, published_at=timezone.now() - timedelta(hours=1),
+        )
+        self.client.force_login(self.reader)
+
+    def test_unchanged_feed_returns_304(self):
+        """
+        Test that repeating a request with the returned ETag or Last-Modified yields 304.
+        """
+        response = self.client.get("/api/articles/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get("/api/articles/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/api/articles/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_article_changes_validators(self):
+        """
+        Test that publishing a new article invalidates the previous ETag.
+        """
+        etag = self.client.get("/api/articles/")["ETag"]
+        Article.objects.create(
+            title="Newer", body="...", author=self.journalist, publisher=self.publisher,
+            approved=True, published_at=timezone.now(),
+        )
+        response = self.client.get("/api/articles/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
 
+    def test_subscription_change_changes_validators(self):
+        """
+        Test that subscribing to another source invalidates both validators, even for older articles.
+        """
+        first = self.client.get("/api/articles/")
+        other = User.objects.create_user(username="other", password="testpass", role="journalist")
+        Article.objects.create(
+            title="Old", body="...", author=other, approved=True,
+            published_at=timezone.now() - timedelta(days=30),
+        )
+        Subscription.objects.create(reader=self.reader, journalist=other)
 
+        response = self.client.get("/api/articles/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/api/articles/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_formats_have_distinct_etags(self):
+        """
+        Test that the JSON and XML representations carry different ETags.
+        """
+        json_etag = self.client.get("/api/articles/")["ETag"]
+        xml_etag = self.client.get("/api/articles/", HTTP_ACCEPT="application/xml")["ETag"]
+        self.assertNotEqual(json_etag, xml_etag)
 
 
+class ArticleRowSerializationTest(TestCase):
+    """
+    Test suite for the values()-based article serialization path.
+    """
+    def test_matches_model_serializer(self):
+        """
+        Test that the fast path produces exactly the ArticleSerializer output.
+        """
+        journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        publisher = Publisher.objects.create(name="Test Publisher")
+        Article.objects.create(
+            title="With publisher", body="Body & <markup>", author=journalist,
+            publisher=publisher, approved=True, published_at=timezone.now(),
+        )
+        Article.objects.create(title="Independent", body="Body", author=journalist, is_independent=True)
 
+        queryset = Article.objects.order_by("id")
+        expected = ArticleSerializer(queryset, many=True).data
+        actual = list(serialize_article_rows(queryset))
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+
+class MiniXMLRendererTest(TestCase):
+    """
+    Test suite for the streaming mode of the MiniXMLRenderer.
+    """
+    def assertStreamMatchesTree(self, data):
+        """
+        Assert that streaming the items produces exactly the bytes of the tree-based render.
+        """
+        renderer = MiniXMLRenderer()
+        self.assertEqual(b"".join(renderer.render_stream(iter(data))), renderer.render(data))
+
+    def test_empty_list(self):
+        """
+        Test that an empty feed renders as an empty root element.
+        """
+        self.assertStreamMatchesTree([])
+
+    def test_escaping_and_empty_values(self):
+        """
+        Test that markup characters, non-ASCII text, None and empty strings match the tree output.
+        """
+        self.assertStreamMatchesTree([
+            {"id": 1, "title": "Fish & <Chips>", "body": "Caf\u00e9 \u2014 \"quoted\" 'text'", "publisher": None},
+            {"id": 2, "title": "", "body": "a]]>b", "publisher": "Test Publisher"},
+        ])
+
+
+class SubscribedArticlesQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Test suite asserting that the subscribed articles endpoint runs a fixed number of queries.
+    """
+    def setUp(self):
+        """
+        Set up a reader subscribed to a publisher and an article by a journalist.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        Subscription.objects.create(reader=self.reader, publisher=self.publisher)
+        self.created = 0
+        self.add_articles()
+        self.client = APIClient()
+        self.client.force_login(self.reader)
+
+    def add_articles(self, count=1):
+        """
+        Add approved articles, each by a different journalist.
+        """
+        for _ in range(count):
+            self.created += 1
+            journalist = User.objects.create_user(
+                username=f"journalist{self.created}", password="pw", role="journalist"
+            )
+            Article.objects.create(
+                title="Article", body="...", author=journalist, publisher=self.publisher, approved=True
+            )
+
+    def test_json_budget(self):
+        """
+        Test the query budget of the streamed JSON response.
+        """
+        self.assertQueryBudget("/api/articles/", 7, lambda: self.add_articles(5))
+
+    def test_xml_budget(self):
+        """
+        Test the query budget of the XML response.
+        """
+        self.assertQueryBudget("/api/articles/?format=xml", 7, lambda: self.add_articles(5))
+
+
+class TokenCacheTest(SimpleTestCase):
+    """
+    Test suite for the bounded LRU cache of token digests.
+    """
+    def setUp(self):
+        """
+        Set up a cache of two entries driven by a fake clock.
+        """
+        self.now = 0
+        self.cache = TokenCache(maxsize=2, ttl=60, clock=lambda: self.now)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Test that reading an entry keeps it when the cache overflows.
+        """
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual((self.cache.get("a"), self.cache.get("b"), self.cache.get("c")), (1, None, 3))
+
+    def test_entries_expire(self):
+        """
+        Test that an entry is dropped once its time-to-live passed.
+        """
+        self.cache.set("a", 1)
+        self.now = 59
+        self.assertEqual(self.cache.get("a"), 1)
+        self.now = 60
+        self.assertIsNone(self.cache.get("a"))
+
+
+class APITokenAuthenticationTest(TestCase):
+    """
+    Test suite for issuing, using and revoking API tokens.
+    """
+    def setUp(self):
+        """
+        Set up a reader subscribed to a publisher with one article, and issue them a token.
+        """
+        token_cache.clear()
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader", is_reader=True)
+        journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        publisher = Publisher.objects.create(name="Test Publisher")
+        Subscription.objects.create(reader=self.reader, publisher=publisher)
+        Article.objects.create(title="Article", body="...", author=journalist, publisher=publisher, approved=True)
+
+        out = StringIO()
+        call_command("issue_api_token", "reader", "--name", "rss", stdout=out)
+        self.prefix, self.key = (part.split("=", 1)[1] for part in out.getvalue().split())
+        self.client = APIClient()
+
+    def get(self, key=None):
+        """
+        Request the feed with a token.
+        """
+        return self.client.get("/api/articles/", HTTP_AUTHORIZATION=f"Token {key or self.key}")
+
+    def test_only_the_key_digest_is_stored(self):
+        """
+        Test that the issued key is not stored, only its digest.
+        """
+        token = APIToken.objects.get()
+        self.assertEqual((token.prefix, token.name, token.user), (self.key[:8], "rss", self.reader))
+        self.assertNotIn(self.key, token.key_hash)
+
+    def test_warm_token_reads_neither_sessions_nor_users(self):
+        """
+        Test that once a token is cached, requests do not touch the session, user or token tables.
+        """
+        self.assertEqual(len(streamed_json(self.get())), 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get()
+            self.assertEqual(len(streamed_json(response)), 1)
+        sql = "\n".join(query["sql"] for query in queries)
+        for table in ("django_session", "users_user", "api_apitoken"):
+            self.assertNotIn(f'"{table}"', sql)
+
+    def test_revoked_and_unknown_tokens_are_rejected(self):
+        """
+        Test that revoking a token takes effect at once in this process, and bad keys are rejected.
+
+        Session authentication comes first, so failures are 403s as for anonymous requests.
+        """
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.get("not-a-key").status_code, 403)
+
+        out = StringIO()
+        call_command("revoke_api_token", self.prefix, stdout=out)
+        self.assertEqual(out.getvalue().strip(), "revoked=1")
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_inactive_users_are_rejected(self):
+        """
+        Test that a deactivated reader's tokens stop working on the next lookup.
+        """
+        User.objects.filter(pk=self.reader.pk).update(is_active=False)
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_prefixes_can_be_passed_to_the_revoke_command(self):
+        """
+        Test that keys starting with a dash, which would read as an option, are not issued.
+        """
+        keys = ["-" + "a" * 42, "b" * 43]
+        with mock.patch("api.models.secrets.token_urlsafe", side_effect=keys):
+            token, key = APIToken.issue(self.reader)
+        self.assertEqual((token.prefix, key), ("b" * 8, keys[1]))
+
+    def test_tokens_are_issued_to_readers_only(self):
+        """
+        Test that issuing a token to a user who is not a reader fails.
+        """
+        with self.assertRaises(CommandError):
+            call_command("issue_api_token", "journalist", stdout=StringIO())
@@ -2,49 +2,153 @@
 Views for the API application.
 Implements the business logic for responding to API requests and filtering data based on permissions.
 """
+import hashlib
+
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from articles.models import Article
-from subscriptions.models import Subscription
-from .serializers import ArticleSerializer
-from .renderers import MiniXMLRenderer
+from subscriptions import feed_cache
+from subscriptions.models import Subscription, TimelineEntry
+from .pagination import (
+    decode_cursor,
+    encode_cursor,
+    filter_after,
+    get_page_size,
+    next_link,
+    order_by_key,
+)
+from .serializers import parse_fieldset, serialize_article_rows
+from .renderers import MiniXMLRenderer, StreamingJSONRenderer
+
+
+def feed_validators(request):
+    """
+    Compute the (etag, last_modified) pair for a reader's feed without serializing it.
+
+    Both are derived from the reader's subscription set and the newest published_at
+    on their timeline, and are cached on the request for the two condition() callbacks.
+    """
+    if not hasattr(request, "_feed_validators"):
+        subscriptions = list(
+            Subscription.objects.filter(reader_id=request.user.pk)
+            .order_by("id")
+            .values_list("id", "created_at")
+        )
+        newest = TimelineEntry.objects.filter(reader_id=request.user.pk).aggregate(
+            newest=Max("published_at")
+        )["newest"]
+
+        # The same feed renders differently per page, page size and format
+        digest = hashlib.sha1()
+        for value in (
+            [pk for pk, _ in subscriptions],
+            newest.isoformat() if newest else "",
+            request.get_full_path(),
+            request.accepted_media_type,
+        ):
+            digest.update(repr(value).encode("utf-8"))
+
+        timestamps = [created_at for _, created_at in subscriptions]
+        if newest:
+            timestamps.append(newest)
+        request._feed_validators = (
+            f'"{digest.hexdigest()}"',
+            max(timestamps) if timestamps else None,
+        )
+    return request._feed_validators
+
+
+def feed_etag(request, *args, **kwargs):
+    """
+    Return the ETag of the reader's feed.
+    """
+    return feed_validators(request)[0]
+
+
+def feed_last_modified(request, *args, **kwargs):
+    """
+    Return the Last-Modified time of the reader's feed.
+
+    Subscriptions cancelled since the client's copy are only reflected in the ETag.
+    """
+    return feed_validators(request)[1]
 
 
 class SubscribedArticlesView(APIView):
     """
     Provides a read-only API endpoint for retrieving published articles.
+
+    Results are ordered newest first and paginated on (published_at, id).
+    The URL of the next page, if any, is returned in the ``Link`` response header.
+    Conditional requests (If-None-Match / If-Modified-Since) are answered with 304
+    when the reader's feed has not changed.
+    ``?fields=id,title,excerpt`` limits each article to the listed fields.
     """
     permission_classes = [IsAuthenticated]
-    renderer_classes = APIView.renderer_classes + [MiniXMLRenderer]
-
+    renderer_classes = [StreamingJSONRenderer, BrowsableAPIRenderer, MiniXMLRenderer]
 
+    @method_decorator(condition(etag_func=feed_etag, last_modified_func=feed_last_modified))
     def get(self, request):
         """
         Handle GET requests to retrieve articles from subscribed publishers and journalists.
         """
-        user = request.user
-
-        # Get subscriptions
-        publisher_ids = Subscription.objects.filter(
-            reader=user,
-            publisher__isnull=False
-        ).values_list("publisher_id", flat=True)
-
-        journalist_ids = Subscription.objects.filter(
-            reader=user,
-            journalist__isnull=False
-        ).values_list("journalist_id", flat=True)
-
-        # Get approved articles
-        articles = Article.objects.filter(
-            approved=True
-        ).filter(
-            publisher_id__in=publisher_ids
-        ) | Article.objects.filter(
-            approved=True,
-            author_id__in=journalist_ids
+        page_size = get_page_size(request)
+        cursor_token = request.query_params.get("cursor")
+        fields = parse_fieldset(request.query_params.get("fields"))
+        cache_key = feed_cache.reader_feed_key(
+            request.user.pk, (cursor_token, page_size, fields)
+        )
+        cached = feed_cache.get(cache_key)
+
+        if cached is not None:
+            rows, next_token = cached["rows"], cached["next"]
+        else:
+            rows, next_token = self.build_page(
+                request, decode_cursor(cursor_token), page_size, fields
+            )
+            rows = feed_cache.store_rows(cache_key, rows, next=next_token)
+
+        renderer = request.accepted_renderer
+        if hasattr(renderer, "render_stream"):
+            response = StreamingHttpResponse(
+                renderer.render_stream(
+                    rows, request.accepted_media_type, self.get_renderer_context()
+                ),
+                content_type=(
+                    f"{renderer.media_type}; charset={renderer.charset}"
+                    if renderer.charset else renderer.media_type
+                ),
+            )
+        else:
+            response = Response(list(rows))
+
+        if next_token:
+            response["Link"] = '<{}>; rel="next"'.format(next_link(request, next_token))
+        return response
+
+    def build_page(self, request, cursor, page_size, fields=None):
+        """
+        Read one page of the reader's feed from their timeline.
+
+        Returns an iterator over the serialized rows and the cursor token of the next page, if any.
+        """
+        # The reader's timeline already holds one row per visible subscribed
+        # article, so resolving a page is a single range scan on that table.
+        # This is a narrow query and tells us whether another page follows
+        # before any body is written.
+        entries = TimelineEntry.objects.filter(reader_id=request.user.pk)
+        keys = list(
+            order_by_key(filter_after(entries, cursor, "article_id"), "article_id")
+            .values_list("published_at", "article_id")[:page_size + 1]
         )
+        next_token = encode_cursor(*keys[page_size - 1]) if len(keys) > page_size else None
+        keys = keys[:page_size]
 
-        serializer = ArticleSerializer(articles, many=True)
-        return Response(serializer.data)
+        page = order_by_key(Article.objects.filter(id__in=[pk for _, pk in keys]))
+        return serialize_article_rows(page, fields), next_token
@@ -17,11 +17,10 @@ class ArticleAdmin(admin.ModelAdmin):
 
     def approve_selected(self, request, queryset):
         """
-        Action to approve a selection of articles.
+        Action to approve a selection of articles with a single UPDATE.
         """
-        for article in queryset:
-            if not article.approved:
-                article.approve(editor=request.user)
+        approved = queryset.approve(editor=request.user)
+        self.message_user(request, f"{len(approved)} article(s) approved.")
 
     approve_selected.short_description = "Approve selected articles"
 
@@ -37,11 +36,10 @@ class NewsletterAdmin(admin.ModelAdmin):
 
     def approve_selected(self, request, queryset):
         """
-        Action to approve a selection of newsletters.
+        Action to approve a selection of newsletters with a single UPDATE.
         """
-        for newsletter in queryset:
-            if not newsletter.approved:
-                newsletter.approve(editor=request.user)
+        approved = queryset.approve(editor=request.user)
+        self.message_user(request, f"{len(approved)} newsletter(s) approved.")
 
     approve_selected.short_description = "Approve selected newsletters"
 
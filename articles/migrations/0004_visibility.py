@@ -0,0 +1,58 @@
+# Generated by Django 4.2.27 on 2026-10-18 02:16
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def populate_visibility(apps, schema_editor):
+    """
+    Mark existing independent or approved content as visible.
+    """
+    for model_name in ('Article', 'Newsletter'):
+        model = apps.get_model('articles', model_name)
+        model.objects.filter(Q(is_independent=True) | Q(approved=True)).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_newsletter_approved_newsletter_approved_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(populate_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['is_visible', '-published_at'], name='article_visible_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['publisher', 'is_visible', '-published_at'], name='article_pub_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', 'is_visible', '-published_at'], name='article_author_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['is_visible', '-published_at'], name='newsletter_visible_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['publisher', 'is_visible', '-published_at'], name='newsletter_pub_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['author', 'is_visible', '-published_at'], name='newsletter_author_visible_idx'),
+        ),
+    ]
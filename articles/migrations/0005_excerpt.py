@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-10-18 02:35
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def populate_excerpts(apps, schema_editor):
+    """
+    Store the 30-word excerpt of existing articles and newsletters.
+    """
+    for model_name in ('Article', 'Newsletter'):
+        model = apps.get_model('articles', model_name)
+        batch = []
+        for item in model.objects.only('id', 'body').iterator(chunk_size=1000):
+            item.excerpt = Truncator(item.body).words(30, truncate=' …')
+            batch.append(item)
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, ['excerpt'])
+                batch = []
+        model.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_visibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
@@ -3,14 +3,200 @@ Models for the articles application.
 Defines the structure for Articles and Newsletters, including approval workflows and authorship.
 """
 from django.conf import settings
-from django.db import models
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models, transaction
 from publishers.models import Publisher
 from django.utils import timezone
+from django.utils.text import Truncator
+
+from articles.signals import content_bulk_published, content_published
 
 User = settings.AUTH_USER_MODEL
 
+# Number of words kept in the stored excerpt. Templates truncate it further
+# (20 words in feeds, 30 in the editor queue) with the same output as truncating the body.
+EXCERPT_WORDS = 30
+
 
-class Article(models.Model):
+def make_excerpt(body):
+    """
+    Return the excerpt stored for a body, truncated like the ``truncatewords`` filter.
+    """
+    return Truncator(body).words(EXCERPT_WORDS, truncate=" …")
+
+
+class ContentQuerySet(models.QuerySet):
+    """
+    QuerySet shared by articles and newsletters.
+    """
+
+    def visible(self):
+        """
+        Return content readers may see (independent or approved).
+
+        On MySQL this is an ``is_visible = 1`` equality, served by the composite
+        ``(…, is_visible, -published_at)`` indexes of each model.
+        """
+        return self.filter(is_visible=True)
+
+    def approve(self, editor):
+        """
+        Approve every pending item of the queryset in a single conditional UPDATE.
+
+        Items approved concurrently by someone else are left alone. The newly approved
+        non-independent items are announced together with one ``content_bulk_published``,
+        in the same transaction. Returns the items this call approved.
+
+        :param editor: The user (editor) who approves the content.
+        """
+        now = timezone.now()
+        values = {"approved": True, "approved_by": editor, "published_at": now, "is_visible": True}
+        with transaction.atomic(using=self.db):
+            pks = self._update_pending(values)
+            approved = list(self.model.objects.using(self.db).in_bulk(pks).values())
+            for item in approved:
+                item._remember(approved=True, is_visible=True)
+            published = [item for item in approved if not item.is_independent]
+            if published:
+                content_bulk_published.send(sender=self.model, instances=published)
+        return approved
+
+    def _update_pending(self, values):
+        """
+        Apply ``values`` to the pending rows of the queryset and return the primary keys updated.
+
+        PostgreSQL and SQLite return them from the UPDATE itself. Other backends lock
+        the pending rows first, so the UPDATE cannot miss or add any.
+        """
+        connection = connections[self.db]
+        pending = self.filter(approved=False).order_by()
+        returning = connection.vendor in ("postgresql", "sqlite")
+        if not (returning and connection.features.can_return_columns_from_insert):
+            pks = list(pending.select_for_update().values_list("pk", flat=True))
+            self.model.objects.using(self.db).filter(pk__in=pks).update(**values)
+            return pks
+
+        opts = self.model._meta
+        qn = connection.ops.quote_name
+        assignments, params = [], []
+        for name, value in values.items():
+            field = opts.get_field(name)
+            if field.is_relation:
+                value = value.pk
+            assignments.append(f"{qn(field.column)} = %s")
+            params.append(field.get_db_prep_save(value, connection))
+        approved = opts.get_field("approved")
+        try:
+            subquery, subquery_params = pending.values("pk").query.get_compiler(self.db).as_sql()
+        except EmptyResultSet:
+            # e.g. none(), or an empty ``pk__in`` / ``publisher_id__in`` list
+            return []
+        sql = (
+            f"UPDATE {qn(opts.db_table)} SET {', '.join(assignments)} "
+            f"WHERE {qn(approved.column)} = %s AND {qn(opts.pk.column)} IN ({subquery}) "
+            f"RETURNING {qn(opts.pk.column)}"
+        )
+        params.append(approved.get_db_prep_save(False, connection))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + list(subquery_params))
+            return [row[0] for row in cursor.fetchall()]
+
+
+class DerivedFieldsMixin:
+    """
+    Keeps the denormalized ``is_visible`` and ``excerpt`` columns in step with their inputs.
+    Listings filter on the single indexed ``is_visible`` column instead of OR-ing two flags,
+    and render the short ``excerpt`` instead of loading and tokenizing the whole body.
+    """
+
+    def save(self, *args, **kwargs):
+        """
+        Recompute derived columns before saving, including them in partial updates that touch their inputs.
+        """
+        self.is_visible = self.is_independent or self.approved
+        self.excerpt = make_excerpt(self.body)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"approved", "is_independent"} & update_fields:
+                update_fields.add("is_visible")
+            if "body" in update_fields:
+                update_fields.add("excerpt")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+
+class PublicationMixin:
+    """
+    Detects when content becomes visible to readers and sends ``content_published`` exactly once.
+
+    Content is published when it is approved, or on creation when it is independent.
+    Field values are snapshotted when an instance is loaded, so saves compare against
+    them instead of re-reading the row. ``approve()`` flips the flag with a conditional
+    UPDATE, which also settles concurrent approvals of the same item.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Build the instance and remember the values it was loaded with.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _remember(self, **values):
+        """
+        Record values now stored in the database in the snapshot.
+        """
+        self.__dict__.setdefault("_loaded_values", {}).update(values)
+
+    def save(self, *args, **kwargs):
+        """
+        Save, then send ``content_published`` if this save made the content visible.
+
+        A deferred ``is_visible`` field counts as unchanged.
+        """
+        if self._state.adding:
+            was_visible = False
+        else:
+            was_visible = getattr(self, "_loaded_values", {}).get("is_visible", True)
+        with transaction.atomic():
+            # is_visible is recomputed from approved/is_independent further down the MRO
+            super().save(*args, **kwargs)
+            self._remember(approved=self.approved, is_visible=self.is_visible)
+            if self.is_visible and not was_visible:
+                content_published.send(sender=type(self), instance=self)
+
+    def approve(self, editor):
+        """
+        Approve the content and set the publication date.
+
+        Only the call that actually moves the row from pending to approved updates it
+        and sends ``content_published``, together with its receivers' writes in one
+        transaction. Independent content was published when created and is not announced again.
+        Returns whether this call approved it.
+
+        :param editor: The user (editor) who approves the content.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            updated = type(self).objects.filter(pk=self.pk, approved=False).update(
+                approved=True, approved_by=editor, published_at=now, is_visible=True,
+            )
+            if not updated:
+                return False
+            self.approved = True
+            self.approved_by = editor
+            self.published_at = now
+            self.is_visible = True
+            self._remember(approved=True, is_visible=True)
+            if not self.is_independent:
+                content_published.send(sender=type(self), instance=self)
+        return True
+
+
+class Article(PublicationMixin, DerivedFieldsMixin, models.Model):
     """
     Represents a news article written by a journalist.
     Articles require editorial approval before being published.
@@ -18,6 +204,9 @@ class Article(models.Model):
     title = models.CharField(max_length=255)
     body = models.TextField()
 
+    # Maintained on save: the first EXCERPT_WORDS words of the body
+    excerpt = models.TextField(blank=True, editable=False)
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -37,6 +226,9 @@ class Article(models.Model):
 
     approved = models.BooleanField(default=False)
 
+    # Maintained on save: True when the article is independent or approved
+    is_visible = models.BooleanField(default=False, editable=False)
+
     approved_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -48,16 +240,23 @@ class Article(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     published_at = models.DateTimeField(null=True, blank=True)
 
-    def approve(self, editor):
-        """
-        Approve the article and set the publication date.
-        
-        :param editor: The user (editor) who approves the article.
-        """
-        self.approved = True
-        self.approved_by = editor
-        self.published_at = timezone.now()
-        self.save(update_fields=["approved", "approved_by", "published_at"])
+    objects = ContentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_visible", "-published_at"],
+                name="article_visible_recent_idx",
+            ),
+            models.Index(
+                fields=["publisher", "is_visible", "-published_at"],
+                name="article_pub_visible_idx",
+            ),
+            models.Index(
+                fields=["author", "is_visible", "-published_at"],
+                name="article_author_visible_idx",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -66,13 +265,14 @@ class Article(models.Model):
         return self.title
 
 
-class Newsletter(models.Model):
+class Newsletter(PublicationMixin, DerivedFieldsMixin, models.Model):
     """
     Represents a newsletter published by a journalist to readers.
     Supports optional editorial approval if associated with a publisher.
     """
     title = models.CharField(max_length=255)
     body = models.TextField()
+    excerpt = models.TextField(blank=True, editable=False)
     
     author = models.ForeignKey(
         User,
@@ -89,6 +289,7 @@ class Newsletter(models.Model):
 
     is_independent = models.BooleanField(default=False)
     approved = models.BooleanField(default=False)
+    is_visible = models.BooleanField(default=False, editable=False)
 
     approved_by = models.ForeignKey(
         User,
@@ -100,16 +301,25 @@ class Newsletter(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     published_at = models.DateTimeField(null=True, blank=True)
-    
-    def approve(self, editor):
-        """
-        Approve the newsletter.
-        """
-        self.approved = True
-        self.approved_by = editor
-        self.published_at = timezone.now()
-        self.save(update_fields=["approved", "approved_by", "published_at"])
 
+    objects = ContentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_visible", "-published_at"],
+                name="newsletter_visible_recent_idx",
+            ),
+            models.Index(
+                fields=["publisher", "is_visible", "-published_at"],
+                name="newsletter_pub_visible_idx",
+            ),
+            models.Index(
+                fields=["author", "is_visible", "-published_at"],
+                name="newsletter_author_visible_idx",
+            ),
+        ]
+    
     def __str__(self):
         """
         Return the string representation of the newsletter.
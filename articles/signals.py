@@ -0,0 +1,15 @@
+"""
+Signals sent by the articles application.
+Lets other apps react to content being published without re-reading it on every save.
+"""
+from django.dispatch import Signal
+
+# Sent exactly once when an article or newsletter becomes visible to readers (approved,
+# or created independent), inside the transaction that publishes it.
+# Arguments: sender (the model class), instance.
+content_published = Signal()
+
+# Sent once by ``ContentQuerySet.approve()`` instead of ``content_published`` per item, inside
+# the approving transaction, so receivers can handle the whole batch at once.
+# Arguments: sender (the model class), instances (the newly published items).
+content_bulk_published = Signal()
@@ -2,6 +2,352 @@
 Tests for the articles application.
 Ensures that article creation, approval status, and visibility rules function as expected.
 """
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+
+from articles.models import Article, Newsletter
+from articles.signals import content_bulk_published, content_published
+from news_project.testing import QueryBudgetMixin
+from notifications.fanout import get_handlers
+from notifications.models import OutboxMessage
+from publishers.models import Publisher
+from subscriptions import feed_cache
+from subscriptions.models import Subscription
+
+User = get_user_model()
+
+
+class VisibilityTest(TestCase):
+    """
+    Test suite for the denormalized is_visible column on articles and newsletters.
+    """
+    def setUp(self):
+        """
+        Set up a journalist, an editor and a publisher.
+        """
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+
+    def test_independent_content_is_visible(self):
+        """
+        Test that independent articles and newsletters are visible as soon as they are created.
+        """
+        article = Article.objects.create(title="A", body="...", author=self.journalist, is_independent=True)
+        newsletter = Newsletter.objects.create(title="N", body="...", author=self.journalist, is_independent=True)
+        self.assertTrue(article.is_visible)
+        self.assertTrue(newsletter.is_visible)
+        self.assertEqual(list(Article.objects.visible()), [article])
+
+    def test_approval_makes_content_visible(self):
+        """
+        Test that approve(), which saves with update_fields, also persists is_visible.
+        """
+        article = Article.objects.create(title="A", body="...", author=self.journalist, publisher=self.publisher)
+        newsletter = Newsletter.objects.create(title="N", body="...", author=self.journalist, publisher=self.publisher)
+        self.assertFalse(Article.objects.visible().exists())
+        self.assertFalse(Newsletter.objects.visible().exists())
+
+        article.approve(self.editor)
+        newsletter.approve(self.editor)
+
+        self.assertTrue(Article.objects.get(pk=article.pk).is_visible)
+        self.assertTrue(Newsletter.objects.get(pk=newsletter.pk).is_visible)
+
+
+class ExcerptTest(TestCase):
+    """
+    Test suite for the stored excerpt of articles and newsletters.
+    """
+    def setUp(self):
+        """
+        Set up a journalist.
+        """
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+
+    def test_excerpt_renders_like_truncated_body(self):
+        """
+        Test that truncating the excerpt in templates gives the same output as truncating the body.
+        """
+        body = " ".join(f"word{i}" for i in range(100))
+        article = Article.objects.create(title="A", body=body, author=self.journalist, is_independent=True)
+        for length in (20, 30):
+            template = Template(f"{{{{ value|truncatewords:{length} }}}}")
+            self.assertEqual(
+                template.render(Context({"value": article.excerpt})),
+                template.render(Context({"value": body})),
+            )
+
+    def test_partial_body_update_refreshes_excerpt(self):
+        """
+        Test that saving with update_fields=["body"] also persists the new excerpt.
+        """
+        newsletter = Newsletter.objects.create(title="N", body="old", author=self.journalist, is_independent=True)
+        newsletter.body = "new body"
+        newsletter.save(update_fields=["body"])
+        self.assertEqual(Newsletter.objects.get(pk=newsletter.pk).excerpt, "new body")
+
+
+class PublicationTest(TestCase):
+    """
+    Test suite for approval tracking and the content_published signal.
+    """
+    def setUp(self):
+        """
+        Set up a journalist, an editor, a publisher and a receiver recording content_published.
+        """
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        self.receiver = mock.Mock()
+        content_published.connect(self.receiver)
+        self.addCleanup(content_published.disconnect, self.receiver)
+
+    def article_selects(self, queries):
+        """
+        Return the captured queries that read the article table.
+        """
+        return [q["sql"] for q in queries if q["sql"].startswith("SELECT") and '"articles_article"' in q["sql"]]
+
+    def test_concurrent_approvals_publish_once(self):
+        """
+        Test that two editors approving the same stale instance publish it only once.
+        """
+        Article.objects.create(title="A", body="...", author=self.journalist, publisher=self.publisher)
+        first, second = Article.objects.get(), Article.objects.get()
+
+        self.assertTrue(first.approve(self.editor))
+        self.assertFalse(second.approve(self.editor))
+        self.receiver.assert_called_once()
+        self.assertIs(self.receiver.call_args.kwargs["instance"], first)
+        self.assertTrue(Article.objects.visible().filter(pk=first.pk).exists())
+
+    def test_saves_do_not_reread_the_row(self):
+        """
+        Test that approving and editing a loaded article issue no SELECT on the article table.
+        """
+        Article.objects.create(title="A", body="...", author=self.journalist, publisher=self.publisher)
+        article = Article.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            article.approve(self.editor)
+            article.title = "A (edited)"
+            article.save()
+        self.assertEqual(self.article_selects(queries), [])
+        self.assertEqual(self.receiver.call_count, 1)
+
+    def test_save_publishes_on_transition_only(self):
+        """
+        Test that saves publish content created approved or switched to approved, once.
+        """
+        Newsletter.objects.create(title="N", body="...", author=self.journalist, approved=True)
+        self.assertEqual(self.receiver.call_count, 1)
+
+        article = Article.objects.create(title="A", body="...", author=self.journalist, publisher=self.publisher)
+        article = Article.objects.get(pk=article.pk)
+        article.approved = True
+        article.save()
+        article.save()
+        self.assertEqual(self.receiver.call_count, 2)
+        self.assertEqual(self.receiver.call_args.kwargs["sender"], Article)
+
+
+class BulkApprovalTest(TestCase):
+    """
+    Test suite for approving many articles and newsletters at once.
+    """
+    def setUp(self):
+        """
+        Set up an editor of one publisher, pending content of it and of another publisher, and a subscriber.
+        """
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        self.publisher.editors.add(self.editor)
+        self.other = Publisher.objects.create(name="Other")
+        reader = User.objects.create_user(username="reader", password="pw", role="reader", email="r@example.com")
+        Subscription.objects.create(reader=reader, publisher=self.publisher)
+        self.articles = [
+            Article.objects.create(title=f"A{i}", body="...", author=self.journalist, publisher=self.publisher)
+            for i in range(3)
+        ]
+        self.foreign = Article.objects.create(title="F", body="...", author=self.journalist, publisher=self.other)
+        self.receiver = mock.Mock()
+        content_bulk_published.connect(self.receiver)
+        self.addCleanup(content_bulk_published.disconnect, self.receiver)
+
+    def test_queryset_approve_skips_already_approved(self):
+        """
+        Test that one UPDATE approves the pending rows, skipping approved ones, and announces them once.
+        """
+        self.articles[0].approve(self.editor)
+        outbox = OutboxMessage.objects.count()
+        with CaptureQueriesContext(connection) as queries:
+            approved = Article.objects.filter(publisher=self.publisher).approve(self.editor)
+
+        self.assertEqual({a.pk for a in approved}, {a.pk for a in self.articles[1:]})
+        self.assertEqual(len([q for q in queries if q["sql"].startswith("UPDATE")]), 1)
+        self.receiver.assert_called_once()
+        self.assertEqual(len(self.receiver.call_args.kwargs["instances"]), 2)
+        self.assertEqual(OutboxMessage.objects.count(), outbox + len(get_handlers()) * len(approved))
+        self.assertEqual(self.reader_timeline(), {a.pk for a in self.articles})
+        self.assertEqual(Article.objects.filter(publisher=self.publisher).approve(self.editor), [])
+        self.assertEqual(Article.objects.filter(approved_by=self.editor).count(), 3)
+
+    def test_locking_fallback(self):
+        """
+        Test the path used by backends without UPDATE ... RETURNING.
+        """
+        with mock.patch.object(connection, "vendor", "mysql"):
+            approved = Article.objects.filter(publisher=self.publisher).approve(self.editor)
+        self.assertEqual(len(approved), 3)
+        self.assertEqual(Article.objects.visible().count(), 3)
+
+    def reader_timeline(self):
+        """
+        Return the article ids in the reader's timeline.
+        """
+        return set(User.objects.get(username="reader").timeline_entries.values_list("article_id", flat=True))
+
+    def test_editor_bulk_action_is_scoped_to_their_publishers(self):
+        """
+        Test that the editor queue approves the selection, ignoring content of other publishers.
+        """
+        newsletter = Newsletter.objects.create(title="N", body="...", author=self.journalist, publisher=self.publisher)
+        self.client.login(username="editor", password="pw")
+        response = self.client.post("/editor/approve/", {
+            "articles": [self.articles[0].pk, self.foreign.pk],
+            "newsletters": [newsletter.pk],
+        })
+        self.assertRedirects(response, "/editor/articles/", fetch_redirect_response=False)
+        self.assertEqual(set(Article.objects.filter(approved=True)), {self.articles[0]})
+        self.assertTrue(Newsletter.objects.get(pk=newsletter.pk).approved)
+
+
+    def test_empty_selection_approves_nothing(self):
+        """
+        Test that approving an empty queryset, or as an editor without publishers, is a no-op.
+        """
+        self.assertEqual(Article.objects.none().approve(self.editor), [])
+        User.objects.create_user(username="loner", password="pw", role="editor")
+        self.client.login(username="loner", password="pw")
+        response = self.client.post("/editor/approve/", {"articles": [a.pk for a in self.articles]})
+        self.assertRedirects(response, "/editor/articles/", fetch_redirect_response=False)
+        self.assertFalse(Article.objects.filter(approved=True).exists())
+        self.receiver.assert_not_called()
+
+class PublicFeedCacheTest(TestCase):
+    """
+    Test suite for the cached public article feed.
+    """
+    def test_feed_is_cached_as_plain_rows_and_rendered_from_them(self):
+        """
+        Test that the cached feed holds dicts, not model instances, and renders like the queryset.
+        """
+        journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        publisher = Publisher.objects.create(name="Daily")
+        article = Article.objects.create(
+            title="Cached", body="Body", author=journalist, publisher=publisher, approved=True
+        )
+        self.client.force_login(journalist)
+        first = self.client.get("/articles/")
+        second = self.client.get("/articles/")
+
+        rows = cache.get(feed_cache.public_feed_key("articles"))
+        self.assertEqual([type(row) for row in rows], [dict])
+        self.assertEqual(rows[0]["author"], {"id": journalist.pk, "username": "journalist"})
+        self.assertEqual(first.content, second.content)
+        for content in (b"Cached", b"(Daily)", b"journalist", f"/articles/{article.pk}/update/".encode()):
+            self.assertIn(content, second.content)
+
+
+class ArticleViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Test suite asserting that the article views run a fixed number of queries.
+    """
+    def setUp(self):
+        """
+        Set up users of every role, a publisher and one item of each kind of content.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        self.publisher.editors.add(self.editor)
+        self.created = 0
+        self.add_content()
+
+    def add_content(self, count=1):
+        """
+        Add approved and pending content, each item by a different journalist.
+        """
+        for _ in range(count):
+            self.created += 1
+            journalist = User.objects.create_user(
+                username=f"journalist{self.created}", password="pw", role="journalist"
+            )
+            publisher = Publisher.objects.create(name=f"Publisher {self.created}")
+            for approved in (True, False):
+                Article.objects.create(
+                    title="Article", body="...", author=journalist,
+                    publisher=self.publisher, approved=approved,
+                )
+                Newsletter.objects.create(
+                    title="Newsletter", body="...", author=journalist,
+                    publisher=self.publisher, approved=approved,
+                )
+            Subscription.objects.create(reader=self.reader, journalist=journalist)
+            Subscription.objects.create(reader=self.reader, publisher=publisher)
+
+    def grow(self):
+        """
+        Add several more items to every listing.
+        """
+        self.add_content(5)
+
+    def test_article_feed_budget(self):
+        """
+        Test the query budget of the default article feed.
+        """
+        self.client.force_login(self.reader)
+        self.assertQueryBudget("/articles/", 5, self.grow)
+
+    def test_newsletter_feed_budget(self):
+        """
+        Test the query budget of the newsletter feed.
+        """
+        self.client.force_login(self.reader)
+        self.assertQueryBudget("/articles/?type=newsletters", 3, self.grow)
+
+    def test_subscriptions_tab_budget(self):
+        """
+        Test the query budget of the subscriptions tab.
+        """
+        self.client.force_login(self.reader)
+        self.assertQueryBudget("/articles/?type=subscriptions", 3, self.grow)
+
+    def test_publishers_tab_budget(self):
+        """
+        Test the query budget of the publishers tab.
+        """
+        self.client.force_login(self.editor)
+        self.assertQueryBudget("/articles/?type=publishers", 4, self.grow)
+
+    def test_author_feed_budget(self):
+        """
+        Test the query budget of the per-author feed.
+        """
+        self.client.force_login(self.reader)
+        journalist = User.objects.get(username="journalist1")
+        self.assertQueryBudget(f"/articles/?author={journalist.id}", 6, self.grow)
 
-# Create your tests here.
+    def test_pending_articles_budget(self):
+        """
+        Test the query budget of the editor's pending content queue.
+        """
+        self.client.force_login(self.editor)
+        self.assertQueryBudget("/editor/articles/", 6, self.grow)
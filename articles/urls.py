@@ -8,6 +8,7 @@ from . import views
 urlpatterns = [
     # Editorial workflows
     path("editor/articles/", views.pending_articles, name="pending-articles"),
+    path("editor/approve/", views.bulk_approve, name="bulk-approve"),
     path(
         "editor/articles/<int:article_id>/approve/",
         views.approve_article,
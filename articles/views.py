@@ -7,8 +7,9 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
 from articles.models import Article, Newsletter
 from publishers.models import Publisher
+from subscriptions import feed_cache
+from users.membership import get_membership
 from django.utils import timezone
-from django.db.models import Q
 import json
 import os
 from pathlib import Path
@@ -21,23 +22,27 @@ def pending_articles(request):
     
     Only editors can see content from their publishers.
     """
-    if request.user.role == "editor":
+    if request.role == "editor":
         # Get all publishers this editor belongs to
-        user_publishers = Publisher.objects.filter(editors=request.user)
+        user_publishers = get_membership(request.user).editor_of
         articles = Article.objects.filter(
             approved=False,
-            publisher__in=user_publishers,
+            publisher_id__in=user_publishers,
             is_independent=False
         )
         newsletters = Newsletter.objects.filter(
             approved=False,
-            publisher__in=user_publishers,
+            publisher_id__in=user_publishers,
             is_independent=False
         )
     else:
         # Readers/Journalists shouldn't normally access this, but if they do:
         articles = Article.objects.filter(approved=False, is_independent=False)
         newsletters = Newsletter.objects.filter(approved=False, is_independent=False)
+
+    # The template shows each item's author, publisher and excerpt
+    articles = articles.select_related("author", "publisher").defer("body")
+    newsletters = newsletters.select_related("author", "publisher").defer("body")
     
     return render(request, "articles/pending_articles.html", {
         "articles": articles,
@@ -52,10 +57,12 @@ def approve_article(request, article_id):
     article = get_object_or_404(Article, id=article_id)
     
     # Check if user is an editor of the publisher
-    if request.user.role == "editor" and article.publisher and request.user in article.publisher.editors.all():
-        article.approve(request.user)
+    if request.role == "editor" and get_membership(request.user).is_editor_of(article.publisher_id):
         from django.contrib import messages
-        messages.success(request, f"Article '{article.title}' approved!")
+        if article.approve(request.user):
+            messages.success(request, f"Article '{article.title}' approved!")
+        else:
+            messages.info(request, f"Article '{article.title}' was already approved.")
     else:
         from django.contrib import messages
         messages.error(request, "You do not have permission to approve this article.")
@@ -69,10 +76,12 @@ def approve_newsletter(request, newsletter_id):
     newsletter = get_object_or_404(Newsletter, id=newsletter_id)
     
     # Check if user is an editor of the publisher
-    if request.user.role == "editor" and newsletter.publisher and request.user in newsletter.publisher.editors.all():
-        newsletter.approve(request.user)
+    if request.role == "editor" and get_membership(request.user).is_editor_of(newsletter.publisher_id):
         from django.contrib import messages
-        messages.success(request, f"Newsletter '{newsletter.title}' approved!")
+        if newsletter.approve(request.user):
+            messages.success(request, f"Newsletter '{newsletter.title}' approved!")
+        else:
+            messages.info(request, f"Newsletter '{newsletter.title}' was already approved.")
     else:
         from django.contrib import messages
         messages.error(request, "You do not have permission to approve this newsletter.")
@@ -80,8 +89,60 @@ def approve_newsletter(request, newsletter_id):
     return redirect("pending-articles")
 
 
+@permission_required("articles.change_article")
+def bulk_approve(request):
+    """Approve the selected pending articles and newsletters at once."""
+    from django.contrib import messages
+    if request.method == "POST":
+        if request.role != "editor":
+            messages.error(request, "You do not have permission to approve this content.")
+            return redirect("pending-articles")
+
+        # Editors may only approve content of the publishers they belong to
+        user_publishers = get_membership(request.user).editor_of
+        approved = {}
+        for model, field in ((Article, "articles"), (Newsletter, "newsletters")):
+            ids = [pk for pk in request.POST.getlist(field) if pk.isdigit()]
+            if ids:
+                approved[field] = model.objects.filter(
+                    pk__in=ids, publisher_id__in=user_publishers, is_independent=False
+                ).approve(request.user)
+            else:
+                approved[field] = []
+
+        if approved["articles"] or approved["newsletters"]:
+            messages.success(
+                request,
+                f"Approved {len(approved['articles'])} article(s) and "
+                f"{len(approved['newsletters'])} newsletter(s).",
+            )
+        else:
+            messages.info(request, "Nothing to approve: the selection was already approved.")
+    return redirect("pending-articles")
+
 
+def listing_rows(queryset, with_publisher=True):
+    """
+    Return what the listing template shows of each article or newsletter, as plain dicts.
 
+    Cached public feeds hold these rows rather than pickled model instances, so they
+    stay small and survive changes to the models.
+    """
+    columns = ["id", "title", "excerpt", "published_at", "is_independent", "author_id", "author__username"]
+    if with_publisher:
+        columns.append("publisher__name")
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "excerpt": row["excerpt"],
+            "published_at": row["published_at"],
+            "is_independent": row["is_independent"],
+            "author": {"id": row["author_id"], "username": row["author__username"]},
+            "publisher": {"name": row["publisher__name"]} if row.get("publisher__name") else None,
+        }
+        for row in queryset.values(*columns)
+    ]
 
 
 @login_required
@@ -101,14 +162,22 @@ def article_list(request):
     }
 
     # Base QuerySets for generic feed (Approved or Independent)
-    articles_qs = Article.objects.filter(Q(is_independent=True) | Q(approved=True))
-    newsletters_qs = Newsletter.objects.filter(Q(is_independent=True) | Q(approved=True)).distinct()
+    articles_qs = Article.objects.visible().order_by("-published_at")
+    newsletters_qs = Newsletter.objects.visible().order_by("-published_at")
+
+    # Related rows shown for every item are fetched in the same query,
+    # and listings render the stored excerpt rather than the full body
+    articles_qs = articles_qs.select_related("author", "publisher").defer("body")
+    newsletters_qs = newsletters_qs.select_related("author").defer("body")
 
     if content_type == "newsletters":
-        if request.user.is_authenticated and request.user.role == "journalist" and filter_type == "my":
-            newsletters = request.user.journalist_newsletters
+        if request.user.is_authenticated and request.role == "journalist" and filter_type == "my":
+            newsletters = request.user.journalist_newsletters.select_related("author").defer("body")
         else:
-            newsletters = newsletters_qs
+            newsletters = feed_cache.get_or_set(
+                feed_cache.public_feed_key("newsletters"),
+                lambda: listing_rows(newsletters_qs, with_publisher=False),
+            )
         
         context["newsletters"] = newsletters
         return render(request, "articles/article_list.html", context)
@@ -117,9 +186,9 @@ def article_list(request):
         publishers = Publisher.objects.all()
         user_publishers = []
         if request.user.is_authenticated:
-            if request.user.role == "editor":
+            if request.role == "editor":
                 user_publishers = Publisher.objects.filter(editors=request.user)
-            elif request.user.role == "journalist":
+            elif request.role == "journalist":
                 user_publishers = Publisher.objects.filter(journalists=request.user)
             
         context["publishers"] = publishers
@@ -136,7 +205,9 @@ def article_list(request):
     elif content_type == "subscriptions":
         from subscriptions.models import Subscription
         sub_type = request.GET.get("sub_type", "all")
-        subscriptions = Subscription.objects.filter(reader=request.user)
+        subscriptions = Subscription.objects.filter(reader=request.user).select_related(
+            "publisher", "journalist"
+        )
         
         if sub_type == "journalist":
             subscriptions = subscriptions.filter(journalist__isnull=False)
@@ -149,8 +220,8 @@ def article_list(request):
 
     # DEFAULT: Articles list
     articles = articles_qs
-    if request.user.is_authenticated and request.user.role == "journalist" and filter_type == "my" and not author_id:
-        articles = request.user.journalist_articles
+    if request.user.is_authenticated and request.role == "journalist" and filter_type == "my" and not author_id:
+        articles = request.user.journalist_articles.select_related("author", "publisher").defer("body")
     
     if author_id:
         from django.contrib.auth import get_user_model
@@ -158,16 +229,23 @@ def article_list(request):
         selected_author = get_object_or_404(User, id=author_id)
         articles = articles.filter(author=selected_author)
         # Newsletters for this author must also be filtered by visibility for others
-        author_newsletters = selected_author.newsletters.filter(Q(is_independent=True) | Q(approved=True)).distinct()
+        author_newsletters = selected_author.newsletters.visible().order_by("-published_at").defer("body")
         context["newsletters"] = author_newsletters
         context["selected_author"] = selected_author
 
+    if articles is articles_qs:
+        # The unfiltered feed is the same for everyone, so serve it from the cache
+        articles = feed_cache.get_or_set(
+            feed_cache.public_feed_key("articles"), lambda: listing_rows(articles_qs)
+        )
     context["articles"] = articles
 
     # Fetch user's subscription IDs for UI indicators
-    from subscriptions.models import Subscription
-    user_subs = Subscription.objects.filter(reader=request.user)
-    context["subscribed_journalist_ids"] = list(user_subs.filter(journalist__isnull=False).values_list('journalist_id', flat=True))
+    context["subscribed_journalist_ids"] = [
+        journalist_id
+        for _, journalist_id in feed_cache.reader_sources(request.user.pk)
+        if journalist_id
+    ]
 
     return render(request, "articles/article_list.html", context)
 
@@ -179,7 +257,7 @@ def create_article(request):
     Supports independent publishing or submission to a publisher for approval.
     """
     
-    if request.user.role != "journalist":
+    if request.role != "journalist":
         return redirect("article-list")
 
     # Get publishers this journalist belongs to
@@ -221,10 +299,10 @@ def article_detail(request, article_id):
     Display the details of a specific article.
     Enforces visibility permissions for readers.
     """
-    article = get_object_or_404(Article, id=article_id)
+    article = get_object_or_404(Article.objects.select_related("author"), id=article_id)
     
     # Check permissions: editors/journalists can see all, readers only see approved or independent
-    if request.user.role == "reader" and not article.approved and not article.is_independent:
+    if request.role == "reader" and not article.approved and not article.is_independent:
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("You don't have permission to view this article.")
     
@@ -240,11 +318,11 @@ def update_article(request, article_id):
     article = get_object_or_404(Article, id=article_id)
     
     # Check permissions: editors can edit any, journalists only their own
-    if request.user.role not in ["editor", "journalist"]:
+    if request.role not in ["editor", "journalist"]:
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("You don't have permission to edit articles.")
     
-    if request.user.role == "journalist" and article.author != request.user:
+    if request.role == "journalist" and article.author != request.user:
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("You can only edit your own articles.")
     
@@ -266,11 +344,11 @@ def delete_article(request, article_id):
     article = get_object_or_404(Article, id=article_id)
     
     # Check permissions: editors can delete any, journalists only their own
-    if request.user.role not in ["editor", "journalist"]:
+    if request.role not in ["editor", "journalist"]:
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("You don't have permission to delete articles.")
     
-    if request.user.role == "journalist" and article.author != request.user:
+    if request.role == "journalist" and article.author != request.user:
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("You can only delete your own articles.")
     
@@ -284,7 +362,7 @@ def delete_article(request, article_id):
 @login_required
 def create_newsletter(request):
     """Allow journalists to create newsletters."""
-    if request.user.role != "journalist":
+    if request.role != "journalist":
         return redirect("article-list")
     
     if request.method == "POST":
@@ -312,7 +390,7 @@ def create_newsletter(request):
 @login_required
 def newsletter_detail(request, newsletter_id):
     """View a newsletter in detail."""
-    newsletter = get_object_or_404(Newsletter, id=newsletter_id)
+    newsletter = get_object_or_404(Newsletter.objects.select_related("author"), id=newsletter_id)
     return render(request, "articles/newsletter_detail.html", {"newsletter": newsletter})
 
 
@@ -323,9 +401,8 @@ def update_newsletter(request, newsletter_id):
     
     is_author = request.user == newsletter.author
     is_editor = (
-        request.user.role == "editor" and 
-        newsletter.publisher and 
-        newsletter.publisher.editors.filter(id=request.user.id).exists()
+        request.role == "editor" and
+        get_membership(request.user).is_editor_of(newsletter.publisher_id)
     )
     
     if not (is_author or is_editor):
@@ -350,9 +427,8 @@ def delete_newsletter(request, newsletter_id):
     
     is_author = request.user == newsletter.author
     is_editor = (
-        request.user.role == "editor" and 
-        newsletter.publisher and 
-        newsletter.publisher.editors.filter(id=request.user.id).exists()
+        request.role == "editor" and
+        get_membership(request.user).is_editor_of(newsletter.publisher_id)
     )
     
     if not (is_author or is_editor):
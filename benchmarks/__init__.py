@@ -0,0 +1,4 @@
+"""
+Benchmark scripts for the news application.
+Each module is run from the project root, e.g. ``python -m benchmarks.visibility_indexes``.
+"""
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for the article read serialization paths.
+Compares rows serialized per second by ``ArticleSerializer`` over model instances
+with ``serialize_article_rows`` over ``values_list()`` tuples.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.article_serializer --rows 20000
+"""
+import argparse
+
+from benchmarks.support import benchmark_database, best_of, setup_django
+
+
+def seed(rows):
+    """
+    Bulk insert ``rows`` approved articles spread over a few authors and publishers.
+    """
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from articles.models import Article
+    from publishers.models import Publisher
+
+    User = get_user_model()
+    authors = User.objects.bulk_create(
+        User(username=f"journalist{i}", role="journalist") for i in range(100)
+    )
+    publishers = Publisher.objects.bulk_create(
+        Publisher(name=f"Publisher {i}") for i in range(20)
+    )
+    now = timezone.now()
+    Article.objects.bulk_create(
+        (
+            Article(
+                title=f"Article {i}",
+                body="Lorem ipsum dolor sit amet. " * 20,
+                author=authors[i % len(authors)],
+                publisher=publishers[i % len(publishers)] if i % 4 else None,
+                approved=True,
+                is_visible=True,
+                published_at=now,
+            )
+            for i in range(rows)
+        ),
+        batch_size=5000,
+    )
+
+
+def main():
+    """
+    Seed the dataset and report rows per second for each path.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from articles.models import Article
+    from api.serializers import ArticleSerializer, serialize_article_rows
+
+    with benchmark_database():
+        seed(args.rows)
+        queryset = Article.objects.order_by("-published_at", "-id")
+
+        paths = [
+            ("ArticleSerializer (select_related)",
+             lambda: ArticleSerializer(queryset.select_related("author", "publisher"), many=True).data),
+            ("ArticleSerializer (lazy FK loads)",
+             lambda: ArticleSerializer(queryset.all(), many=True).data),
+            ("serialize_article_rows",
+             lambda: list(serialize_article_rows(queryset))),
+        ]
+        print(f"Serializing {args.rows} articles")
+        for label, func in paths:
+            seconds = best_of(func, repeat=3)
+            print(f"  {label:<40} {args.rows / seconds:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
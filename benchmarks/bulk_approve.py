@@ -0,0 +1,125 @@
+"""
+Benchmark for approving a large editorial queue.
+Compares approving articles one by one (the former admin action) with the single conditional
+UPDATE of ``ContentQuerySet.approve()`` and its batched fan-out: time and queries.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.bulk_approve --articles 10000
+"""
+import argparse
+import time
+
+from benchmarks.support import benchmark_database, setup_django
+
+BATCH_SIZE = 5000
+
+
+def seed(articles, subscribers, publishers=10):
+    """
+    Create an editor, pending articles spread over publishers and readers subscribed to each publisher.
+    """
+    from django.contrib.auth import get_user_model
+    from articles.models import Article
+    from publishers.models import Publisher
+    from subscriptions.models import Subscription
+
+    User = get_user_model()
+    editor = User.objects.create(username="editor", role="editor")
+    journalist = User.objects.create(username="journalist", role="journalist")
+    sources = Publisher.objects.bulk_create(Publisher(name=f"Publisher {i}") for i in range(publishers))
+    for publisher in sources:
+        readers = User.objects.bulk_create(
+            User(username=f"reader{publisher.pk}-{i}", role="reader", email=f"r{publisher.pk}-{i}@example.com")
+            for i in range(subscribers)
+        )
+        Subscription.objects.bulk_create(
+            Subscription(reader=reader, publisher=publisher) for reader in readers
+        )
+    Article.objects.bulk_create(
+        (
+            Article(title=f"Article {i}", body="Body " * 50, author=journalist,
+                    publisher=sources[i % publishers])
+            for i in range(articles)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return editor
+
+
+def reset():
+    """
+    Put every article back in the queue and drop what approving them produced.
+    """
+    from articles.models import Article
+    from notifications.models import OutboxMessage
+    from subscriptions.models import TimelineEntry
+
+    Article.objects.update(approved=False, approved_by=None, published_at=None, is_visible=False)
+    OutboxMessage.objects.all().delete()
+    TimelineEntry.objects.all().delete()
+
+
+def per_row(editor):
+    """
+    The former admin action: approve each selected article on its own.
+    """
+    from articles.models import Article
+
+    for article in Article.objects.all():
+        if not article.approved:
+            article.approve(editor=editor)
+
+
+def bulk(editor):
+    """
+    Approve the whole queue with one conditional UPDATE.
+    """
+    from articles.models import Article
+
+    Article.objects.all().approve(editor)
+
+
+def measure(label, approve, editor):
+    """
+    Approve the queue once and print elapsed time, query count and messages queued.
+    """
+    from django.db import connection
+    from notifications.models import OutboxMessage
+
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    reset()
+    with connection.execute_wrapper(count_query):
+        start = time.perf_counter()
+        approve(editor)
+        seconds = time.perf_counter() - start
+    print(f"  {label:<24} {seconds * 1000:10.1f} ms {queries:>9} queries "
+          f"{OutboxMessage.objects.count():>9} outbox messages")
+
+
+def main():
+    """
+    Seed the queue and measure both ways of approving it.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--subscribers", type=int, default=20,
+                        help="Readers subscribed to each of the 10 publishers.")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        editor = seed(args.articles, args.subscribers)
+        print(f"Approving {args.articles} articles")
+        measure("per-article approve()", per_row, editor)
+        measure("queryset approve()", bulk, editor)
+
+
+if __name__ == "__main__":
+    main()
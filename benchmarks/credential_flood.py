@@ -0,0 +1,99 @@
+"""
+Load test of the credential verification endpoint under a credential-stuffing flood.
+Replays wrong passwords for real usernames from a few addresses, with and without the
+login throttle, and reports the worker CPU time spent and the passwords hashed.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.credential_flood --requests 500
+"""
+import argparse
+import json
+import logging
+import time
+from unittest import mock
+
+from benchmarks.support import benchmark_database, setup_django
+
+
+def seed(accounts):
+    """
+    Create the targeted accounts with real (PBKDF2) password hashes.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    User = get_user_model()
+    password = make_password("correct horse battery staple")
+    User.objects.bulk_create(
+        User(username=f"user{i}", password=password, is_reader=True) for i in range(accounts)
+    )
+
+
+def flood(client, requests, accounts, addresses):
+    """
+    Send wrong passwords for the accounts in turn, rotating over the source addresses.
+
+    Returns the number of requests rejected with 429.
+    """
+    rejected = 0
+    for i in range(requests):
+        response = client.post(
+            "/users/verify-credentials/",
+            json.dumps({"username": f"user{i % accounts}", "password": f"guess{i}"}),
+            content_type="application/json",
+            REMOTE_ADDR=f"203.0.113.{i % addresses}",
+        )
+        rejected += response.status_code == 429
+    return rejected
+
+
+def measure(label, requests, accounts, addresses, **limits):
+    """
+    Run a flood and print wall time, worker CPU time and password hashes computed.
+    """
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+
+    cache.clear()
+    client = Client()
+    with override_settings(**limits), mock.patch.object(
+        PBKDF2PasswordHasher, "encode", autospec=True, side_effect=PBKDF2PasswordHasher.encode
+    ) as encode:
+        start, cpu = time.perf_counter(), time.process_time()
+        rejected = flood(client, requests, accounts, addresses)
+        seconds, cpu = time.perf_counter() - start, time.process_time() - cpu
+    print(f"  {label:<20} {seconds:8.2f} s wall {cpu:8.2f} s CPU {encode.call_count:>7} hashes "
+          f"{rejected:>7} rejected")
+
+
+def main():
+    """
+    Seed the accounts and measure the flood without and with the throttle.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--addresses", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    # Every rejected request would otherwise log a "Too Many Requests" warning
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    with benchmark_database():
+        seed(args.accounts)
+        print(f"{args.requests} wrong passwords for {args.accounts} accounts from {args.addresses} addresses")
+        unlimited = (args.requests + 1, 60)
+        measure("no throttle", args.requests, args.accounts, args.addresses,
+                LOGIN_RATE_PER_IP=unlimited, LOGIN_FAILURES_PER_USERNAME=unlimited)
+        measure("throttled", args.requests, args.accounts, args.addresses,
+                LOGIN_RATE_PER_IP=settings.LOGIN_RATE_PER_IP,
+                LOGIN_FAILURES_PER_USERNAME=settings.LOGIN_FAILURES_PER_USERNAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Throughput benchmark for per-recipient subscriber emails.
+Reports messages per second of ``send_individually`` for several batch sizes
+against an email backend (in-memory by default). Connection reuse only shows
+with a real server, e.g. ``--backend django.core.mail.backends.smtp.EmailBackend``.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.mass_mail --recipients 20000
+"""
+import argparse
+
+from benchmarks.support import setup_django
+
+
+def main():
+    """
+    Send the same message to a synthetic recipient list with each batch size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipients", type=int, default=20_000)
+    parser.add_argument("--backend", default="django.core.mail.backends.locmem.EmailBackend")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core import mail
+    from django.test.utils import override_settings
+    from notifications.mailer import send_individually
+
+    recipients = [f"reader{i}@example.com" for i in range(args.recipients)]
+    print(f"Emailing {args.recipients} recipients with {args.backend}")
+    with override_settings(EMAIL_BACKEND=args.backend):
+        for batch_size in (1, 100, 500):
+            mail.outbox = []
+            report = send_individually("Subject", "Body " * 100, recipients, batch_size=batch_size)
+            print(f"  batch_size={batch_size:<6} {report.rate:12,.0f} msgs/s  ({report.failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
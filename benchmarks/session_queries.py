@@ -0,0 +1,102 @@
+"""
+Benchmark of session-table traffic while a logged-in reader browses the site.
+Replays a login followed by a loop of page views with the database session engine and with
+news_project.sessions, and reports the django_session reads and writes per page view.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.session_queries --views 200
+"""
+import argparse
+import time
+
+from benchmarks.support import benchmark_database, setup_django
+
+# Pages a reader goes through, in order, repeatedly
+PAGES = [
+    "/articles/",
+    "/articles/{article}/",
+    "/articles/?type=newsletters",
+    "/newsletters/{newsletter}/",
+    "/publishers/",
+    "/subscriptions/",
+]
+
+
+def seed():
+    """
+    Create a reader subscribed to a publisher with an article and a newsletter.
+    """
+    from django.contrib.auth import get_user_model
+    from articles.models import Article, Newsletter
+    from publishers.models import Publisher
+    from subscriptions.models import Subscription
+
+    User = get_user_model()
+    User.objects.create_user(username="reader", password="password", role="reader", is_reader=True)
+    journalist = User.objects.create_user(username="journalist", password="password", role="journalist")
+    publisher = Publisher.objects.create(name="Daily")
+    Subscription.objects.create(reader=User.objects.get(username="reader"), publisher=publisher)
+    article = Article.objects.create(title="Article", body="Body", author=journalist, publisher=publisher, approved=True)
+    newsletter = Newsletter.objects.create(title="Newsletter", body="Body", author=journalist, approved=True)
+    return {"article": article.pk, "newsletter": newsletter.pk}
+
+
+def classify(queries):
+    """
+    Return the number of reads and writes among captured queries on the session table.
+    """
+    statements = [query["sql"].split()[0] for query in queries if '"django_session"' in query["sql"]]
+    reads = statements.count("SELECT")
+    return reads, len(statements) - reads
+
+
+def measure(label, engine, views, ids, cold=False):
+    """
+    Log in, browse ``views`` pages and print the session queries of the login and per page view.
+    """
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    cache.clear()
+    with override_settings(SESSION_ENGINE=engine):
+        client = Client()
+        with CaptureQueriesContext(connection) as queries:
+            client.post("/users/login/", {"username": "reader", "password": "password", "role": "reader"})
+        login_reads, login_writes = classify(queries)
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for i in range(views):
+                if cold:
+                    # As if every view landed on a worker whose cache does not hold the session
+                    cache.clear()
+                response = client.get(PAGES[i % len(PAGES)].format(**ids))
+                assert response.status_code == 200, response.status_code
+        seconds = time.perf_counter() - start
+        reads, writes = classify(queries)
+    print(f"  {label:<36} login {login_reads} reads {login_writes} writes | per view "
+          f"{reads / views:5.2f} reads {writes / views:5.2f} writes {seconds / views * 1000:7.2f} ms")
+
+
+def main():
+    """
+    Seed a reader and measure browsing with each session engine.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--views", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        ids = seed()
+        print(f"Login, then {args.views} page views")
+        measure("database sessions", "django.contrib.sessions.backends.db", args.views, ids)
+        measure("news_project.sessions", "news_project.sessions", args.views, ids)
+        measure("news_project.sessions, cold cache", "news_project.sessions", args.views, ids, cold=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Shared helpers for the benchmark scripts.
+Boots Django against a throwaway test database so benchmarks never touch real data.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """
+    Configure Django settings and populate the app registry.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "news_project.settings")
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Create a migrated test database for the duration of the block and destroy it afterwards.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def best_of(func, repeat=5):
+    """
+    Run a callable several times and return the fastest wall-clock time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(label, seconds):
+    """
+    Print a single aligned timing line in milliseconds.
+    """
+    print(f"  {label:<48} {seconds * 1000:10.2f} ms")
@@ -0,0 +1,135 @@
+"""
+Benchmark for the denormalized ``is_visible`` column and its composite indexes.
+Seeds a large article table, then compares query plans and timings of the public
+listings with the old OR'ed filters and no supporting indexes against the new
+``is_visible`` filters backed by the composite indexes.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.visibility_indexes --rows 1000000
+"""
+import argparse
+import random
+from datetime import timedelta
+
+from benchmarks.support import benchmark_database, best_of, report, setup_django
+
+BATCH_SIZE = 20000
+PAGE = 50
+
+
+def seed(rows, publishers, journalists):
+    """
+    Bulk insert users, publishers and ``rows`` articles with a realistic visibility mix.
+    """
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from articles.models import Article
+    from publishers.models import Publisher
+
+    User = get_user_model()
+    authors = User.objects.bulk_create(
+        User(username=f"journalist{i}", role="journalist") for i in range(journalists)
+    )
+    pubs = Publisher.objects.bulk_create(
+        Publisher(name=f"Publisher {i}") for i in range(publishers)
+    )
+    now = timezone.now()
+    rng = random.Random(42)
+
+    batch = []
+    for i in range(rows):
+        is_independent = rng.random() < 0.1
+        approved = is_independent or rng.random() < 0.6
+        batch.append(Article(
+            title=f"Article {i}",
+            body="Lorem ipsum dolor sit amet.",
+            author=rng.choice(authors),
+            publisher=None if is_independent else rng.choice(pubs),
+            is_independent=is_independent,
+            approved=approved,
+            # bulk_create bypasses save(), so set the denormalized column here
+            is_visible=approved,
+            published_at=now - timedelta(seconds=i) if approved else None,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            Article.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Article.objects.bulk_create(batch)
+    return pubs[0], authors[0]
+
+
+def listing_queries(publisher, author, before):
+    """
+    Return (label, queryset) pairs for the public listings in their old or new form.
+    """
+    from django.db.models import Q
+    from articles.models import Article
+
+    if before:
+        visible = Article.objects.filter(Q(is_independent=True) | Q(approved=True))
+        by_publisher = Article.objects.filter(publisher=publisher, approved=True)
+        by_author = visible.filter(author=author)
+    else:
+        visible = Article.objects.visible()
+        by_publisher = Article.objects.visible().filter(publisher=publisher)
+        by_author = visible.filter(author=author)
+
+    return [
+        ("visible feed, newest first", visible.order_by("-published_at")),
+        ("publisher listing, newest first", by_publisher.order_by("-published_at")),
+        ("author listing, newest first", by_author.order_by("-published_at")),
+    ]
+
+
+def run(publisher, author, before):
+    """
+    Print the plan and best-of timing for the first page of each listing.
+    """
+    for label, queryset in listing_queries(publisher, author, before):
+        page = queryset.values_list("id", flat=True)[:PAGE]
+        print(f"\n  -- {label}")
+        for line in page.explain().splitlines():
+            print(f"     {line}")
+        report("first page", best_of(lambda: list(page.all())))
+
+
+def main():
+    """
+    Seed the dataset and run the before/after comparison.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--publishers", type=int, default=200)
+    parser.add_argument("--journalists", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from articles.models import Article
+
+    with benchmark_database():
+        print(f"Seeding {args.rows} articles...")
+        publisher, author = seed(args.rows, args.publishers, args.journalists)
+
+        new_indexes = [
+            index for index in Article._meta.indexes if "visible" in index.name
+        ]
+        with connection.schema_editor() as editor:
+            for index in new_indexes:
+                editor.remove_index(Article, index)
+
+        print("\nBEFORE: OR'ed approval filters, no composite indexes")
+        run(publisher, author, before=True)
+
+        with connection.schema_editor() as editor:
+            for index in new_indexes:
+                editor.add_index(Article, index)
+
+        print("\nAFTER: is_visible filters with composite indexes")
+        run(publisher, author, before=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark for delivering one event to many webhook endpoints.
+Spreads endpoints over several fake receivers (one per "host") answering with a fixed latency,
+and compares posting them one after another with the asyncio dispatcher.
+
+Usage::
+
+    USE_SQLITE=True python -m benchmarks.webhook_dispatch --endpoints 10000 --hosts 20 --latency 0.05
+"""
+import argparse
+import json
+import time
+from contextlib import ExitStack
+
+from benchmarks.support import setup_django
+
+# Endpoints posted one after another; the sequential rate does not depend on the total
+SEQUENTIAL_SAMPLE = 200
+
+
+def sequential(endpoints, body):
+    """
+    Post to each endpoint in turn over a keep-alive session, as a synchronous handler would.
+    """
+    import requests
+    from notifications.webhooks import SIGNATURE_HEADER, sign
+
+    with requests.Session() as session:
+        for endpoint in endpoints:
+            signature = sign(endpoint.secret, int(time.time()), body)
+            session.post(endpoint.url, data=body, timeout=(3.05, 10.0),
+                         headers={"Content-Type": "application/json", SIGNATURE_HEADER: signature})
+
+
+def measure(label, count, deliver):
+    """
+    Run a delivery and print elapsed time and requests per second.
+    """
+    start = time.perf_counter()
+    deliver()
+    seconds = time.perf_counter() - start
+    print(f"  {label:<36} {count:>7} requests {seconds * 1000:10.1f} ms {count / seconds:10.0f} req/s")
+
+
+def main():
+    """
+    Start the receivers and measure both ways of delivering the event.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoints", type=int, default=10_000)
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds each receiver takes to answer.")
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from notifications.webhook_receiver import FakeWebhookReceiver
+    from notifications.webhooks import Dispatcher, Endpoint
+
+    body = json.dumps({"id": 1, "event": "article.published", "title": "Benchmark"}).encode()
+    with ExitStack() as stack:
+        receivers = [
+            stack.enter_context(FakeWebhookReceiver(latency=args.latency, secret="secret", keep_events=False))
+            for _ in range(args.hosts)
+        ]
+        endpoints = [
+            Endpoint(i, receivers[i % args.hosts].url(f"hooks/{i}"), "secret")
+            for i in range(args.endpoints)
+        ]
+        print(f"Delivering to {args.endpoints} endpoints on {args.hosts} hosts, {args.latency * 1000:.0f} ms latency")
+        sample = endpoints[:SEQUENTIAL_SAMPLE]
+        measure("sequential (sample)", len(sample), lambda: sequential(sample, body))
+        opened = sum(receiver.connections for receiver in receivers)
+        dispatcher = Dispatcher(max_concurrency=args.concurrency, per_host=args.per_host, allow_private_hosts=True)
+        measure(f"asyncio, {args.per_host} per host", len(endpoints), lambda: dispatcher.run(endpoints, body))
+        rejected = sum(receiver.rejected for receiver in receivers)
+        connections = sum(receiver.connections for receiver in receivers) - opened
+        print(f"  dispatcher opened {connections} connections, {rejected} signatures rejected")
+
+
+if __name__ == "__main__":
+    main()
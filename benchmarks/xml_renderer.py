@@ -0,0 +1,109 @@
+"""
+Benchmark for the streaming mode of MiniXMLRenderer.
+Renders a feed of article dictionaries with the tree-based ``render`` and with
+``render_stream``, each in a fresh interpreter, and reports the extra peak RSS,
+the time to the first byte and the total render time.
+
+Usage::
+
+    python -m benchmarks.xml_renderer --articles 100000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.support import setup_django
+
+
+def make_articles(count):
+    """
+    Build ``count`` article dictionaries shaped like the API output.
+    """
+    return [
+        {
+            "id": i,
+            "title": f"Article {i} & friends",
+            "body": "Lorem ipsum dolor sit amet, <consectetur> adipiscing elit. " * 8,
+            "author": f"journalist{i % 500} (journalist)",
+            "publisher": f"Publisher {i % 50}" if i % 3 else None,
+            "published_at": "2026-01-01T12:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(mode, count):
+    """
+    Render the feed in the given mode and return its measurements as a dictionary.
+    """
+    from api.renderers import MiniXMLRenderer
+
+    renderer = MiniXMLRenderer()
+    articles = make_articles(count)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    if mode == "tree":
+        chunks = [renderer.render(articles)]
+    else:
+        chunks = renderer.render_stream(iter(articles))
+    # Stand-in for the socket: count the bytes and drop them
+    for chunk in chunks:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "bytes": size,
+        "extra_peak_rss_mb": (peak_kb - baseline_kb) / 1024,
+        "ttfb_ms": first_byte * 1000,
+        "total_ms": total * 1000,
+    }
+
+
+def main():
+    """
+    Verify the two modes agree, then measure each in its own process.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--mode", choices=["tree", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    setup_django()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.articles)))
+        return
+
+    from api.renderers import MiniXMLRenderer
+    renderer = MiniXMLRenderer()
+    sample = make_articles(1000)
+    assert b"".join(renderer.render_stream(iter(sample))) == renderer.render(sample)
+
+    print(f"Rendering {args.articles} articles")
+    for mode in ("tree", "stream"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.xml_renderer",
+             "--articles", str(args.articles), "--mode", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        print(
+            f"  {mode:<7} {result['bytes'] / 1e6:8.1f} MB out  "
+            f"peak RSS +{result['extra_peak_rss_mb']:7.1f} MB  "
+            f"TTFB {result['ttfb_ms']:9.2f} ms  "
+            f"total {result['total_ms']:9.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
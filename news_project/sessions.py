@@ -0,0 +1,52 @@
+"""
+Session engine for the news_project: cache first, database for durability, and no needless writes.
+Page views read sessions from the cache, and a session is only written back when its contents changed.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cached database session store that skips saves which would not change anything.
+
+    Reads come from the cache and fall back to the ``django_session`` table; saves
+    write the table and the cache, as with Django's ``cached_db`` engine. Views often
+    mark a session modified by assigning a value it already holds; when the serialized
+    payload and the key are what was loaded, the save is skipped. The expiry is then
+    not extended, exactly as for a session nobody modified, unless
+    SESSION_SAVE_EVERY_REQUEST asks for every request to renew it.
+
+    Only enabled with a cache shared by every worker process (see settings.SESSION_ENGINE).
+    """
+
+    # (session key, serialized payload) as loaded or last saved
+    _stored = None
+
+    def _snapshot(self, data):
+        """
+        Return what identifies the stored state of the session.
+        """
+        return self.session_key, self.serializer().dumps(data)
+
+    def load(self):
+        """
+        Load the session from the cache or the database and remember its payload.
+        """
+        data = super().load()
+        self._stored = self._snapshot(data)
+        return data
+
+    def save(self, must_create=False):
+        """
+        Save the session, unless it holds exactly what was loaded or last saved.
+        """
+        if (
+            not must_create
+            and not settings.SESSION_SAVE_EVERY_REQUEST
+            and self._stored is not None
+            and self._stored == self._snapshot(self._session)
+        ):
+            return
+        super().save(must_create)
+        self._stored = self._snapshot(self._session)
@@ -47,6 +47,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.ActiveRoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'users.context_processors.active_role',
             ],
         },
     },
@@ -98,6 +100,36 @@ else:
 
 
 
+# Cache
+# Local memory by default; set REDIS_URL to share cached feeds between worker processes.
+# Local memory is per process: the feed cache hit/miss counters (feed_cache_stats) then
+# only describe the process reading them, and a management command sees none at all.
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "news-app",
+        }
+    }
+
+# With a shared cache, sessions are read from it and written through to the database,
+# and only written when their contents changed (see news_project.sessions). A local
+# memory cache would give each worker process its own, stale, copy of every session,
+# so without REDIS_URL sessions stay in the database alone.
+if REDIS_URL:
+    SESSION_ENGINE = "news_project.sessions"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -141,7 +173,64 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "users.User"
 
+# Permissions follow the role picked at login, kept in the session
+AUTHENTICATION_BACKENDS = ["users.backends.ActiveRoleBackend"]
+
+# Credential checks (login form and its AJAX helpers), as (limit, window in seconds):
+# requests per client IP, and failed passwords per username before it is locked out
+LOGIN_RATE_PER_IP = (20, 60)
+LOGIN_FAILURES_PER_USERNAME = (5, 300)
+# Request header (META key) a trusted reverse proxy puts the client address in, e.g.
+# HTTP_X_FORWARDED_FOR; unset when clients connect directly and REMOTE_ADDR is theirs
+CLIENT_IP_HEADER = os.environ.get("CLIENT_IP_HEADER") or None
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Channels notified when content is published: name -> handler delivering one OutboxMessage
+NOTIFICATION_CHANNELS = {
+    "email": "notifications.delivery.deliver_email",
+    "x": "notifications.delivery.deliver_x",
+    "webhook": "notifications.delivery.deliver_webhooks",
+}
+
+# Subscriber emails are sent one message per recipient, this many per SMTP connection
+NOTIFICATION_EMAIL_BATCH_SIZE = 500
+
+# X (Twitter) API used to announce new articles
+X_API_URL = os.environ.get("X_API_URL", "https://api.x.com/2/tweets")
+X_API_TOKEN = os.environ.get("X_API_TOKEN", "")
+X_API_CONNECT_TIMEOUT = 3.05
+X_API_READ_TIMEOUT = 10.0
+X_API_MAX_RETRIES = 3
+
+# Token bucket for X posts: sustained rate and largest burst. A backlog beyond
+# the available tokens is coalesced into one summary post per publisher.
+X_POSTS_PER_HOUR = 50
+X_POST_BURST = 5
+
+# Subscriber webhooks: POSTs in flight at once, connections per receiving host, and timeouts
+WEBHOOK_MAX_CONCURRENCY = 500
+WEBHOOK_CONNECTIONS_PER_HOST = 4
+WEBHOOK_CONNECT_TIMEOUT = 3.05
+WEBHOOK_READ_TIMEOUT = 10.0
+# Webhooks may only point at public addresses; enable to deliver to a local receiver in development
+WEBHOOK_ALLOW_PRIVATE_HOSTS = os.environ.get("WEBHOOK_ALLOW_PRIVATE_HOSTS", "False") == "True"
+
+# API clients authenticate with a session, HTTP Basic, or an APIToken ("Authorization: Token <key>")
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+        "api.authentication.TokenAuthentication",
+    ],
+}
+
+# Per-process cache of API token digests -> user ids: most entries kept, and seconds
+# an entry is trusted (how long a revoked token may keep working in other processes)
+API_TOKEN_CACHE_SIZE = 10_000
+API_TOKEN_CACHE_TTL = 60
+
+TEST_RUNNER = "news_project.testing.CacheIsolatingTestRunner"
+
 LOGIN_REDIRECT_URL = "/articles"
 LOGOUT_REDIRECT_URL = "/"
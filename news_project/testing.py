@@ -0,0 +1,83 @@
+"""
+Shared test helpers for the news_project.
+Provides assertions that keep the number of SQL queries per view fixed as data grows,
+and a test runner that isolates cached data between tests.
+"""
+import unittest
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+
+class CacheIsolatingResult(unittest.TextTestResult):
+    """
+    Test result that clears every configured cache before each test.
+    The test database reuses primary keys, so cached rows must not outlive the test that wrote them.
+    """
+
+    def startTest(self, test):
+        """
+        Clear all caches, then start the test.
+        """
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        super().startTest(test)
+
+
+class CacheIsolatingTestRunner(DiscoverRunner):
+    """
+    Test runner that uses CacheIsolatingResult.
+    """
+
+    def get_resultclass(self):
+        """
+        Return the result class, keeping Django's debug result classes when requested.
+        """
+        return super().get_resultclass() or CacheIsolatingResult
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for asserting per-view query budgets.
+    """
+
+    def count_queries(self, url):
+        """
+        Request a URL with the test client and return the response and the queries it ran.
+
+        Caches are cleared first, so the count is that of an uncached request, and
+        streaming responses are consumed inside the capture so their queries are counted.
+        """
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            if response.streaming:
+                response.content_bytes = b"".join(response.streaming_content)
+        return response, queries
+
+    def assertQueryBudget(self, url, budget, grow):
+        """
+        Assert that a view stays within a fixed query budget regardless of result size.
+
+        :param url: The URL to request.
+        :param budget: The maximum number of queries the view may run.
+        :param grow: Callable that adds more rows to the data the view lists.
+        """
+        response, small = self.count_queries(url)
+        self.assertEqual(response.status_code, 200)
+        grow()
+        response, large = self.count_queries(url)
+        self.assertEqual(response.status_code, 200)
+
+        captured = "\n".join(query["sql"] for query in large.captured_queries)
+        self.assertEqual(
+            len(small), len(large),
+            f"Query count for {url} grew with the result size:\n{captured}",
+        )
+        self.assertLessEqual(
+            len(large), budget,
+            f"{url} ran {len(large)} queries, budget is {budget}:\n{captured}",
+        )
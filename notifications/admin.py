@@ -1,7 +1,33 @@
 """
 Admin configuration for the notifications application.
-Registers notification-related models to the Django admin panel if necessary.
+Lets staff inspect queued, sent and failed outbox messages and webhook deliveries.
 """
 from django.contrib import admin
+from notifications.models import EmailFailure, OutboxMessage, WebhookDelivery
 
-# Register your models here.
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the OutboxMessage model.
+    """
+    list_display = ("channel", "status", "attempts", "available_at", "created_at")
+    list_filter = ("channel", "status")
+
+
+@admin.register(EmailFailure)
+class EmailFailureAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the EmailFailure model.
+    """
+    list_display = ("email", "message", "created_at")
+    search_fields = ("email",)
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the WebhookDelivery model.
+    """
+    list_display = ("subscription", "message", "status", "attempts", "response_status", "next_attempt_at")
+    list_filter = ("status",)
@@ -0,0 +1,93 @@
+"""
+Delivery handlers for outbox messages.
+Each handler sends one message on its channel and raises an exception when it should be retried.
+"""
+import logging
+
+from notifications.fanout import load_content, subscriber_chunks
+from notifications.leases import LeaseLost
+from notifications.mailer import send_individually
+from notifications.models import DigestItem, EmailFailure, OutboxMessage
+from notifications.webhooks import deliver_message
+from notifications.x_client import get_client
+
+logger = logging.getLogger(__name__)
+
+FROM_EMAIL = "no-reply@newsapp.local"
+
+
+def deliver_email(message):
+    """
+    Email a published article or newsletter to each subscriber of its publisher and author.
+
+    Readers who chose immediate emails get it now; the item is also queued for the
+    hourly and daily digests (see ``send_digests``). Recipients the mail server refuses
+    are stored as EmailFailure rows rather than retried, so the subscribers that were
+    reached are not emailed twice. Progress is saved after each chunk of subscribers,
+    so a retry after a crash or a lost lease resumes with the next chunk.
+    """
+    payload = message.payload
+    content = load_content(payload)
+    if content is None:
+        # Deleted since publication: nothing left to announce
+        return
+
+    DigestItem.objects.get_or_create(
+        content=content._meta.label_lower,
+        content_id=content.pk,
+        defaults={
+            "title": payload.get("title", payload["subject"]),
+            "message": payload["message"],
+            "author_id": content.author_id,
+            "publisher_id": content.publisher_id,
+        },
+    )
+
+    sent = failed = 0
+    seconds = 0.0
+    for last_reader_id, emails in subscriber_chunks(content, after=message.emailed_through):
+        report = send_individually(payload["subject"], payload["message"], emails, from_email=FROM_EMAIL)
+        EmailFailure.objects.bulk_create(
+            EmailFailure(message=message, email=email, error=error)
+            for email, error in report.failures
+        )
+        sent, failed, seconds = sent + report.sent, failed + report.failed, seconds + report.seconds
+        checkpoint = OutboxMessage.objects.filter(pk=message.pk, claimed_by=message.claimed_by)
+        if not checkpoint.update(emailed_through=last_reader_id):
+            raise LeaseLost(f"Outbox message {message.pk} was claimed by another worker")
+        message.emailed_through = last_reader_id
+    logger.info(
+        "Outbox message %s: emailed %d recipients (%d failed) in %.2fs", message.pk, sent, failed, seconds
+    )
+
+
+def post_x(text):
+    """
+    Post text to X.
+
+    XError propagates with the reason of the failure, so the message is retried later,
+    unless it is XUncertain: the post may be public already.
+    """
+    get_client().post(text)
+
+
+def deliver_x(message):
+    """
+    Post a single outbox message to X.
+    """
+    post_x(message.payload["text"])
+
+
+
+def deliver_webhooks(message):
+    """
+    POST a published article or newsletter to the webhooks of its subscribers.
+
+    Endpoints that fail are retried on their own schedule (see ``webhooks.retry_due``),
+    so the outbox message itself succeeds once every endpoint was tried.
+    """
+    results = deliver_message(message)
+    logger.info(
+        "Outbox message %s: webhook delivered to %d of %d endpoints",
+        message.pk, sum(result.ok for result in results), len(results),
+    )
@@ -0,0 +1,101 @@
+"""
+Hourly and daily email digests.
+Groups the items published since the last run per reader and sends each reader one email.
+"""
+from datetime import timedelta
+from itertools import groupby
+
+from django.db.models import Min, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from notifications.mailer import send_each
+from notifications.models import DigestItem, DigestRun
+from subscriptions.models import Subscription
+
+PERIODS = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+
+# Placeholders substituted per reader in the once-rendered email
+USERNAME_MARK = "\x00username\x00"
+ITEMS_MARK = "\x00items\x00"
+
+FROM_EMAIL = "no-reply@newsapp.local"
+
+
+def reader_items(frequency, items):
+    """
+    Yield ``(email, username, item_ids)`` for every reader on ``frequency`` subscribed to any item's source.
+
+    One query over subscriptions, ordered by reader, streamed and grouped on the fly.
+    """
+    by_publisher, by_author = {}, {}
+    for item in items:
+        if item.publisher_id:
+            by_publisher.setdefault(item.publisher_id, []).append(item.pk)
+        by_author.setdefault(item.author_id, []).append(item.pk)
+
+    rows = (
+        Subscription.objects.filter(reader__digest_frequency=frequency)
+        .filter(Q(publisher_id__in=list(by_publisher)) | Q(journalist_id__in=list(by_author)))
+        .exclude(reader__email="")
+        .order_by("reader_id")
+        .values_list("reader_id", "reader__email", "reader__username", "publisher_id", "journalist_id")
+    )
+    for _, group in groupby(rows.iterator(chunk_size=2000), key=lambda row: row[0]):
+        item_ids = set()
+        for _, email, username, publisher_id, journalist_id in group:
+            item_ids.update(by_publisher.get(publisher_id, ()))
+            item_ids.update(by_author.get(journalist_id, ()))
+        yield email, username, item_ids
+
+
+def build_digests(frequency, since, until):
+    """
+    Yield the ``(email, subject, body)`` digest of every reader on ``frequency``.
+
+    Each item and the surrounding email are rendered once; readers' emails are
+    assembled from those pieces without touching the template engine again.
+    """
+    items = list(
+        DigestItem.objects.filter(created_at__gt=since, created_at__lte=until).order_by("created_at", "id")
+    )
+    if not items:
+        return
+    rendered = {
+        item.pk: render_to_string("notifications/digest_item.txt", {"item": item})
+        for item in items
+    }
+    order = {item.pk: position for position, item in enumerate(items)}
+    shell = render_to_string("notifications/digest_email.txt", {
+        "username": USERNAME_MARK,
+        "frequency": frequency,
+        "items": ITEMS_MARK,
+    })
+
+    for email, username, item_ids in reader_items(frequency, items):
+        body = "".join(rendered[pk] for pk in sorted(item_ids, key=order.__getitem__))
+        subject = f"Your {frequency} digest: {len(item_ids)} new item{'s' if len(item_ids) != 1 else ''}"
+        yield email, subject, shell.replace(USERNAME_MARK, username).replace(ITEMS_MARK, body)
+
+
+def send_digests(frequency, now=None):
+    """
+    Send the digests of one frequency for the items published since its previous run.
+
+    Returns the mail report.
+    """
+    now = now or timezone.now()
+    run = DigestRun.objects.filter(frequency=frequency).first()
+    since = run.sent_until if run else now - PERIODS[frequency]
+
+    report = send_each(build_digests(frequency, since, now), from_email=FROM_EMAIL)
+    DigestRun.objects.update_or_create(frequency=frequency, defaults={"sent_until": now})
+
+    # Items every frequency has already covered are no longer needed
+    covered = DigestRun.objects.aggregate(until=Min("sent_until"))["until"]
+    if DigestRun.objects.count() == len(PERIODS):
+        DigestItem.objects.filter(created_at__lte=covered).delete()
+    return report
@@ -0,0 +1,151 @@
+"""
+Content fan-out engine shared by articles and newsletters.
+Turns a published item into one outbox message per configured channel and resolves its subscribers.
+"""
+import heapq
+from functools import lru_cache
+from itertools import groupby, islice
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from notifications.models import OutboxMessage
+from subscriptions.models import Subscription
+
+# Subscriptions, and reader emails, read per query by subscriber_chunks
+SUBSCRIBER_CHUNK_SIZE = 2000
+
+
+@lru_cache(maxsize=None)
+def get_handlers():
+    """
+    Return the delivery handler of each channel in NOTIFICATION_CHANNELS, keyed by channel name.
+
+    A handler is any callable taking the OutboxMessage to deliver; it raises to have the message retried.
+    """
+    return {
+        channel: import_string(path)
+        for channel, path in settings.NOTIFICATION_CHANNELS.items()
+    }
+
+
+@receiver(setting_changed)
+def reset_handlers(setting, **kwargs):
+    """
+    Forget the loaded handlers when NOTIFICATION_CHANNELS is overridden, e.g. in tests.
+    """
+    if setting == "NOTIFICATION_CHANNELS":
+        get_handlers.cache_clear()
+
+
+def content_payload(content):
+    """
+    Build the channel-independent payload describing a published article or newsletter.
+    """
+    kind = content._meta.verbose_name
+    return {
+        "content": content._meta.label_lower,
+        "content_id": content.pk,
+        "title": content.title,
+        "author_id": content.author_id,
+        "publisher_id": content.publisher_id,
+        "text": f"New {kind} published: {content.title}",
+        "subject": f"New {kind} published: {content.title}",
+        "message": content.body[:500],
+    }
+
+
+def publish(content):
+    """
+    Queue one outbox message per configured channel for a published article or newsletter.
+
+    Runs inside the publishing transaction (see ``content_published``).
+    """
+    payload = content_payload(content)
+    OutboxMessage.objects.bulk_create(
+        OutboxMessage(channel=channel, payload=payload) for channel in get_handlers()
+    )
+
+
+def publish_many(contents):
+    """
+    Queue the outbox messages of many published articles or newsletters with one INSERT per batch.
+    """
+    handlers = get_handlers()
+    OutboxMessage.objects.bulk_create(
+        (
+            OutboxMessage(channel=channel, payload=payload)
+            for payload in map(content_payload, contents)
+            for channel in handlers
+        ),
+        batch_size=1000,
+    )
+
+
+def load_content(payload):
+    """
+    Return the article or newsletter a payload refers to, or None if it was deleted since.
+    """
+    # Messages queued before newsletters were supported only carry an article_id
+    model = apps.get_model(payload.get("content", "articles.article"))
+    pk = payload.get("content_id", payload.get("article_id"))
+    return model.objects.only("author_id", "publisher_id").filter(pk=pk).first()
+
+
+def _subscriber_ids(after=0, **source):
+    """
+    Yield the ids of the readers subscribed to one source in ascending order, starting after ``after``.
+
+    Each query is a range scan of the subscription's (source, reader) index that picks up
+    after the last id read, so the whole list is read in a single pass.
+    """
+    subscriptions = Subscription.objects.filter(**source).order_by("reader_id").values_list("reader_id", flat=True)
+    while True:
+        chunk = list(subscriptions.filter(reader_id__gt=after)[:SUBSCRIBER_CHUNK_SIZE])
+        yield from chunk
+        if len(chunk) < SUBSCRIBER_CHUNK_SIZE:
+            return
+        after = chunk[-1]
+
+
+def subscriber_chunks(content, digest_frequency="immediate", after=0):
+    """
+    Yield ``(last reader id, emails)`` for each chunk of readers subscribed to a content's publisher or author.
+
+    The publisher's and the journalist's subscribers are read separately in reader id order
+    and merged, so a reader subscribed to both counts once; ``after`` resumes after a reader
+    id yielded before. Each chunk holds the distinct, non-empty emails of up to
+    SUBSCRIBER_CHUNK_SIZE readers with the given digest frequency. Memory stays flat
+    however many subscribers there are.
+    """
+    sources = [{"journalist_id": content.author_id}]
+    if content.publisher_id:
+        sources.append({"publisher_id": content.publisher_id})
+    merged = heapq.merge(*(_subscriber_ids(after, **source) for source in sources))
+    reader_ids = (reader_id for reader_id, _ in groupby(merged))
+
+    recipients = (
+        get_user_model().objects.filter(digest_frequency=digest_frequency)
+        .exclude(email="")
+        .exclude(email__isnull=True)
+        .values_list("email", flat=True)
+    )
+    while True:
+        chunk = list(islice(reader_ids, SUBSCRIBER_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk[-1], list(dict.fromkeys(recipients.filter(pk__in=chunk)))
+
+
+def subscriber_emails(content, digest_frequency="immediate"):
+    """
+    Stream the emails of readers subscribed to a content's publisher or author (see ``subscriber_chunks``).
+
+    Emails are distinct within a chunk; an address shared by accounts in different chunks repeats.
+    """
+    for _, emails in subscriber_chunks(content, digest_frequency):
+        yield from emails
@@ -0,0 +1,80 @@
+"""
+Leases on the rows a notification worker has claimed.
+Claimed rows carry a token naming the claim, and stay hidden from other workers while it is renewed.
+"""
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """
+    Raised when a worker finds a row it claimed held by another claim, after its lease ran out.
+    """
+
+
+def new_token():
+    """
+    Return a token identifying one claim.
+    """
+    return uuid.uuid4().hex
+
+
+class LeaseRenewer:
+    """
+    Extends the lease of claimed rows on a background thread, every third of the lease.
+
+    ``queryset`` must only match rows still held by the claim (filtered on its token),
+    so a worker that lost its claim never takes the rows back. Use it as a context
+    manager around the work; renewal stops when the block exits.
+    """
+
+    def __init__(self, queryset, field, lease):
+        """
+        :param field: Date field holding the end of the lease.
+        :param lease: Seconds each renewal extends the lease by.
+        """
+        self.queryset = queryset
+        self.field = field
+        self.lease = lease
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def renew(self):
+        """
+        Push the end of the lease ``lease`` seconds from now and return the number of rows still held.
+        """
+        return self.queryset.update(**{self.field: timezone.now() + timedelta(seconds=self.lease)})
+
+    def _run(self):
+        """
+        Renew until stopped, on the thread's own database connection.
+        """
+        try:
+            while not self.stopped.wait(self.lease / 3):
+                try:
+                    self.renew()
+                except DatabaseError:
+                    logger.exception("Could not renew a lease; retrying in %.0fs", self.lease / 3)
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        """
+        Start renewing.
+        """
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Stop renewing and wait for the thread to finish.
+        """
+        self.stopped.set()
+        self.thread.join()
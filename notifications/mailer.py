@@ -0,0 +1,105 @@
+"""
+Mass email delivery for subscriber notifications.
+Sends one message per recipient, reusing a single backend connection for each batch.
+"""
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+
+@dataclass
+class MailReport:
+    """
+    Outcome of a mass mailing: counts, elapsed time and the recipients that failed.
+    """
+    sent: int = 0
+    failures: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self):
+        """
+        Return the number of recipients that could not be emailed.
+        """
+        return len(self.failures)
+
+    @property
+    def rate(self):
+        """
+        Return the throughput in messages per second.
+        """
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+def batches(iterable, size):
+    """
+    Yield lists of at most ``size`` items from any iterable, without materializing it.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def send_individually(subject, message, recipients, from_email=None, batch_size=None):
+    """
+    Email ``message`` to each recipient separately, so no recipient sees another's address.
+
+    See send_each for batching and failure handling.
+    """
+    return send_each(
+        ((email, subject, message) for email in recipients),
+        from_email=from_email,
+        batch_size=batch_size,
+    )
+
+
+def send_each(messages, from_email=None, batch_size=None):
+    """
+    Send ``(email, subject, body)`` messages, one recipient per message.
+
+    Messages are processed in batches of ``batch_size`` (NOTIFICATION_EMAIL_BATCH_SIZE
+    by default), each over one backend connection. A recipient the server refuses is
+    recorded in the report's failures as ``(email, error)`` and the batch continues.
+    If no connection can be opened before anything was sent, the error is raised so the
+    whole mailing can be retried safely.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_EMAIL_BATCH_SIZE
+    report = MailReport()
+    start = time.perf_counter()
+
+    for batch in batches(messages, batch_size):
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            if not report.sent and not report.failures:
+                raise
+            report.failures.extend((email, f"{type(exc).__name__}: {exc}") for email, _, _ in batch)
+            continue
+
+        try:
+            for position, (email, subject, body) in enumerate(batch):
+                try:
+                    EmailMessage(
+                        subject, body, from_email, [email], connection=connection
+                    ).send()
+                    report.sent += 1
+                except Exception as exc:
+                    report.failures.append((email, f"{type(exc).__name__}: {exc}"))
+                    # The connection may be unusable after an error, start a fresh one
+                    try:
+                        connection.close()
+                        connection.open()
+                    except Exception as exc:
+                        report.failures.extend(
+                            (rest, f"{type(exc).__name__}: {exc}") for rest, _, _ in batch[position + 1:]
+                        )
+                        break
+        finally:
+            connection.close()
+
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,45 @@
+"""
+Management command delivering queued notifications from the outbox.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications import outbox, webhooks
+from notifications.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    """
+    Deliver due outbox messages concurrently, optionally polling for new ones.
+    """
+    help = "Deliver pending notifications (emails, X posts, webhooks) from the outbox and retry failed webhooks."
+
+    def add_arguments(self, parser):
+        """
+        Register the batch, concurrency and polling options.
+        """
+        parser.add_argument("--batch-size", type=int, default=100,
+                            help="Messages claimed per batch.")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Messages delivered in parallel.")
+        parser.add_argument("--poll", type=float, default=0,
+                            help="Keep running, checking for new messages every POLL seconds.")
+
+    def handle(self, *args, **options):
+        """
+        Drain the outbox once, or repeatedly when --poll is given.
+        """
+        while True:
+            sent, failed = outbox.drain(options["batch_size"], options["workers"])
+            hooks_sent, hooks_failed = webhooks.retry_due()
+            if sent or failed or hooks_sent or hooks_failed or not options["poll"]:
+                depth = outbox.queue_depth(OutboxMessage.X)
+                self.stdout.write(
+                    f"sent={sent} failed={failed} "
+                    f"x_queue_due={depth['due']} x_queue_scheduled={depth['scheduled']} "
+                    f"webhook_retries_sent={hooks_sent} webhook_retries_failed={hooks_failed}"
+                )
+            if not options["poll"]:
+                return
+            time.sleep(options["poll"])
@@ -0,0 +1,29 @@
+"""
+Management command sending the hourly or daily email digests.
+"""
+from django.core.management.base import BaseCommand
+
+from notifications.digests import PERIODS, send_digests
+
+
+class Command(BaseCommand):
+    """
+    Email every reader on the given frequency the items published since the previous run.
+    """
+    help = "Send hourly or daily digest emails. Schedule it with cron at the matching interval."
+
+    def add_arguments(self, parser):
+        """
+        Register the frequency argument.
+        """
+        parser.add_argument("frequency", choices=sorted(PERIODS))
+
+    def handle(self, *args, **options):
+        """
+        Build and send the digests, then print the delivery report.
+        """
+        report = send_digests(options["frequency"])
+        self.stdout.write(
+            f"sent={report.sent} failed={report.failed} "
+            f"seconds={report.seconds:.2f} rate={report.rate:.0f}/s"
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.27 on 2026-10-18 02:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailFailure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('error', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_failures', to='notifications.outboxmessage')),
+            ],
+        ),
+    ]
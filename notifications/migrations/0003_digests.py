@@ -0,0 +1,42 @@
+# Generated by Django 4.2.27 on 2026-10-18 03:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_email_failure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(max_length=10, unique=True)),
+                ('sent_until', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.CharField(max_length=100)),
+                ('content_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField(blank=True)),
+                ('author_id', models.PositiveBigIntegerField()),
+                ('publisher_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='digest_item_created_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='digestitem',
+            constraint=models.UniqueConstraint(fields=('content', 'content_id'), name='unique_digest_item'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_token_bucket_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_outbox_claim_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='emailed_through',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 05:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0007_email_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookdelivery',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -1,7 +1,188 @@
 """
 Models for the notifications application.
-Currently acts as a placeholder or stores notification history if implemented.
+Stores outgoing notifications in an outbox so they are delivered after, not during, the request that caused them.
 """
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class OutboxMessage(models.Model):
+    """
+    A notification waiting to be delivered on one channel.
+
+    Rows are written in the same transaction as the change that triggers them and
+    are delivered by the ``drain_outbox`` management command.
+    """
+    EMAIL = "email"
+    X = "x"
+    WEBHOOK = "webhook"
+    CHANNEL_CHOICES = [
+        (EMAIL, "Email"),
+        (X, "X"),
+        (WEBHOOK, "Webhook"),
+    ]
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES)
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+
+    # Earliest time a worker may (re)try the message; while claimed, the end of the lease
+    available_at = models.DateTimeField(default=timezone.now)
+    # Token of the claim holding the message (see notifications.leases)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    # Last subscriber (reader id) an email delivery got through; a retry resumes after it
+    emailed_through = models.PositiveBigIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        """
+        Return the channel and status of the message.
+        """
+        return f"{self.channel} #{self.pk} ({self.status})"
+
+
+class EmailFailure(models.Model):
+    """
+    A recipient that could not be emailed during the delivery of an outbox message.
+    """
+    message = models.ForeignKey(
+        OutboxMessage,
+        on_delete=models.CASCADE,
+        related_name="email_failures",
+    )
+    email = models.EmailField()
+    error = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    def __str__(self):
+        """
+        Return the failed recipient address.
+        """
+        return self.email
+
+
+class DigestItem(models.Model):
+    """
+    A published article or newsletter waiting to be included in hourly and daily digests.
+
+    One row per item, not per reader: readers are matched to items through their
+    subscriptions when the digests are built.
+    """
+    content = models.CharField(max_length=100)
+    content_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    message = models.TextField(blank=True)
+
+    author_id = models.PositiveBigIntegerField()
+    publisher_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["content", "content_id"], name="unique_digest_item"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"], name="digest_item_created_idx"),
+        ]
+
+    def __str__(self):
+        """
+        Return the title of the item.
+        """
+        return self.title
+
+
+class DigestRun(models.Model):
+    """
+    Records up to when the digests of one frequency have been sent.
+    """
+    frequency = models.CharField(max_length=10, unique=True)
+    sent_until = models.DateTimeField()
+
+    def __str__(self):
+        """
+        Return the frequency and the end of the covered period.
+        """
+        return f"{self.frequency} until {self.sent_until:%Y-%m-%d %H:%M}"
+
+
+class WebhookDelivery(models.Model):
+    """
+    A webhook POST that failed and is scheduled for another attempt, or gave up.
+
+    Endpoints that accept the first attempt leave no row, so announcing an item to
+    thousands of webhooks writes rows only for the ones that failed.
+    """
+    PENDING = "pending"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (FAILED, "Failed"),
+    ]
+
+    message = models.ForeignKey(
+        OutboxMessage,
+        on_delete=models.CASCADE,
+        related_name="webhook_deliveries",
+    )
+    subscription = models.ForeignKey(
+        "subscriptions.Subscription",
+        on_delete=models.CASCADE,
+        related_name="webhook_deliveries",
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=1)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Token of the claim retrying the delivery (see notifications.leases)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="webhook_due_idx"),
+        ]
+
+    def __str__(self):
+        """
+        Return the subscription and status of the delivery.
+        """
+        return f"webhook #{self.message_id} → {self.subscription_id} ({self.status})"
+
+
+class TokenBucketState(models.Model):
+    """
+    The shared state of a named token bucket (see notifications.social.StoredTokenBucket).
+
+    ``updated`` is a Unix timestamp, so every worker process and cron run refills from the same clock.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField()
+    updated = models.FloatField()
+
+    def __str__(self):
+        """
+        Return the name and level of the bucket.
+        """
+        return f"{self.name}: {self.tokens:.2f} tokens"
@@ -0,0 +1,208 @@
+"""
+Transactional outbox for notifications.
+Messages are written inside the triggering transaction (see notifications.fanout) and drained later by worker processes.
+"""
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from notifications.delivery import post_x
+from notifications.fanout import get_handlers
+from notifications.leases import LeaseRenewer, new_token
+from notifications.models import OutboxMessage
+from notifications.social import coalesce, get_bucket
+
+logger = logging.getLogger(__name__)
+
+# Attempts after which a message is marked failed instead of retried
+MAX_ATTEMPTS = 5
+
+# Retry delays grow as BACKOFF_BASE * 2**(attempts - 1) seconds, up to BACKOFF_MAX
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+
+# How long a claimed message is hidden from other workers, in seconds. The lease is
+# renewed while the message is delivered; a worker that dies leaves it to be retried after this.
+LEASE = 300
+
+
+def claim(limit, channels):
+    """
+    Lease up to ``limit`` due messages of the given channels to the calling worker.
+
+    Rows locked by another worker are skipped, so concurrent workers never claim the same
+    message. The messages are marked with a new claim token, checked by ``record``.
+    """
+    now = timezone.now()
+    token = new_token()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxMessage.PENDING, available_at__lte=now, channel__in=channels)
+            .order_by("available_at", "id")[:limit]
+        )
+        for message in messages:
+            message.attempts += 1
+            message.available_at = now + timedelta(seconds=LEASE)
+            message.claimed_by = token
+        OutboxMessage.objects.bulk_update(messages, ["attempts", "available_at", "claimed_by"])
+    return messages
+
+
+def held(messages):
+    """
+    Return the claimed messages that are still pending and held by their claim.
+    """
+    return OutboxMessage.objects.filter(
+        pk__in=[message.pk for message in messages],
+        claimed_by__in={message.claimed_by for message in messages},
+        status=OutboxMessage.PENDING,
+    )
+
+
+def keep_leased(messages):
+    """
+    Return a context manager renewing the lease of claimed messages while they are delivered.
+    """
+    return LeaseRenewer(held(messages), "available_at", LEASE)
+
+
+def backoff(attempts):
+    """
+    Return the delay before retrying a message that failed ``attempts`` times, with jitter.
+    """
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def release(messages, delay):
+    """
+    Hand claimed messages back without counting an attempt, to be retried after ``delay`` seconds.
+    """
+    available_at = timezone.now() + timedelta(seconds=delay)
+    for message in messages:
+        held([message]).update(attempts=message.attempts - 1, available_at=available_at)
+
+
+def attempt(func, *args):
+    """
+    Call a delivery function and return None on success or the error description on failure,
+    with whether the failure may be retried.
+
+    Exceptions with a false ``retryable`` attribute (see XUncertain) are not retried.
+    """
+    try:
+        func(*args)
+        return None, True
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}", getattr(exc, "retryable", True)
+    finally:
+        # Handlers run in worker threads, each with its own connection
+        close_old_connections()
+
+
+def deliver(message):
+    """
+    Run the channel handler of one message.
+
+    Returns the outcome as ``attempt`` does.
+    """
+    return attempt(get_handlers()[message.channel], message)
+
+
+def record(message, error, retryable=True):
+    """
+    Store the outcome of a delivery attempt and return whether it was stored.
+
+    Nothing is stored once the message is held by another claim: the lease ran out
+    and another worker now delivers it.
+    """
+    now = timezone.now()
+    if error is None:
+        fields = {"status": OutboxMessage.SENT, "sent_at": now, "last_error": ""}
+    elif not retryable or message.attempts >= MAX_ATTEMPTS:
+        fields = {"status": OutboxMessage.FAILED, "last_error": error}
+    else:
+        fields = {"last_error": error, "available_at": now + backoff(message.attempts)}
+    if not held([message]).update(**fields):
+        logger.warning("Outbox message %s is no longer held by this worker, outcome not stored", message.pk)
+        return False
+    for name, value in fields.items():
+        setattr(message, name, value)
+    return True
+
+
+def drain(batch_size=100, workers=4):
+    """
+    Deliver due messages until none are left.
+
+    Each claimed batch is delivered concurrently on ``workers`` threads; X posts go
+    through drain_x. Returns the number of messages sent and failed during this run.
+    """
+    sent = failed = 0
+    channels = [channel for channel in get_handlers() if channel != OutboxMessage.X]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            messages = claim(batch_size, channels)
+            if not messages:
+                break
+            with keep_leased(messages):
+                outcomes = list(executor.map(deliver, messages))
+            for message, (error, retryable) in zip(messages, outcomes):
+                record(message, error, retryable)
+                if error is None:
+                    sent += 1
+                else:
+                    failed += 1
+
+    if OutboxMessage.X not in get_handlers():
+        return sent, failed
+    x_sent, x_failed = drain_x(batch_size)
+    return sent + x_sent, failed + x_failed
+
+
+def drain_x(batch_size=100):
+    """
+    Post due X messages within the token bucket's rate.
+
+    When more messages are due than there are tokens, the backlog is coalesced into one
+    post per publisher. Posts that find the bucket empty are released until a token is due.
+    Returns the number of messages sent and failed.
+    """
+    sent = failed = 0
+    bucket = get_bucket()
+    while bucket.available() >= 1:
+        messages = claim(batch_size, [OutboxMessage.X])
+        if not messages:
+            break
+        if len(messages) > bucket.available():
+            posts = coalesce(messages)
+        else:
+            posts = [(message.payload["text"], [message]) for message in messages]
+
+        with keep_leased(messages):
+            for text, group in posts:
+                if not bucket.try_acquire():
+                    release(group, bucket.wait_time())
+                    continue
+                error, retryable = attempt(post_x, text)
+                for message in group:
+                    record(message, error, retryable)
+                if error is None:
+                    sent += len(group)
+                else:
+                    failed += len(group)
+    return sent, failed
+
+
+def queue_depth(channel):
+    """
+    Return the number of pending messages of a channel: due now and scheduled for later.
+    """
+    pending = OutboxMessage.objects.filter(channel=channel, status=OutboxMessage.PENDING)
+    due = pending.filter(available_at__lte=timezone.now()).count()
+    return {"due": due, "scheduled": pending.count() - due}
@@ -1,68 +1,29 @@
 """
 Signal handlers for the notifications application.
-Automates email alerts and social media posts when articles transition to an approved state.
+Queues subscriber notifications on every configured channel when articles and newsletters are published.
 """
-from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from articles.models import Article
-from subscriptions.models import Subscription
-from notifications.x_client import post_to_x
+from articles.models import Article, Newsletter
+from articles.signals import content_bulk_published, content_published
+from notifications.fanout import publish, publish_many
 
 
-@receiver(pre_save, sender=Article)
-def track_article_state(sender, instance, **kwargs):
+@receiver(content_published, sender=Article)
+@receiver(content_published, sender=Newsletter)
+def on_content_published(sender, instance, **kwargs):
     """
-    Track the previous approval state of the article before saving.
+    Handles side effects when an article or newsletter is published.
+    Queues one outbox message per channel (email, X, ...); ``drain_outbox`` delivers them.
+    ``content_published`` is sent once per item, inside the publishing transaction,
+    so the messages exist only if the publication commits.
     """
-    if instance.pk:
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            instance._was_approved = old_instance.approved
-        except sender.DoesNotExist:
-            instance._was_approved = False
-    else:
-        instance._was_approved = False
+    publish(instance)
 
 
-@receiver(post_save, sender=Article)
-def on_article_approved(sender, instance, created, **kwargs):
+@receiver(content_bulk_published, sender=Article)
+@receiver(content_bulk_published, sender=Newsletter)
+def on_content_bulk_published(sender, instances, **kwargs):
     """
-    Handles side effects when an article is approved.
-    Sends email notifications to subscribers and posts to X.
-    Only triggers when the status actually changes to Approved.
+    Queues the messages of a bulk approval in one batched insert.
     """
-    # Check if currently approved
-    if not instance.approved:
-        return
-
-    # Check if it was ALREADY approved before this save
-    # If it was, we don't want to re-send notifications (e.g. typo edit)
-    if getattr(instance, "_was_approved", False):
-        return
-
-    post_to_x(f"New article published: {instance.title}")
-
-    # Fetch subscribers:
-    # - subscribers to the publisher
-    # - subscribers to the journalist (author)
-    subs = Subscription.objects.filter(
-        publisher=instance.publisher
-    ) | Subscription.objects.filter(
-        journalist=instance.author
-    )
-
-    emails = {
-        sub.reader.email
-        for sub in subs
-        if sub.reader.email
-    }
-
-    if emails:
-        send_mail(
-            subject=f"New article published: {instance.title}",
-            message=instance.body[:500],
-            from_email="no-reply@newsapp.local",
-            recipient_list=list(emails),
-            fail_silently=True,
-        )
+    publish_many(instances)
@@ -0,0 +1,145 @@
+"""
+Rate limiting and burst coalescing for social media posts.
+Keeps X posts within the platform's limits and merges a backlog into per-publisher summary posts.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+from notifications.models import TokenBucketState
+from publishers.models import Publisher
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to ``capacity`` tokens, refilled at ``rate`` tokens per second.
+
+    Thread-safe. This bucket lives in the process; StoredTokenBucket shares one between processes.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum tokens, i.e. the largest burst allowed.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        """
+        Add the tokens earned since the last update.
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the bucket's state for one operation.
+        """
+        with self.lock:
+            yield
+
+    def available(self):
+        """
+        Return the number of whole tokens currently available.
+        """
+        with self._locked():
+            self._refill()
+            return int(self.tokens)
+
+    def try_acquire(self):
+        """
+        Take one token if available and return whether it was taken.
+        """
+        with self._locked():
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def wait_time(self):
+        """
+        Return the seconds until the next token is available.
+        """
+        with self._locked():
+            self._refill()
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class StoredTokenBucket(TokenBucket):
+    """
+    Token bucket whose state is a TokenBucketState row, shared by every process.
+
+    Each operation locks the row for the length of a transaction, so concurrent
+    ``drain_outbox`` workers take tokens one at a time, and runs started from cron
+    continue from the level the previous run left instead of a full bucket.
+    """
+
+    def __init__(self, name, rate, capacity, clock=time.time):
+        """
+        :param name: Identifies the bucket's row.
+        :param clock: Wall clock shared by the processes (Unix seconds).
+        """
+        super().__init__(rate, capacity, clock)
+        self.name = name
+
+    @contextmanager
+    def _locked(self):
+        """
+        Load the bucket's row under a lock and write back what the operation changed.
+        """
+        with self.lock, transaction.atomic():
+            state, _ = TokenBucketState.objects.select_for_update().get_or_create(
+                name=self.name, defaults={"tokens": self.capacity, "updated": self.clock()}
+            )
+            self.tokens, self.updated = state.tokens, state.updated
+            yield
+            if (self.tokens, self.updated) != (state.tokens, state.updated):
+                TokenBucketState.objects.filter(pk=state.pk).update(tokens=self.tokens, updated=self.updated)
+
+
+def get_bucket():
+    """
+    Return the bucket of X posts, shared by all workers, configured by X_POSTS_PER_HOUR and X_POST_BURST.
+    """
+    return StoredTokenBucket("x", settings.X_POSTS_PER_HOUR / 3600, settings.X_POST_BURST)
+
+
+def coalesce(messages):
+    """
+    Merge X outbox messages into one post per publisher.
+
+    Returns a list of ``(text, messages)`` pairs. A publisher with a single message keeps
+    its own text; several are summarized as "N new articles from Publisher: title; title"
+    ("newsletters" or "posts" when the group holds newsletters or both kinds).
+    """
+    groups = defaultdict(list)
+    for message in messages:
+        groups[message.payload.get("publisher_id")].append(message)
+
+    names = dict(
+        Publisher.objects.filter(id__in=[pk for pk in groups if pk]).values_list("id", "name")
+    )
+    posts = []
+    for publisher_id, group in groups.items():
+        if len(group) == 1:
+            posts.append((group[0].payload["text"], group))
+            continue
+        source = f" from {names[publisher_id]}" if publisher_id in names else ""
+        kinds = {message.payload.get("content", "articles.article") for message in group}
+        kind = apps.get_model(kinds.pop())._meta.verbose_name_plural if len(kinds) == 1 else "posts"
+        titles = "; ".join(message.payload.get("title", "") for message in group)
+        posts.append((f"{len(group)} new {kind}{source}: {titles}", group))
+    return posts
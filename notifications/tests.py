@@ -2,6 +2,803 @@
 Tests for the notifications application.
 Verifies that signals correctly trigger email and 3rd-party platform notifications on approval.
 """
-from django.test import TestCase
+import socket
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from articles.models import Article, Newsletter
+from notifications import digests, outbox, webhooks
+from notifications.delivery import deliver_email, deliver_webhooks
+from notifications.fanout import content_payload, publish, subscriber_chunks, subscriber_emails
+from notifications.leases import LeaseLost
+from notifications.mailer import send_individually
+from notifications.social import StoredTokenBucket, TokenBucket
+from notifications.models import DigestItem, DigestRun, EmailFailure, OutboxMessage, WebhookDelivery
+from notifications.x_client import CircuitBreaker, XCircuitOpen, XClient, XError, XUncertain
+from notifications.webhook_receiver import FakeWebhookReceiver
+from notifications.x_stub import StubXServer
+from publishers.models import Publisher
+from subscriptions.models import Subscription
+
+User = get_user_model()
+
+
+def create_pending_article():
+    """
+    Create an editor and a pending article whose publisher has one email subscriber.
+    """
+    editor = User.objects.create_user(username="editor", password="pw", role="editor")
+    journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+    reader = User.objects.create_user(
+        username="reader", password="pw", role="reader", email="reader@example.com"
+    )
+    publisher = Publisher.objects.create(name="Test Publisher")
+    Subscription.objects.create(reader=reader, publisher=publisher)
+    article = Article.objects.create(
+        title="Breaking", body="Body", author=journalist, publisher=publisher
+    )
+    return editor, article
+
+
+class RefusingEmailBackend(EmailBackend):
+    """
+    In-memory email backend that counts opened connections and refuses addresses at refused.example.
+    """
+    opened = 0
+
+    def open(self):
+        """
+        Count the connection.
+        """
+        RefusingEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        """
+        Refuse messages addressed to the refused.example domain.
+        """
+        for message in messages:
+            if any(address.endswith("@refused.example") for address in message.to):
+                raise ValueError(f"recipient refused: {message.to[0]}")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="notifications.tests.RefusingEmailBackend")
+class MailerTest(SimpleTestCase):
+    """
+    Test suite for per-recipient mass mailing.
+    """
+    def setUp(self):
+        """
+        Reset the connection counter.
+        """
+        RefusingEmailBackend.opened = 0
+
+    def test_one_message_per_recipient_and_connection_per_batch(self):
+        """
+        Test that every recipient gets their own message and each batch opens one connection.
+        """
+        recipients = [f"reader{i}@example.com" for i in range(5)]
+        report = send_individually("Subject", "Body", iter(recipients), batch_size=2)
+        self.assertEqual(report.sent, 5)
+        self.assertEqual(report.failures, [])
+        self.assertEqual([message.to for message in mail.outbox], [[email] for email in recipients])
+        self.assertEqual(RefusingEmailBackend.opened, 3)
+        self.assertGreater(report.rate, 0)
+
+    def test_refused_recipient_is_recorded_and_batch_continues(self):
+        """
+        Test that a refused recipient is reported without stopping delivery to the others.
+        """
+        recipients = ["a@example.com", "b@refused.example", "c@example.com"]
+        report = send_individually("Subject", "Body", recipients, batch_size=10)
+        self.assertEqual(report.sent, 2)
+        self.assertEqual([email for email, _ in report.failures], ["b@refused.example"])
+        self.assertIn("recipient refused", report.failures[0][1])
+
+
+class SubscriberEmailsTest(TestCase):
+    """
+    Test suite for resolving the recipients of an approval email.
+    """
+    def setUp(self):
+        """
+        Create a journalist, a publisher and readers with various subscriptions.
+        """
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+
+        def reader(name, email, **subscription):
+            user = User.objects.create_user(username=name, password="pw", role="reader", email=email)
+            Subscription.objects.create(reader=user, **subscription)
+            return user
+
+        both = reader("both", "both@example.com", publisher=self.publisher)
+        Subscription.objects.create(reader=both, journalist=self.journalist)
+        reader("publisher_only", "publisher@example.com", publisher=self.publisher)
+        reader("journalist_only", "journalist@example.com", journalist=self.journalist)
+        reader("no_email", "", publisher=self.publisher)
+        reader("other", "other@example.com", publisher=Publisher.objects.create(name="Other"))
+
+    def test_distinct_non_empty_emails_in_one_pass(self):
+        """
+        Test that each source is read once and the recipients once, without duplicates or blank addresses.
+        """
+        article = Article.objects.create(
+            title="A", body="B", author=self.journalist, publisher=self.publisher
+        )
+        with self.assertNumQueries(3):
+            emails = sorted(subscriber_emails(article))
+        self.assertEqual(
+            emails, ["both@example.com", "journalist@example.com", "publisher@example.com"]
+        )
+
+    def test_chunks_resume_after_the_last_reader(self):
+        """
+        Test that chunks follow reader ids across query boundaries, and resume after a given reader.
+        """
+        article = Article.objects.create(
+            title="A", body="B", author=self.journalist, publisher=self.publisher
+        )
+        with mock.patch("notifications.fanout.SUBSCRIBER_CHUNK_SIZE", 2):
+            chunks = list(subscriber_chunks(article))
+            self.assertEqual(len(chunks), 2)
+            self.assertEqual(
+                sorted(email for _, emails in chunks for email in emails),
+                ["both@example.com", "journalist@example.com", "publisher@example.com"],
+            )
+            resumed = list(subscriber_chunks(article, after=chunks[0][0]))
+        self.assertEqual(resumed, chunks[1:])
+
+    def test_email_delivery_resumes_after_the_last_chunk_sent(self):
+        """
+        Test that an email delivery saves its progress per chunk and a retry skips the chunks already sent.
+        """
+        article = Article.objects.create(
+            title="A", body="B", author=self.journalist, publisher=self.publisher
+        )
+        message = OutboxMessage.objects.create(channel=OutboxMessage.EMAIL, payload=content_payload(article))
+        with mock.patch("notifications.fanout.SUBSCRIBER_CHUNK_SIZE", 2):
+            (first, _), (last, second) = subscriber_chunks(article)
+            message.emailed_through = first
+            deliver_email(message)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(second))
+        self.assertEqual(OutboxMessage.objects.get().emailed_through, last)
+
+    def test_email_delivery_stops_when_claimed_by_another_worker(self):
+        """
+        Test that a worker whose claim was taken over stops after the chunk in flight.
+        """
+        article = Article.objects.create(
+            title="A", body="B", author=self.journalist, publisher=self.publisher
+        )
+        message = OutboxMessage.objects.create(
+            channel=OutboxMessage.EMAIL, payload=content_payload(article), claimed_by="stale"
+        )
+        OutboxMessage.objects.update(claimed_by="current")
+        with mock.patch("notifications.fanout.SUBSCRIBER_CHUNK_SIZE", 2), self.assertRaises(LeaseLost):
+            deliver_email(message)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboxMessage.objects.get().emailed_through, 0)
+
+    def test_independent_article_reaches_only_journalist_subscribers(self):
+        """
+        Test that an article without a publisher is not sent to every journalist-only subscription.
+        """
+        other_journalist = User.objects.create_user(username="other_journalist", password="pw", role="journalist")
+        article = Article.objects.create(title="A", body="B", author=other_journalist, is_independent=True)
+        self.assertEqual(list(subscriber_emails(article)), [])
+
+        article = Article.objects.create(title="A", body="B", author=self.journalist, is_independent=True)
+        self.assertEqual(sorted(subscriber_emails(article)), ["both@example.com", "journalist@example.com"])
+
+
+class ContentFanOutTest(TestCase):
+    """
+    Test suite for the fan-out engine shared by articles and newsletters.
+    """
+    def setUp(self):
+        """
+        Create a journalist and a publisher with a reader subscribed to both.
+        """
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        reader = User.objects.create_user(username="reader", password="pw", role="reader", email="reader@example.com")
+        Subscription.objects.create(reader=reader, publisher=self.publisher)
+        Subscription.objects.create(reader=reader, journalist=self.journalist)
+
+    def test_newsletter_approval_is_delivered_once_per_reader(self):
+        """
+        Test that approving a newsletter queues every channel and emails a doubly subscribed reader once.
+        """
+        newsletter = Newsletter.objects.create(
+            title="Weekly", body="Body", author=self.journalist, publisher=self.publisher
+        )
+        newsletter.approve(self.editor)
+        messages = {message.channel: message for message in OutboxMessage.objects.all()}
+        self.assertEqual(set(messages), {OutboxMessage.EMAIL, OutboxMessage.X, OutboxMessage.WEBHOOK})
+        self.assertEqual(messages[OutboxMessage.X].payload["text"], "New newsletter published: Weekly")
+
+        deliver_email(messages[OutboxMessage.EMAIL])
+        self.assertEqual([message.to for message in mail.outbox], [["reader@example.com"]])
+        self.assertEqual(mail.outbox[0].subject, "New newsletter published: Weekly")
+
+    def test_independent_content_is_published_on_creation(self):
+        """
+        Test that independent content is announced when created, and not again when edited.
+        """
+        newsletter = Newsletter.objects.create(
+            title="Solo", body="Body", author=self.journalist, is_independent=True
+        )
+        newsletter.title = "Solo (edited)"
+        newsletter.save()
+        self.assertEqual(OutboxMessage.objects.count(), 3)
+
+    @override_settings(NOTIFICATION_CHANNELS={"email": "notifications.delivery.deliver_email"})
+    def test_channels_are_configurable(self):
+        """
+        Test that only the channels listed in NOTIFICATION_CHANNELS receive messages.
+        """
+        Article.objects.create(title="A", body="B", author=self.journalist, is_independent=True)
+        self.assertEqual(list(OutboxMessage.objects.values_list("channel", flat=True)), [OutboxMessage.EMAIL])
+
+
+class DigestTest(TestCase):
+    """
+    Test suite for hourly and daily digests.
+    """
+    def setUp(self):
+        """
+        Create readers with each email preference and publish two articles.
+        """
+        editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        publisher = Publisher.objects.create(name="Test Publisher")
+        other = Publisher.objects.create(name="Other")
+
+        def reader(name, frequency, *sources):
+            user = User.objects.create_user(
+                username=name, password="pw", role="reader",
+                email=f"{name}@example.com", digest_frequency=frequency,
+            )
+            for source in sources:
+                Subscription.objects.create(reader=user, **source)
+
+        reader("instant", "immediate", {"publisher": publisher})
+        reader("hourly", "hourly", {"publisher": publisher}, {"journalist": journalist})
+        reader("unrelated", "hourly", {"publisher": other})
+        reader("daily", "daily", {"journalist": journalist})
+
+        for title in ("First & foremost", "Second"):
+            article = Article.objects.create(title=title, body="Body", author=journalist, publisher=publisher)
+            article.approve(editor)
+        for message in OutboxMessage.objects.filter(channel=OutboxMessage.EMAIL):
+            deliver_email(message)
+
+    def test_only_immediate_readers_are_emailed_at_publication(self):
+        """
+        Test that digest readers get no per-article email and the items are queued once.
+        """
+        self.assertEqual({tuple(m.to) for m in mail.outbox}, {("instant@example.com",)})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(DigestItem.objects.count(), 2)
+
+    def test_hourly_digest_groups_items_per_reader(self):
+        """
+        Test that each hourly reader gets one email listing their items, rendered from templates once.
+        """
+        mail.outbox = []
+        with mock.patch("notifications.digests.render_to_string", wraps=digests.render_to_string) as render:
+            report = digests.send_digests("hourly")
+        self.assertEqual(render.call_count, 3)
+        self.assertEqual(report.sent, 1)
+        digest = mail.outbox[0]
+        self.assertEqual(digest.to, ["hourly@example.com"])
+        self.assertEqual(digest.subject, "Your hourly digest: 2 new items")
+        self.assertIn("Hello hourly,", digest.body)
+        self.assertIn("* First & foremost", digest.body)
+        self.assertEqual(digest.body.count("* Second"), 1)
+
+        # The next run only covers what was published since
+        self.assertEqual(digests.send_digests("hourly").sent, 0)
+        self.assertTrue(DigestRun.objects.filter(frequency="hourly").exists())
+
+    def test_items_are_pruned_once_every_frequency_sent_them(self):
+        """
+        Test that digest items are deleted after both the hourly and daily digests covered them.
+        """
+        digests.send_digests("hourly")
+        self.assertEqual(DigestItem.objects.count(), 2)
+        digests.send_digests("daily")
+        self.assertEqual(DigestItem.objects.count(), 0)
+
+
+class OutboxEnqueueTest(TestCase):
+    """
+    Test suite for queuing notifications on approval.
+    """
+    def test_approval_queues_without_delivering(self):
+        """
+        Test that approving writes one email and one X message and contacts neither service.
+        """
+        editor, article = create_pending_article()
+        with mock.patch("notifications.delivery.get_client") as get_client:
+            article.approve(editor)
+        get_client.assert_not_called()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(OutboxMessage.objects.values_list("channel", flat=True)),
+            [OutboxMessage.EMAIL, OutboxMessage.WEBHOOK, OutboxMessage.X],
+        )
+
+    def test_edit_after_approval_queues_nothing(self):
+        """
+        Test that saving an already approved article does not queue notifications again.
+        """
+        editor, article = create_pending_article()
+        article.approve(editor)
+        article.title = "Breaking (updated)"
+        article.save()
+        self.assertEqual(OutboxMessage.objects.count(), 3)
+
+
+class OutboxDrainTest(TransactionTestCase):
+    """
+    Test suite for the drain_outbox worker.
+    Uses committed transactions because messages are delivered on worker threads.
+    """
+    def setUp(self):
+        """
+        Give each test its own full X rate limiter.
+        """
+        patcher = mock.patch("notifications.outbox.get_bucket", return_value=TokenBucket(1, 10))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_drain_delivers_messages(self):
+        """
+        Test that draining emails subscribers, posts to X and marks both messages sent.
+        """
+        editor, article = create_pending_article()
+        article.approve(editor)
+        with mock.patch("notifications.delivery.get_client") as get_client:
+            call_command("drain_outbox", workers=2, stdout=mock.MagicMock())
+        get_client().post.assert_called_once_with("New article published: Breaking")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["reader@example.com"])
+        self.assertFalse(OutboxMessage.objects.exclude(status=OutboxMessage.SENT).exists())
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.RefusingEmailBackend")
+    def test_refused_recipients_are_stored(self):
+        """
+        Test that recipients refused during an email delivery are stored as EmailFailure rows.
+        """
+        editor, article = create_pending_article()
+        refused = User.objects.create_user(
+            username="refused", password="pw", role="reader", email="reader@refused.example"
+        )
+        Subscription.objects.create(reader=refused, publisher=article.publisher)
+        article.approve(editor)
+        with mock.patch("notifications.delivery.get_client"):
+            outbox.drain(workers=2)
+        self.assertEqual([message.to for message in mail.outbox], [["reader@example.com"]])
+        failure = EmailFailure.objects.get()
+        self.assertEqual(failure.email, "reader@refused.example")
+        self.assertEqual(failure.message.status, OutboxMessage.SENT)
+
+    def test_failures_are_retried_then_marked_failed(self):
+        """
+        Test that a failed delivery is rescheduled with backoff until MAX_ATTEMPTS is reached.
+        """
+        message = OutboxMessage.objects.create(channel=OutboxMessage.X, payload={"text": "hello"})
+        with mock.patch("notifications.delivery.get_client") as get_client:
+            get_client().post.side_effect = XError("HTTP 503: unavailable")
+            self.assertEqual(outbox.drain(workers=2), (0, 1))
+            message.refresh_from_db()
+            self.assertEqual(message.status, OutboxMessage.PENDING)
+            self.assertEqual(message.attempts, 1)
+            self.assertEqual(message.last_error, "XError: HTTP 503: unavailable")
+
+            # Not due yet: a second drain leaves it alone
+            self.assertEqual(outbox.drain(workers=2), (0, 0))
+
+            OutboxMessage.objects.update(attempts=outbox.MAX_ATTEMPTS - 1, available_at=message.created_at)
+            outbox.drain(workers=2)
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.FAILED)
+
+
+    def test_uncertain_posts_are_not_retried(self):
+        """
+        Test that a post which may have been published is marked failed at once.
+        """
+        message = OutboxMessage.objects.create(channel=OutboxMessage.X, payload={"text": "hello"})
+        with mock.patch("notifications.delivery.get_client") as get_client:
+            get_client().post.side_effect = XUncertain("ReadTimeout")
+            self.assertEqual(outbox.drain(workers=2), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.FAILED, 1))
+
+    def test_lease_is_renewed_while_delivering(self):
+        """
+        Test that a claimed message stays hidden from other workers for as long as it is delivered.
+        """
+        OutboxMessage.objects.create(channel=OutboxMessage.X, payload={"text": "hello"})
+        with mock.patch.object(outbox, "LEASE", 0.3):
+            claimed = outbox.claim(10, [OutboxMessage.X])
+            leased_until = OutboxMessage.objects.get().available_at
+            with outbox.keep_leased(claimed):
+                time.sleep(0.4)
+                self.assertEqual(outbox.claim(10, [OutboxMessage.X]), [])
+        self.assertGreater(OutboxMessage.objects.get().available_at, leased_until)
+
+    def test_expired_claim_cannot_record_an_outcome(self):
+        """
+        Test that a worker whose lease ran out neither acks nor reschedules a message claimed again since.
+        """
+        OutboxMessage.objects.create(channel=OutboxMessage.X, payload={"text": "hello"})
+        (stale,) = outbox.claim(10, [OutboxMessage.X])
+        OutboxMessage.objects.update(available_at=timezone.now())
+        (current,) = outbox.claim(10, [OutboxMessage.X])
+
+        self.assertFalse(outbox.record(stale, None))
+        self.assertFalse(outbox.record(stale, "XError: HTTP 503", True))
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.claimed_by), (OutboxMessage.PENDING, current.claimed_by))
+        self.assertTrue(outbox.record(current, None))
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.SENT)
+
+class TokenBucketTest(SimpleTestCase):
+    """
+    Test suite for the X post rate limiter.
+    """
+    def test_burst_then_refill(self):
+        """
+        Test that the bucket allows a burst up to its capacity, then refills at its rate.
+        """
+        now = [0.0]
+        bucket = TokenBucket(rate=0.5, capacity=2, clock=lambda: now[0])
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertEqual(bucket.wait_time(), 2.0)
+
+        now[0] = 2.0
+        self.assertTrue(bucket.try_acquire())
+        now[0] = 100.0
+        self.assertEqual(bucket.available(), 2)
+
+
+
+class StoredTokenBucketTest(TestCase):
+    """
+    Test suite for the token bucket shared between worker processes and cron runs.
+    """
+    def test_runs_share_the_bucket(self):
+        """
+        Test that a new bucket, as in the next cron run, continues from the stored level.
+        """
+        now = [1000.0]
+        first = StoredTokenBucket("x", rate=0.5, capacity=2, clock=lambda: now[0])
+        self.assertTrue(first.try_acquire())
+        self.assertTrue(first.try_acquire())
+
+        second = StoredTokenBucket("x", rate=0.5, capacity=2, clock=lambda: now[0])
+        self.assertFalse(second.try_acquire())
+        self.assertEqual(second.wait_time(), 2.0)
+        now[0] = 1002.0
+        self.assertTrue(second.try_acquire())
+        self.assertFalse(first.try_acquire())
+        self.assertEqual(StoredTokenBucket("other", rate=0.5, capacity=2).available(), 2)
+
+class XRateLimitTest(TestCase):
+    """
+    Test suite for rate-limited and coalesced X posting.
+    """
+    def setUp(self):
+        """
+        Queue X messages for five articles of one publisher and one of another.
+        """
+        journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.publisher = Publisher.objects.create(name="Daily Planet")
+        other = Publisher.objects.create(name="Other")
+        for i in range(5):
+            publish(Article(
+                pk=i + 1, title=f"Story {i}", body="", author=journalist, publisher=self.publisher
+            ))
+        publish(Article(
+            pk=99, title="Elsewhere", body="", author=journalist, publisher=other
+        ))
+
+    def drain_x(self, bucket):
+        """
+        Drain the X channel with the given bucket and return the posted texts.
+        """
+        with mock.patch("notifications.outbox.get_bucket", return_value=bucket), \
+                mock.patch("notifications.delivery.get_client") as get_client:
+            outbox.drain_x()
+        return [call.args[0] for call in get_client().post.call_args_list]
+
+    def test_backlog_is_coalesced_per_publisher(self):
+        """
+        Test that more due posts than tokens are merged into one post per publisher.
+        """
+        texts = self.drain_x(TokenBucket(rate=0.001, capacity=2))
+        self.assertEqual(sorted(texts), [
+            "5 new articles from Daily Planet: Story 0; Story 1; Story 2; Story 3; Story 4",
+            "New article published: Elsewhere",
+        ])
+        x_messages = OutboxMessage.objects.filter(channel=OutboxMessage.X)
+        self.assertFalse(x_messages.exclude(status=OutboxMessage.SENT).exists())
+
+    def test_posts_wait_for_tokens(self):
+        """
+        Test that posts beyond the available tokens are released for later, not attempted.
+        """
+        texts = self.drain_x(TokenBucket(rate=0.001, capacity=1))
+        self.assertEqual(len(texts), 1)
+        self.assertEqual(outbox.queue_depth(OutboxMessage.X), {"due": 0, "scheduled": 1})
+        waiting = OutboxMessage.objects.get(channel=OutboxMessage.X, status=OutboxMessage.PENDING)
+        self.assertEqual(waiting.attempts, 0)
+
+
+class XClientTest(SimpleTestCase):
+    """
+    Test suite for the X client against the local stub server.
+    """
+    def client_for(self, server, **options):
+        """
+        Build a client for the stub that does not actually sleep between retries.
+        """
+        options.setdefault("sleep", lambda seconds: None)
+        return XClient(server.url, "token", **options)
+
+    def test_post_success(self):
+        """
+        Test that a post reaches the API and its response is returned.
+        """
+        with StubXServer() as server:
+            result = self.client_for(server).post("Hello")
+        self.assertEqual(server.posts, [{"text": "Hello"}])
+        self.assertEqual(result, {"data": {"id": "1"}})
+
+    def test_transient_failures_are_retried(self):
+        """
+        Test that 503 and 429 responses are retried until the post succeeds.
+        """
+        with StubXServer(statuses=[503, 429, 201]) as server:
+            self.client_for(server, max_retries=3).post("Hello")
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(len(server.posts), 1)
+
+    def test_client_errors_are_not_retried(self):
+        """
+        Test that a 4xx other than 429 fails at once with the response as the reason.
+        """
+        with StubXServer(statuses=[401]) as server:
+            with self.assertRaisesMessage(XError, "HTTP 401"):
+                self.client_for(server).post("Hello")
+        self.assertEqual(server.requests, 1)
+
+    def test_read_timeout_bounds_a_hung_api_and_is_not_retried(self):
+        """
+        Test that a slow API fails within the read timeout, without posting again.
+        """
+        with StubXServer(latency=0.3) as server:
+            client = self.client_for(server, read_timeout=0.1, max_retries=1)
+            with self.assertRaisesMessage(XUncertain, "ReadTimeout"):
+                client.post("Hello")
+            # Let the stub finish answering the first request
+            time.sleep(0.5)
+        self.assertEqual(server.requests, 1)
+
+    def test_connection_failures_are_retried(self):
+        """
+        Test that a request which could not connect is retried, since nothing was posted.
+        """
+        with socket.socket() as listener:
+            listener.bind(("127.0.0.1", 0))
+            url = f"http://127.0.0.1:{listener.getsockname()[1]}/"
+        delays = []
+        client = XClient(url, "token", max_retries=2, sleep=delays.append)
+        with self.assertRaises(XError) as raised:
+            client.post("Hello")
+        self.assertNotIsInstance(raised.exception, XUncertain)
+        self.assertEqual(len(delays), 2)
+
+    def test_circuit_breaker_fails_fast_then_recovers(self):
+        """
+        Test that the breaker opens after repeated failures and a trial call closes it again.
+        """
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+        with StubXServer(statuses=[503, 503, 201]) as server:
+            client = self.client_for(server, max_retries=0, breaker=breaker)
+            for _ in range(2):
+                with self.assertRaises(XError):
+                    client.post("Hello")
+            with self.assertRaises(XCircuitOpen):
+                client.post("Hello")
+            self.assertEqual(server.requests, 2)
+
+            now[0] = 31.0
+            self.assertEqual(breaker.state, "half-open")
+            client.post("Hello")
+        self.assertEqual(breaker.state, "closed")
+
+
+class WebhookDispatcherTest(SimpleTestCase):
+    """
+    Test suite for the asyncio webhook dispatcher against the fake receiver.
+    """
+    def test_signature_roundtrip(self):
+        """
+        Test that signatures verify for the signed body only, and not once expired.
+        """
+        header = webhooks.sign("secret", 1000, b"{}")
+        self.assertTrue(webhooks.verify("secret", header, b"{}", now=1010))
+        self.assertFalse(webhooks.verify("secret", header, b"{ }", now=1010))
+        self.assertFalse(webhooks.verify("other", header, b"{}", now=1010))
+        self.assertFalse(webhooks.verify("secret", header, b"{}", now=2000))
+
+    def test_concurrent_delivery_respects_the_per_host_limit(self):
+        """
+        Test that many endpoints on one host share a few keep-alive connections.
+        """
+        with FakeWebhookReceiver(latency=0.01, secret="s") as receiver:
+            endpoints = [webhooks.Endpoint(i, receiver.url(f"hooks/{i}"), "s") for i in range(40)]
+            results = webhooks.Dispatcher(per_host=3, allow_private_hosts=True).run(endpoints, b'{"id": 1}')
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(receiver.events), 40)
+        self.assertEqual(receiver.rejected, 0)
+        self.assertLessEqual(receiver.peak_concurrency, 3)
+        self.assertLessEqual(receiver.connections, 3)
+
+    def test_queued_deliveries_are_signed_when_sent(self):
+        """
+        Test that a delivery waiting for a connection slot is signed once it gets one.
+        """
+        signed_at = []
+        sign = webhooks.sign
+
+        def timed_sign(*args):
+            signed_at.append(time.perf_counter())
+            return sign(*args)
+
+        with FakeWebhookReceiver(latency=0.05, secret="s") as receiver:
+            endpoints = [webhooks.Endpoint(i, receiver.url(), "s") for i in range(3)]
+            with mock.patch.object(webhooks, "sign", timed_sign):
+                results = webhooks.Dispatcher(per_host=1, allow_private_hosts=True).run(endpoints, b"{}")
+        self.assertTrue(all(result.ok for result in results))
+        self.assertGreaterEqual(signed_at[-1] - signed_at[0], 0.09)
+
+    def test_failures_are_classified(self):
+        """
+        Test that 5xx and timeouts are retryable while other client errors are not.
+        """
+        with FakeWebhookReceiver(statuses=[503, 404]) as receiver:
+            dispatcher = webhooks.Dispatcher(per_host=1, allow_private_hosts=True)
+            first, second = dispatcher.run(
+                [webhooks.Endpoint(1, receiver.url(), "s"), webhooks.Endpoint(2, receiver.url(), "s")], b"{}"
+            )
+            self.assertEqual((first.status, first.retryable), (503, True))
+            self.assertEqual((second.status, second.retryable), (404, False))
+
+            receiver.latency = 1.0
+            [slow] = webhooks.Dispatcher(read_timeout=0.1, allow_private_hosts=True).run([webhooks.Endpoint(3, receiver.url(), "s")], b"{}")
+        self.assertEqual(slow.error, "TimeoutError")
+        self.assertTrue(slow.retryable)
+
+    def test_private_hosts_are_refused(self):
+        """
+        Test that loopback, private and link-local hosts are not contacted, nor retried.
+        """
+        with FakeWebhookReceiver() as receiver:
+            endpoints = [
+                webhooks.Endpoint(1, receiver.url(), "s"),
+                webhooks.Endpoint(2, "http://10.0.0.1/hooks", "s"),
+                webhooks.Endpoint(3, "http://169.254.169.254/latest/meta-data/", "s"),
+            ]
+            results = webhooks.Dispatcher().run(endpoints, b"{}")
+        self.assertEqual(receiver.requests, 0)
+        for result in results:
+            self.assertTrue(result.error.startswith("UnsafeWebhookHost"), result.error)
+            self.assertFalse(result.retryable)
+
+
+@override_settings(WEBHOOK_ALLOW_PRIVATE_HOSTS=True)
+class WebhookDeliveryTest(TestCase):
+    """
+    Test suite for delivering published content to subscriber webhooks.
+    """
+    def setUp(self):
+        """
+        Approve an article whose publisher has a subscriber with a webhook on the fake receiver.
+        """
+        self.receiver = FakeWebhookReceiver().start()
+        self.addCleanup(self.receiver.stop)
+        editor, article = create_pending_article()
+        self.subscription = Subscription.objects.get()
+        self.secret = self.subscription.set_webhook(self.receiver.url("hooks/news"))
+        article.approve(editor)
+        self.message = OutboxMessage.objects.get(channel=OutboxMessage.WEBHOOK)
+
+    def test_event_is_signed_with_the_subscription_secret(self):
+        """
+        Test that the receiver gets the event once, signed with the subscription's secret.
+        """
+        deliver_webhooks(self.message)
+        [event] = self.receiver.events
+        self.assertEqual(event["path"], "/hooks/news")
+        self.assertEqual(event["event"]["event"], "article.published")
+        self.assertEqual(event["event"]["title"], "Breaking")
+        self.assertTrue(webhooks.verify(self.secret, event["signature"], event["body"]))
+        self.assertFalse(WebhookDelivery.objects.exists())
+
+    def test_failed_endpoints_are_retried_on_schedule(self):
+        """
+        Test that a failing endpoint is scheduled for a retry, which deletes the row once it succeeds.
+        """
+        self.receiver.statuses = [503]
+        deliver_webhooks(self.message)
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.response_status), (WebhookDelivery.PENDING, 503))
+        self.assertGreater(delivery.next_attempt_at, self.message.created_at)
+
+        # Not due yet
+        self.assertEqual(webhooks.retry_due(), (0, 0))
+        WebhookDelivery.objects.update(next_attempt_at=self.message.created_at)
+        self.assertEqual(webhooks.retry_due(), (1, 0))
+        self.assertFalse(WebhookDelivery.objects.exists())
+        self.assertEqual(len(self.receiver.events), 1)
+
+    def test_client_errors_are_not_retried(self):
+        """
+        Test that a 4xx response other than 408 and 429 gives the delivery up at once.
+        """
+        self.receiver.statuses = [410]
+        deliver_webhooks(self.message)
+        self.assertEqual(WebhookDelivery.objects.get().status, WebhookDelivery.FAILED)
+
+    def test_readers_sharing_a_url_each_get_their_own_signed_event(self):
+        """
+        Test that two readers registering the same URL each receive the event signed with their secret.
+        """
+        other = User.objects.create_user(username="other", password="pw", role="reader")
+        subscription = Subscription.objects.create(reader=other, publisher=self.subscription.publisher)
+        other_secret = subscription.set_webhook(self.receiver.url("hooks/news"))
+        deliver_webhooks(self.message)
+        self.assertEqual(len(self.receiver.events), 2)
+        for secret in (self.secret, other_secret):
+            verified = [webhooks.verify(secret, e["signature"], e["body"]) for e in self.receiver.events]
+            self.assertEqual(sorted(verified), [False, True])
+
+    def test_expired_retry_claim_leaves_the_delivery_alone(self):
+        """
+        Test that a retry whose claim was taken over by another worker does not store its outcome.
+        """
+        self.receiver.statuses = [503]
+        deliver_webhooks(self.message)
+        WebhookDelivery.objects.update(next_attempt_at=self.message.created_at)
+
+        def event_body(message):
+            """
+            Let another worker take the claim over while this one dispatches.
+            """
+            WebhookDelivery.objects.update(claimed_by="other")
+            return original(message)
+
+        original = webhooks.event_body
+        self.receiver.statuses = [503]
+        with mock.patch.object(webhooks, "event_body", event_body):
+            self.assertEqual(webhooks.retry_due(), (0, 1))
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.attempts, delivery.claimed_by), (1, "other"))
@@ -0,0 +1,206 @@
+"""
+Local fake webhook receiver, for testing and load-testing webhook delivery offline.
+Accepts signed POSTs on any path with configurable latency and a scripted or random sequence of failures.
+
+Run it and register ``http://127.0.0.1:8766/hooks/<anything>`` as a subscription's webhook,
+with WEBHOOK_ALLOW_PRIVATE_HOSTS=True since webhooks are otherwise refused on local addresses::
+
+    python -m notifications.webhook_receiver --port 8766 --latency 0.05 --error-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from notifications.webhooks import SIGNATURE_HEADER, verify
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 503: "Service Unavailable"}
+
+
+class FakeWebhookReceiver:
+    """
+    asyncio HTTP/1.1 server imitating many webhook endpoints on one host.
+
+    ``statuses`` is consumed one status code per request (then ``error_rate`` applies);
+    every request is delayed by ``latency`` seconds. When ``secret`` is given, requests
+    with an invalid signature get a 401. Events are kept in ``events`` unless
+    ``keep_events`` is False, and ``connections`` and ``peak_concurrency`` count what
+    the dispatcher opened. Use it as a context manager to run it on a background thread.
+    """
+
+    def __init__(self, port=0, latency=0.0, statuses=(), error_rate=0.0, secret=None, keep_events=True):
+        """
+        :param port: Port to listen on; 0 picks a free one (see ``url``).
+        """
+        self.port = port
+        self.latency = latency
+        self.statuses = list(statuses)
+        self.error_rate = error_rate
+        self.secret = secret
+        self.keep_events = keep_events
+        self.events = []
+        self.requests = 0
+        self.rejected = 0
+        self.connections = 0
+        self.concurrency = 0
+        self.peak_concurrency = 0
+        self.loop = None
+        self.server = None
+        self.handlers = set()
+        self.thread = None
+        self.started = threading.Event()
+
+    def url(self, path="hooks/"):
+        """
+        Return the URL of an endpoint on this receiver.
+        """
+        return f"http://127.0.0.1:{self.port}/{path}"
+
+    def next_status(self):
+        """
+        Return the status code of the next response.
+        """
+        if self.statuses:
+            return self.statuses.pop(0)
+        return 503 if random.random() < self.error_rate else 200
+
+    async def handle(self, reader, writer):
+        """
+        Serve the requests of one keep-alive connection.
+        """
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.requests += 1
+                self.concurrency += 1
+                self.peak_concurrency = max(self.peak_concurrency, self.concurrency)
+                try:
+                    await asyncio.sleep(self.latency)
+                finally:
+                    self.concurrency -= 1
+
+                signature = headers.get(SIGNATURE_HEADER.lower(), "")
+                if self.secret is not None and not verify(self.secret, signature, body):
+                    self.rejected += 1
+                    status = 401
+                else:
+                    status = self.next_status()
+                if status == 200 and self.keep_events:
+                    self.events.append({
+                        "path": request_line.split()[1].decode(),
+                        "signature": signature,
+                        "body": body,
+                        "event": json.loads(body or b"{}"),
+                    })
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Status')}\r\n"
+                    "Content-Type: text/plain\r\nContent-Length: 2\r\n\r\nok".encode()
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client went away, or the receiver is shutting down
+            pass
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def serve(self):
+        """
+        Listen until ``stop`` is called.
+        """
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", self.port, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started.set()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            # Connections the dispatcher left open (e.g. after a timeout) are dropped
+            for handler in list(self.handlers):
+                handler.cancel()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+
+    def start(self):
+        """
+        Start serving on a background thread.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.started.wait()
+        return self
+
+    def _run(self):
+        """
+        Run the event loop of the background thread.
+        """
+        try:
+            self.loop.run_until_complete(self.serve())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def stop(self):
+        """
+        Shut the server down and wait for its thread.
+        """
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.thread.join(timeout=5)
+
+    def __enter__(self):
+        """
+        Start serving for the duration of a with block.
+        """
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """
+        Stop serving.
+        """
+        self.stop()
+
+
+def main():
+    """
+    Run the receiver in the foreground, printing the request rate every second.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503.")
+    parser.add_argument("--secret", help="Reject requests not signed with this secret.")
+    args = parser.parse_args()
+
+    receiver = FakeWebhookReceiver(
+        args.port, args.latency, error_rate=args.error_rate, secret=args.secret, keep_events=False
+    ).start()
+    print(f"Fake webhook receiver on {receiver.url()}")
+    seen = 0
+    try:
+        while True:
+            time.sleep(1)
+            print(f"{receiver.requests - seen} requests/s, {receiver.requests} total, "
+                  f"{receiver.rejected} rejected, {receiver.connections} connections")
+            seen = receiver.requests
+    except KeyboardInterrupt:
+        receiver.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+"""
+Signed webhook delivery to subscriber endpoints.
+An asyncio dispatcher POSTs one event to many endpoints concurrently over pooled keep-alive connections.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import ssl
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notifications.fanout import load_content
+from notifications.leases import LeaseRenewer, new_token
+from notifications.models import WebhookDelivery
+from subscriptions.models import Subscription
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+# Responses worth retrying: timeout, rate limited or a transient server-side failure.
+# Other error statuses (400, 404, 410, ...) fail the delivery for good.
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Delay before each retry, in seconds; a delivery still failing after the last one is given up
+RETRY_DELAYS = (60, 300, 1800, 7200, 21600)
+
+# How long a claimed retry is hidden from other workers, in seconds; renewed while it is dispatched
+LEASE = 300
+
+# Response bodies are read and discarded; larger ones close the connection instead
+MAX_RESPONSE_BODY = 64 * 1024
+
+
+def sign(secret, timestamp, body):
+    """
+    Return the signature header of a body: ``t=<timestamp>,v1=<hex HMAC-SHA256 of "<timestamp>.<body>">``.
+
+    Signing the timestamp with the body lets receivers reject replayed requests.
+    """
+    mac = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256)
+    return f"t={timestamp},v1={mac.hexdigest()}"
+
+
+def verify(secret, header, body, tolerance=300, now=None):
+    """
+    Return whether a signature header is valid for the body and at most ``tolerance`` seconds old.
+    """
+    fields = dict(part.split("=", 1) for part in header.split(",") if "=" in part)
+    try:
+        timestamp = int(fields["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs((now or time.time()) - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), f"t={timestamp},v1={fields.get('v1', '')}")
+
+
+class WebhookError(Exception):
+    """
+    Raised when an endpoint sent no valid HTTP response.
+    """
+
+
+class UnsafeWebhookHost(WebhookError):
+    """
+    Raised when a webhook host resolves to a loopback, private, link-local or otherwise non-public address.
+    """
+
+
+def is_public_address(address):
+    """
+    Return whether an IP address is globally routable, so the server may POST to it.
+    """
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def public_addresses(infos, hostname):
+    """
+    Return the addresses of ``getaddrinfo`` results, if every one of them is public.
+
+    One non-public address rejects the host, as a connection could end up on it.
+    """
+    addresses = [info[4][0] for info in infos]
+    if not addresses or not all(is_public_address(address) for address in addresses):
+        raise UnsafeWebhookHost(f"{hostname} does not resolve to a public address")
+    return addresses
+
+
+def check_webhook_url(url):
+    """
+    Raise UnsafeWebhookHost unless the URL's host resolves, to public addresses only.
+
+    Skipped with WEBHOOK_ALLOW_PRIVATE_HOSTS, e.g. to deliver to a local fake receiver.
+    """
+    if settings.WEBHOOK_ALLOW_PRIVATE_HOSTS:
+        return
+    parts = urlsplit(url)
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 443, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise UnsafeWebhookHost(f"{parts.hostname} cannot be resolved")
+    public_addresses(infos, parts.hostname)
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """
+    A webhook URL registered on a subscription, with its signing secret.
+    """
+    subscription_id: int
+    url: str
+    secret: str
+
+
+@dataclass
+class Result:
+    """
+    The outcome of one POST: the response status, or the error that prevented a response.
+    """
+    endpoint: Endpoint
+    status: int = None
+    error: str = ""
+    permanent: bool = False
+
+    @property
+    def ok(self):
+        """
+        Return whether the endpoint accepted the event.
+        """
+        return not self.error and 200 <= self.status < 300
+
+    @property
+    def retryable(self):
+        """
+        Return whether the failure is worth another attempt later.
+        """
+        return not self.permanent and (self.status is None or self.status in RETRY_STATUSES)
+
+
+class HostPool:
+    """
+    Keep-alive connections to one host, at most ``limit`` of them in use at once.
+    """
+
+    def __init__(self, limit):
+        """
+        :param limit: Concurrent requests (and open connections) allowed to the host.
+        """
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle = []
+
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class Dispatcher:
+    """
+    Delivers an event to many webhook endpoints concurrently on one asyncio event loop.
+
+    At most ``max_concurrency`` requests are in flight overall and ``per_host`` per
+    receiving host, so a slow integrator cannot use up every slot and no single host
+    is flooded. Connections are kept alive and reused for further endpoints on the
+    same host. Connecting is bounded by ``connect_timeout``; sending the request and
+    reading the response by ``read_timeout``. Hosts are resolved when connecting and,
+    unless ``allow_private_hosts``, refused if any address is not public; the connection
+    then goes to the checked address, so DNS cannot switch it to an internal one.
+    """
+
+    def __init__(self, max_concurrency=500, per_host=4, connect_timeout=3.05, read_timeout=10.0,
+                 allow_private_hosts=False):
+        """
+        :param per_host: Requests in flight, and connections kept open, per scheme, host and port.
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.allow_private_hosts = allow_private_hosts
+        self.ssl_context = None
+
+    def run(self, endpoints, body):
+        """
+        Deliver ``body`` to every endpoint and return one Result per endpoint, in order.
+        """
+        return asyncio.run(self.dispatch(endpoints, body))
+
+    async def dispatch(self, endpoints, body):
+        """
+        Coroutine form of ``run``, for callers already running an event loop.
+        """
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.pools = {}
+        try:
+            return await asyncio.gather(*(self.deliver(endpoint, body) for endpoint in endpoints))
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+
+    async def deliver(self, endpoint, body):
+        """
+        POST the signed body to one endpoint.
+        """
+        parts = urlsplit(endpoint.url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return Result(endpoint, error=f"Unsupported webhook URL: {endpoint.url}", permanent=True)
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+        except ValueError as exc:
+            return Result(endpoint, error=f"Unsupported webhook URL: {exc}", permanent=True)
+
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{port}"
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        head = (
+            f"POST {target} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "User-Agent: NewsApp-Webhooks/1.0\r\n"
+        )
+
+        key = (parts.scheme, parts.hostname, port)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = HostPool(self.per_host)
+        # Waiting for the host first keeps global slots free for other hosts meanwhile
+        async with pool.semaphore, self.semaphore:
+            # Signed only now: a delivery may have queued for longer than receivers' tolerance
+            signature = sign(endpoint.secret, int(time.time()), body)
+            request = f"{head}{SIGNATURE_HEADER}: {signature}\r\n\r\n".encode("latin-1") + body
+            try:
+                status = await self.post(pool, key, request)
+            except UnsafeWebhookHost as exc:
+                return Result(endpoint, error=f"{type(exc).__name__}: {exc}", permanent=True)
+            except (OSError, EOFError, ValueError, asyncio.TimeoutError, WebhookError) as exc:
+                return Result(endpoint, error=f"{type(exc).__name__}: {exc}".rstrip(": "))
+        return Result(endpoint, status=status, error="" if 200 <= status < 300 else f"HTTP {status}")
+
+    async def post(self, pool, key, request):
+        """
+        Send a request on a pooled connection and return the response status.
+
+        A reused connection the server closed in the meantime is replaced by a new one.
+        """
+        while pool.idle:
+            reader, writer = pool.idle.pop()
+            try:
+                return await self.exchange(pool, reader, writer, request)
+            except (ConnectionError, EOFError, WebhookError):
+                writer.close()
+        reader, writer = await self.connect(*key)
+        return await self.exchange(pool, reader, writer, request)
+
+    async def connect(self, scheme, hostname, port):
+        """
+        Resolve the host and open a connection to it within the connect timeout.
+        """
+        tls = None
+        if scheme == "https":
+            if self.ssl_context is None:
+                self.ssl_context = ssl.create_default_context()
+            tls = self.ssl_context
+        return await asyncio.wait_for(self._open(hostname, port, tls), self.connect_timeout)
+
+    async def _open(self, hostname, port, tls):
+        """
+        Connect to the first address of the host, once every address is known to be allowed.
+        """
+        address = hostname
+        if not self.allow_private_hosts:
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+            except socket.gaierror:
+                raise UnsafeWebhookHost(f"{hostname} cannot be resolved")
+            address = public_addresses(infos, hostname)[0]
+        return await asyncio.open_connection(address, port, ssl=tls, server_hostname=hostname if tls else None)
+
+    async def exchange(self, pool, reader, writer, request):
+        """
+        Write the request, read the response and return its status, keeping the connection if possible.
+        """
+        try:
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(self.read_response(reader), self.read_timeout)
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            pool.idle.append((reader, writer))
+        else:
+            writer.close()
+        return status
+
+    async def read_response(self, reader):
+        """
+        Read an HTTP/1.1 response, discarding its body. Returns the status and whether the connection stays usable.
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise WebhookError("Connection closed without a response")
+        try:
+            version, status = status_line.split(None, 2)[:2]
+            status = int(status)
+        except ValueError:
+            raise WebhookError(f"Malformed status line: {status_line[:100]!r}")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection") != "close"
+        if "chunked" in headers.get("transfer-encoding", ""):
+            size = 0
+            while True:
+                chunk = int((await reader.readline()).split(b";")[0], 16)
+                size += chunk
+                if size > MAX_RESPONSE_BODY:
+                    return status, False
+                await reader.readexactly(chunk + 2)
+                if chunk == 0:
+                    break
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length > MAX_RESPONSE_BODY:
+                return status, False
+            await reader.readexactly(length)
+        else:
+            # The body runs until the server closes the connection
+            return status, False
+        return status, keep_alive
+
+
+def get_dispatcher():
+    """
+    Return a Dispatcher configured from the WEBHOOK_* settings.
+    """
+    return Dispatcher(
+        max_concurrency=settings.WEBHOOK_MAX_CONCURRENCY,
+        per_host=settings.WEBHOOK_CONNECTIONS_PER_HOST,
+        connect_timeout=settings.WEBHOOK_CONNECT_TIMEOUT,
+        read_timeout=settings.WEBHOOK_READ_TIMEOUT,
+        allow_private_hosts=settings.WEBHOOK_ALLOW_PRIVATE_HOSTS,
+    )
+
+
+def event_body(message):
+    """
+    Return the JSON body announcing the content of an outbox message.
+
+    Deliveries are at least once; receivers can drop duplicates by the event ``id``.
+    """
+    payload = message.payload
+    content = payload.get("content", "articles.article")
+    return json.dumps({
+        "id": message.pk,
+        "event": f"{content.split('.')[-1]}.published",
+        "content_id": payload.get("content_id", payload.get("article_id")),
+        "title": payload.get("title", ""),
+        "author_id": payload.get("author_id"),
+        "publisher_id": payload.get("publisher_id"),
+        "message": payload.get("message", ""),
+    }, separators=(",", ":")).encode()
+
+
+def webhook_endpoints(content):
+    """
+    Return the webhook endpoints subscribed to a content's publisher or author, one per reader and URL.
+
+    A reader subscribed to both through the same URL gets the event once, signed with the
+    secret of their oldest subscription; readers sharing a URL each get their own delivery.
+    """
+    subscribed = Q(journalist_id=content.author_id)
+    if content.publisher_id:
+        subscribed |= Q(publisher_id=content.publisher_id)
+
+    endpoints = {}
+    for pk, reader_id, url, secret in (
+        Subscription.objects.filter(subscribed)
+        .exclude(webhook_url="")
+        .order_by("id")
+        .values_list("id", "reader_id", "webhook_url", "webhook_secret")
+        .iterator(chunk_size=2000)
+    ):
+        endpoints.setdefault((reader_id, url), Endpoint(pk, url, secret))
+    return list(endpoints.values())
+
+
+def retry_at(attempts, now):
+    """
+    Return when a delivery that failed ``attempts`` times is retried, or None to give up.
+    """
+    if attempts > len(RETRY_DELAYS):
+        return None
+    return now + timedelta(seconds=RETRY_DELAYS[attempts - 1])
+
+
+def deliver_message(message):
+    """
+    POST a webhook outbox message to every subscribed endpoint.
+
+    Failures are stored as WebhookDelivery rows and retried by ``retry_due`` rather than
+    failing the whole message, so endpoints that accepted the event get it only once.
+    Returns the results.
+    """
+    content = load_content(message.payload)
+    if content is None:
+        return []
+    endpoints = webhook_endpoints(content)
+    if not endpoints:
+        return []
+
+    results = get_dispatcher().run(endpoints, event_body(message))
+    now = timezone.now()
+    failures = []
+    for result in results:
+        if result.ok:
+            continue
+        next_attempt_at = retry_at(1, now) if result.retryable else None
+        failures.append(WebhookDelivery(
+            message=message,
+            subscription_id=result.endpoint.subscription_id,
+            status=WebhookDelivery.PENDING if next_attempt_at else WebhookDelivery.FAILED,
+            next_attempt_at=next_attempt_at or now,
+            response_status=result.status,
+            last_error=result.error,
+        ))
+    WebhookDelivery.objects.bulk_create(failures, batch_size=1000)
+    return results
+
+
+def claim_retries(limit):
+    """
+    Lease up to ``limit`` due webhook retries to the calling worker, skipping rows locked by another one.
+
+    The deliveries are marked with a new claim token, so only this worker records their outcome.
+    """
+    now = timezone.now()
+    token = new_token()
+    with transaction.atomic():
+        deliveries = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookDelivery.PENDING, next_attempt_at__lte=now)
+            .select_related("message", "subscription")
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        WebhookDelivery.objects.filter(pk__in=[d.pk for d in deliveries]).update(
+            next_attempt_at=now + timedelta(seconds=LEASE), claimed_by=token
+        )
+    for delivery in deliveries:
+        delivery.claimed_by = token
+    return deliveries
+
+
+def retry_due(limit=1000):
+    """
+    Retry the webhook deliveries that are due, one dispatch per outbox message.
+
+    Successful deliveries are deleted; failed ones are rescheduled or given up.
+    Returns the number of deliveries that succeeded and that failed again.
+    """
+    deliveries = claim_retries(limit)
+    if not deliveries:
+        return 0, 0
+    held = WebhookDelivery.objects.filter(
+        pk__in=[d.pk for d in deliveries], claimed_by=deliveries[0].claimed_by, status=WebhookDelivery.PENDING
+    )
+    with LeaseRenewer(held, "next_attempt_at", LEASE):
+        return _retry(deliveries, held)
+
+
+def _retry(deliveries, held):
+    """
+    Dispatch claimed retries and store their outcome on the rows still ``held`` by the claim.
+    """
+    by_message = {}
+    for delivery in deliveries:
+        by_message.setdefault(delivery.message, []).append(delivery)
+
+    now = timezone.now()
+    done, dropped, updated = [], [], []
+    dispatcher = get_dispatcher()
+    for message, group in by_message.items():
+        # Endpoints removed since the first attempt are dropped, changed ones get the new URL
+        dropped += [d for d in group if not d.subscription.webhook_url]
+        group = [d for d in group if d.subscription.webhook_url]
+        endpoints = [
+            Endpoint(d.subscription_id, d.subscription.webhook_url, d.subscription.webhook_secret)
+            for d in group
+        ]
+        for delivery, result in zip(group, dispatcher.run(endpoints, event_body(message))):
+            if result.ok:
+                done.append(delivery)
+                continue
+            delivery.attempts += 1
+            next_attempt_at = retry_at(delivery.attempts, now) if result.retryable else None
+            if next_attempt_at is None:
+                delivery.status = WebhookDelivery.FAILED
+            delivery.next_attempt_at = next_attempt_at or now
+            delivery.response_status = result.status
+            delivery.last_error = result.error
+            updated.append(delivery)
+
+    # A claim that ran out (the renewals failed) leaves the rows to the worker holding them now
+    still_held = set(held.values_list("pk", flat=True))
+    held.filter(pk__in=[d.pk for d in done + dropped]).delete()
+    WebhookDelivery.objects.bulk_update(
+        [d for d in updated if d.pk in still_held],
+        ["attempts", "status", "next_attempt_at", "response_status", "last_error"],
+        batch_size=1000,
+    )
+    return len(done), len(updated)
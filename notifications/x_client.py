@@ -2,26 +2,237 @@
 Integration client for X (Twitter) platform.
 Handles the API interactions required to post news updates to social media.
 """
+import random
+import threading
+import time
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
+# Responses worth retrying: rate limited or a transient server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-def post_to_x(message):
+
+class XError(Exception):
     """
-    Send a post to X (Twitter) platform when a new article is published.
+    Raised when a post could not be published on X.
+    """
+
+
+class XUncertain(XError):
+    """
+    Raised when the request may have reached X but no answer came back.
+
+    The post may be public already, so it is neither retried nor sent again by the outbox.
+    """
+    retryable = False
+
+
+class XCircuitOpen(XError):
+    """
+    Raised without contacting X while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated failures, then lets a single trial call through after a cool-down.
+
+    Closed: calls go through. Open: calls are refused until ``reset_timeout`` seconds passed.
+    Half-open: one trial call is allowed; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        :param failure_threshold: Consecutive failed calls that open the circuit.
+        :param reset_timeout: Seconds the circuit stays open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        """
+        Return "closed", "open" or "half-open".
+        """
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def before_call(self):
+        """
+        Raise XCircuitOpen unless a call may go through now.
+        """
+        with self.lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self.trial_running):
+                raise XCircuitOpen("X is unavailable, circuit breaker is open")
+            if state == "half-open":
+                self.trial_running = True
+
+    def record_success(self):
+        """
+        Close the circuit after a successful call.
+        """
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        """
+        Count a failed call, opening the circuit at the threshold or when a trial call fails.
+        """
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self.trial_running = False
+
+
+def was_not_sent(exc):
+    """
+    Return whether a request failed before any of it reached the server.
+    """
+    if isinstance(exc, (requests.ConnectTimeout, requests.exceptions.SSLError)):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(exc, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+class XClient:
     """
+    Posts to the X API over a pooled session.
+
+    Every request is bounded by connect and read timeouts. Failures that leave the post
+    unpublished (connection failures, 429 and 5xx responses) are retried with jittered
+    exponential backoff, and a circuit breaker stops calling X while it is down. X has
+    no idempotency keys, so a request that may have been received (a read timeout or a
+    connection dropped mid-response) is never sent again: it raises XUncertain.
+    """
+
+    def __init__(
+        self,
+        url,
+        token,
+        connect_timeout=3.05,
+        read_timeout=10.0,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=8.0,
+        breaker=None,
+        pool_size=10,
+        sleep=time.sleep,
+    ):
+        """
+        :param max_retries: Retries after the first attempt, so at most ``max_retries + 1`` requests per post.
+        :param pool_size: Connections kept open to the API host, one per concurrent worker thread.
+        """
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, text):
+        """
+        Publish a post and return the decoded API response.
+
+        Raises XCircuitOpen while the breaker is open, XUncertain when the post may have
+        been published without a response, and XError, with the reason of the last attempt,
+        when the post could not be published.
+        """
+        self.breaker.before_call()
+        try:
+            result = self._post_with_retries({"text": text[:280]})
+        except XError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
 
-    url = "https://api.x.com/2/tweets"  # placeholder URL
+    def _post_with_retries(self, payload):
+        """
+        Send the request, retrying failures that leave the post unpublished.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as exc:
+                reason = f"{type(exc).__name__}: {exc}"
+                if not was_not_sent(exc):
+                    raise XUncertain(f"The post may have been published, not retrying: {reason}")
+            else:
+                if response.status_code in (200, 201):
+                    try:
+                        return response.json()
+                    except ValueError:
+                        return {}
+                reason = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in RETRY_STATUSES:
+                    raise XError(reason)
+                retry_after = response.headers.get("Retry-After")
 
-    payload = {
-        "text": message[:280]
-    }
+            if attempt < self.max_retries:
+                self.sleep(self.backoff(attempt, retry_after))
+        raise XError(f"Gave up after {self.max_retries + 1} attempts, last error: {reason}")
 
-    headers = {
-        "Authorization": "Bearer YOUR_API_TOKEN_HERE"
-    }
+    def backoff(self, attempt, retry_after=None):
+        """
+        Return the delay before retry number ``attempt + 1``: full jitter, or the server's Retry-After.
+        """
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
 
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide XClient configured from the X_API_* settings.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = XClient(
+                settings.X_API_URL,
+                settings.X_API_TOKEN,
+                connect_timeout=settings.X_API_CONNECT_TIMEOUT,
+                read_timeout=settings.X_API_READ_TIMEOUT,
+                max_retries=settings.X_API_MAX_RETRIES,
+            )
+        return _client
+
+
+def post_to_x(message):
+    """
+    Send a post to X (Twitter) platform when a new article is published.
+
+    Returns True on success and False otherwise; use ``get_client().post`` to get the failure reason.
+    """
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        return response.status_code in (200, 201)
-    except Exception:
+        get_client().post(message)
+        return True
+    except XError:
         return False
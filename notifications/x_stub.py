@@ -0,0 +1,139 @@
+"""
+Local stand-in for the X API, for testing the X client offline.
+Answers posts with configurable latency and a scripted or random sequence of failures.
+
+Run it next to the development server and point X_API_URL at it::
+
+    python -m notifications.x_stub --port 8765 --latency 0.2 --error-rate 0.3
+    X_API_URL=http://127.0.0.1:8765/2/tweets python manage.py drain_outbox
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubXServer:
+    """
+    Threaded HTTP server imitating ``POST /2/tweets``.
+
+    ``statuses`` is consumed one status code per request (then ``error_rate`` applies);
+    every request is delayed by ``latency`` seconds. Received posts are kept in ``posts``.
+    Use it as a context manager to run it on a background thread.
+    """
+
+    def __init__(self, port=0, latency=0.0, statuses=(), error_rate=0.0):
+        """
+        :param port: Port to listen on; 0 picks a free one (see ``url``).
+        """
+        self.latency = latency
+        self.statuses = list(statuses)
+        self.error_rate = error_rate
+        self.posts = []
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """
+        Return the URL to use as X_API_URL.
+        """
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/2/tweets"
+
+    def next_status(self):
+        """
+        Return the status code of the next response.
+        """
+        with self.lock:
+            self.requests += 1
+            if self.statuses:
+                return self.statuses.pop(0)
+        return 503 if random.random() < self.error_rate else 201
+
+    def _handler_class(self):
+        """
+        Build the request handler bound to this server.
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Handles one stub request.
+            """
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                """
+                Wait, then answer with the next scripted status.
+                """
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(stub.latency)
+                status = stub.next_status()
+                if status in (200, 201):
+                    with stub.lock:
+                        stub.posts.append(json.loads(body or b"{}"))
+                        post_id = len(stub.posts)
+                    payload = {"data": {"id": str(post_id)}}
+                else:
+                    payload = {"title": "Stubbed failure", "status": status}
+                response = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                try:
+                    self.wfile.write(response)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client timed out and went away
+                    pass
+
+            def log_message(self, format, *args):
+                """
+                Keep test output quiet.
+                """
+
+        return Handler
+
+    def __enter__(self):
+        """
+        Start serving on a background thread.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Stop serving and close the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    """
+    Serve the stub in the foreground.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503.")
+    args = parser.parse_args()
+
+    server = StubXServer(args.port, args.latency, error_rate=args.error_rate)
+    print(f"Stub X API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,5 +3,74 @@ Tests for the publishers application.
 Validates organizational logic, such as editor permissions and journalist membership.
 """
 from django.test import TestCase
+from django.contrib.auth import get_user_model
 
-# Create your tests here.
+from articles.models import Article, Newsletter
+from news_project.testing import QueryBudgetMixin
+from publishers.models import Publisher
+
+User = get_user_model()
+
+
+class PublisherViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Test suite asserting that the publisher views run a fixed number of queries.
+    """
+    def setUp(self):
+        """
+        Set up an editor belonging to a publisher with some members and content.
+        """
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        self.publisher.editors.add(self.editor)
+        self.created = 0
+        self.add_members()
+        self.client.force_login(self.editor)
+
+    def add_members(self, count=1):
+        """
+        Add journalists and editors to the publisher, each with published content.
+        """
+        for _ in range(count):
+            self.created += 1
+            journalist = User.objects.create_user(
+                username=f"journalist{self.created}", password="pw", role="journalist"
+            )
+            editor = User.objects.create_user(
+                username=f"editor{self.created}", password="pw", role="editor"
+            )
+            self.publisher.journalists.add(journalist)
+            self.publisher.editors.add(editor)
+            Publisher.objects.create(name=f"Publisher {self.created}").editors.add(self.editor)
+            Article.objects.create(
+                title="Article", body="...", author=journalist, publisher=self.publisher, approved=True
+            )
+            Newsletter.objects.create(
+                title="Newsletter", body="...", author=journalist, publisher=self.publisher, approved=True
+            )
+
+    def grow(self):
+        """
+        Add several more members and items of content.
+        """
+        self.add_members(5)
+
+    def test_publisher_list_budget(self):
+        """
+        Test the query budget of the publisher list.
+        """
+        self.assertQueryBudget("/publishers/", 4, self.grow)
+
+    def test_publisher_detail_budget(self):
+        """
+        Test the query budget of the publisher detail page.
+        """
+        self.assertQueryBudget(f"/publishers/{self.publisher.id}/", 8, self.grow)
+
+    def test_add_editor_budget(self):
+        """
+        Test the query budget of the add-editor form.
+
+        Requests are uncached, so this includes loading the editor's membership snapshot.
+        """
+        self.assertQueryBudget(f"/publishers/{self.publisher.id}/add-editor/", 6, self.grow)
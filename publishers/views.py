@@ -7,6 +7,7 @@ from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from .models import Publisher
 from django.contrib.auth import get_user_model
+from users.membership import get_membership
 
 User = get_user_model()
 
@@ -14,7 +15,7 @@ User = get_user_model()
 @login_required
 def create_publisher(request):
     """Allow editors to create a new publisher organization."""
-    if request.user.role != "editor":
+    if request.role != "editor":
         raise PermissionDenied("Only editors can create publishers.")
     
     if request.method == "POST":
@@ -34,9 +35,9 @@ def publisher_list(request):
     publishers = Publisher.objects.all()
     user_publishers = None
     
-    if request.user.role == "editor":
+    if request.role == "editor":
         user_publishers = Publisher.objects.filter(editors=request.user)
-    elif request.user.role == "journalist":
+    elif request.role == "journalist":
         user_publishers = Publisher.objects.filter(journalists=request.user)
     
     return render(request, "publishers/publisher_list.html", {
@@ -48,16 +49,19 @@ def publisher_list(request):
 @login_required
 def publisher_detail(request, publisher_id):
     """View details of a publisher and manage editors/journalists."""
-    publisher = get_object_or_404(Publisher, id=publisher_id)
-    is_editor = request.user.role == "editor" and request.user in publisher.editors.all()
+    # Editors and journalists are listed by the template, so load them in bulk
+    publisher = get_object_or_404(
+        Publisher.objects.prefetch_related("editors", "journalists"), id=publisher_id
+    )
+    is_editor = request.role == "editor" and request.user in publisher.editors.all()
     
     # Fetch content
     from articles.models import Article, Newsletter
-    # Approved articles belonging to this publisher
-    articles = Article.objects.filter(publisher=publisher, approved=True).order_by('-published_at')
+    # Visible (approved or independent) articles belonging to this publisher
+    articles = Article.objects.visible().filter(publisher=publisher).select_related("author").defer("body").order_by('-published_at')
     
-    # Approved newsletters belonging to this publisher
-    newsletters = Newsletter.objects.filter(publisher=publisher, approved=True).order_by('-published_at')
+    # Visible newsletters belonging to this publisher
+    newsletters = Newsletter.objects.visible().filter(publisher=publisher).select_related("author").defer("body").order_by('-published_at')
     
     # Check subscription status
     from subscriptions.models import Subscription
@@ -77,7 +81,7 @@ def add_editor(request, publisher_id):
     """Add an editor to a publisher (only existing editors can do this)."""
     publisher = get_object_or_404(Publisher, id=publisher_id)
     
-    if request.user.role != "editor" or request.user not in publisher.editors.all():
+    if request.role != "editor" or not get_membership(request.user).is_editor_of(publisher.id):
         raise PermissionDenied("Only editors of this publisher can add editors.")
     
     if request.method == "POST":
@@ -107,7 +111,7 @@ def add_editor(request, publisher_id):
 @login_required
 def join_publisher(request, publisher_id):
     """Allow journalists to join a publisher."""
-    if request.user.role != "journalist":
+    if request.role != "journalist":
         raise PermissionDenied("Only journalists can join publishers.")
     
     publisher = get_object_or_404(Publisher, id=publisher_id)
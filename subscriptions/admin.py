@@ -11,4 +11,4 @@ class SubscriptionAdmin(admin.ModelAdmin):
     """
     Admin configuration for the Subscription model.
     """
-    list_display = ("reader", "publisher", "journalist")
+    list_display = ("reader", "publisher", "journalist", "webhook_url")
@@ -10,3 +10,9 @@ class SubscriptionsConfig(AppConfig):
     Configuration for the subscriptions app.
     """
     name = 'subscriptions'
+
+    def ready(self):
+        """
+        Connect signals for the subscriptions app.
+        """
+        import subscriptions.signals
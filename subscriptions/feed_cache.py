@@ -0,0 +1,182 @@
+"""
+Per-reader feed cache with version-based invalidation.
+Cached feeds are keyed by the reader's subscription-set version and the versions of
+every subscribed source, so bumping one publisher, journalist or reader version
+invalidates exactly the feeds that include it. Feeds are stored as plain rows, not model instances.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .models import Subscription
+
+# Lifetime of cached feed pages and subscription lists, in seconds
+TIMEOUT = 300
+
+HITS_KEY = "feed:stats:hits"
+MISSES_KEY = "feed:stats:misses"
+
+
+def version_key(scope, pk=None):
+    """
+    Return the cache key holding the version of a scope ("reader", "publisher", "journalist" or "public").
+    """
+    return f"feed:v:{scope}" if pk is None else f"feed:v:{scope}:{pk}"
+
+
+def get_versions(keys):
+    """
+    Return the current value of each version key, creating missing ones.
+
+    New versions start from the current time, so a key that was evicted never
+    comes back with a value an older cached feed was stored under.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def bump(*keys):
+    """
+    Advance the given version keys, invalidating every feed built from them.
+    """
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_content(instance):
+    """
+    Invalidate the feeds that may list an article or newsletter.
+    """
+    keys = [version_key("public"), version_key("journalist", instance.author_id)]
+    if instance.publisher_id:
+        keys.append(version_key("publisher", instance.publisher_id))
+    bump(*keys)
+
+
+def invalidate_contents(instances):
+    """
+    Invalidate the feeds that may list any of several articles or newsletters, bumping each version once.
+    """
+    keys = {version_key("public")}
+    for instance in instances:
+        keys.add(version_key("journalist", instance.author_id))
+        if instance.publisher_id:
+            keys.add(version_key("publisher", instance.publisher_id))
+    bump(*keys)
+
+
+def invalidate_reader(reader_id):
+    """
+    Invalidate a reader's feeds after their subscriptions changed.
+    """
+    bump(version_key("reader", reader_id))
+
+
+def reader_sources(reader_id):
+    """
+    Return the (publisher_id, journalist_id) pairs of a reader's subscriptions, cached per version.
+    """
+    reader_version = get_versions([version_key("reader", reader_id)])
+    key = f"feed:sources:{reader_id}:{reader_version[version_key('reader', reader_id)]}"
+    sources = cache.get(key)
+    if sources is None:
+        sources = list(
+            Subscription.objects.filter(reader_id=reader_id)
+            .order_by("id")
+            .values_list("publisher_id", "journalist_id")
+        )
+        cache.set(key, sources, TIMEOUT)
+    return sources
+
+
+def reader_feed_key(reader_id, variant):
+    """
+    Return the cache key of one variant (page, format, ...) of a reader's feed.
+    """
+    keys = [version_key("reader", reader_id)]
+    for publisher_id, journalist_id in reader_sources(reader_id):
+        if publisher_id:
+            keys.append(version_key("publisher", publisher_id))
+        if journalist_id:
+            keys.append(version_key("journalist", journalist_id))
+    versions = get_versions(keys)
+    digest = hashlib.sha1(
+        repr((sorted(versions.items()), variant)).encode("utf-8")
+    ).hexdigest()
+    return f"feed:reader:{reader_id}:{digest}"
+
+
+def public_feed_key(variant):
+    """
+    Return the cache key of one variant of the public (non reader-specific) feed.
+    """
+    version = get_versions([version_key("public")])[version_key("public")]
+    digest = hashlib.sha1(repr((version, variant)).encode("utf-8")).hexdigest()
+    return f"feed:public:{digest}"
+
+
+def get(key):
+    """
+    Return a cached feed, or None, and record the hit or miss.
+    """
+    value = cache.get(key)
+    _count(HITS_KEY if value is not None else MISSES_KEY)
+    return value
+
+
+def get_or_set(key, build):
+    """
+    Return a cached feed, building and storing it on a miss.
+    """
+    value = get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, TIMEOUT)
+    return value
+
+
+def store_rows(key, rows, **extra):
+    """
+    Pass rows through while caching them once the iterable is exhausted.
+
+    Used for streamed responses: a client that disconnects early leaves nothing cached.
+    """
+    collected = []
+    for row in rows:
+        collected.append(row)
+        yield row
+    cache.set(key, dict(extra, rows=collected), TIMEOUT)
+
+
+def _count(key):
+    """
+    Increment a hit/miss counter.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def stats():
+    """
+    Return the hit and miss counters of the feed cache.
+
+    The counters live in the cache itself, so they add up every worker's requests only with
+    a shared cache (REDIS_URL). With the default local memory cache each process counts on
+    its own, and a separate process such as a management command reads zeros.
+    """
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": counters.get(HITS_KEY, 0),
+        "misses": counters.get(MISSES_KEY, 0),
+    }
@@ -0,0 +1,3 @@
+"""
+Management commands for the subscriptions application.
+"""
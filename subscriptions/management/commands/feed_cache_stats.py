@@ -0,0 +1,28 @@
+"""
+Management command reporting the feed cache hit and miss counters.
+Only meaningful with a shared cache (REDIS_URL): a local memory cache keeps its counters per process.
+"""
+from django.core.management.base import BaseCommand
+
+from subscriptions import feed_cache
+
+
+class Command(BaseCommand):
+    """
+    Print the feed cache hit/miss counters and hit ratio.
+    """
+    help = (
+        "Show feed cache hit and miss counters. They are kept in the cache, so they cover "
+        "the web workers only when a shared cache is configured (REDIS_URL)."
+    )
+
+    def handle(self, *args, **options):
+        """
+        Read the counters from the configured cache and print them.
+        """
+        counters = feed_cache.stats()
+        total = counters["hits"] + counters["misses"]
+        ratio = counters["hits"] / total if total else 0.0
+        self.stdout.write(
+            f"hits={counters['hits']} misses={counters['misses']} hit_ratio={ratio:.2%}"
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.27 on 2026-10-18 02:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_timelines(apps, schema_editor):
+    """
+    Fill timelines for subscriptions that existed before the table was added.
+    """
+    Article = apps.get_model('articles', 'Article')
+    Subscription = apps.get_model('subscriptions', 'Subscription')
+    TimelineEntry = apps.get_model('subscriptions', 'TimelineEntry')
+
+    for subscription in Subscription.objects.iterator():
+        articles = Article.objects.filter(approved=True)
+        if subscription.publisher_id:
+            articles = articles.filter(publisher_id=subscription.publisher_id)
+        else:
+            articles = articles.filter(author_id=subscription.journalist_id)
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    reader_id=subscription.reader_id,
+                    article_id=article_id,
+                    published_at=published_at,
+                )
+                for article_id, published_at in articles.values_list('id', 'published_at')
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_newsletter_approved_newsletter_approved_by_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('subscriptions', '0003_alter_subscription_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='articles.article')),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reader', '-published_at', '-article'], name='timeline_reader_recent_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('reader', 'article'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
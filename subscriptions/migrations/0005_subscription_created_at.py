@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 02:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0004_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
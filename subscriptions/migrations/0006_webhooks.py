@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0005_subscription_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='webhook_secret',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='webhook_url',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-18 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0006_webhooks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['publisher', 'reader'], name='subscription_publisher_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['journalist', 'reader'], name='subscription_journalist_idx'),
+        ),
+    ]
@@ -2,9 +2,12 @@
 Models for the subscriptions application.
 Defines the Subscription entity which links Readers to their favorite Publishers or Journalists.
 """
+import secrets
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from publishers.models import Publisher
 
 User = settings.AUTH_USER_MODEL
@@ -36,6 +39,19 @@ class Subscription(models.Model):
         related_name="subscribed_journalists",
     )
 
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    # Optional endpoint receiving a signed POST for each new item of this subscription
+    webhook_url = models.URLField(max_length=500, blank=True)
+    webhook_secret = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        # Subscribers of a source are read in reader order (see notifications.fanout)
+        indexes = [
+            models.Index(fields=["publisher", "reader"], name="subscription_publisher_idx"),
+            models.Index(fields=["journalist", "reader"], name="subscription_journalist_idx"),
+        ]
+
     def clean(self):
         """
         Validate that a subscription is either to a publisher or a journalist, but not both or none.
@@ -45,9 +61,64 @@ class Subscription(models.Model):
                 "Subscription must be to either a publisher or a journalist."
             )
 
+    def set_webhook(self, url):
+        """
+        Register (or with an empty url, remove) the webhook endpoint and return its signing secret.
+
+        Saving the same URL again keeps the secret, so receivers keep verifying deliveries.
+        """
+        if url and url == self.webhook_url and self.webhook_secret:
+            return self.webhook_secret
+        self.webhook_url = url
+        self.webhook_secret = secrets.token_hex(32) if url else ""
+        self.save(update_fields=["webhook_url", "webhook_secret"])
+        return self.webhook_secret
+
     def __str__(self):
         """
         Return the string representation of the subscription.
         """
         target = self.publisher or self.journalist
         return f"{self.reader} → {target}"
+
+
+class TimelineEntry(models.Model):
+    """
+    A materialized feed row linking a reader to an approved article from one of their subscriptions.
+    Rows are written when articles are published and when subscriptions change,
+    so reading a feed is a single range scan on (reader, published_at).
+    """
+    reader = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+
+    article = models.ForeignKey(
+        "articles.Article",
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+
+    # Copied from the article so the feed can be ordered without a join
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reader", "article"],
+                name="unique_timeline_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["reader", "-published_at", "-article"],
+                name="timeline_reader_recent_idx",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Return the string representation of the timeline entry.
+        """
+        return f"{self.reader_id} ← {self.article_id}"
@@ -0,0 +1,96 @@
+"""
+Signal handlers for the subscriptions application.
+Keeps reader timelines and cached feeds up to date when content is published or subscriptions change.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from articles.models import Article, Newsletter
+from articles.signals import content_bulk_published, content_published
+from . import feed_cache
+from .models import Subscription
+from .timeline import backfill_subscription, fan_out_article, fan_out_articles, prune_subscription
+
+
+def run_again_on_commit(fill, invalidate):
+    """
+    Run a timeline update once more after the current transaction commits, then invalidate its feeds.
+
+    The second run reads what concurrent transactions committed meanwhile (see subscriptions.timeline).
+    """
+    def run():
+        fill()
+        invalidate()
+    transaction.on_commit(run)
+
+
+@receiver(content_published, sender=Article)
+def add_article_to_timelines(sender, instance, **kwargs):
+    """
+    Fan a newly approved article out to the timelines of its subscribers.
+
+    Independent articles are approved when created and reach their journalist's subscribers.
+    Timelines back the API, which only lists approved articles, so content visible without
+    approval is skipped.
+    """
+    if instance.approved:
+        fan_out_article(instance)
+        run_again_on_commit(partial(fan_out_article, instance), partial(feed_cache.invalidate_content, instance))
+
+
+@receiver(content_bulk_published, sender=Article)
+def add_articles_to_timelines(sender, instances, **kwargs):
+    """
+    Fan a bulk approval of articles out to the timelines of their subscribers.
+    """
+    fan_out_articles(instances)
+    run_again_on_commit(partial(fan_out_articles, instances), partial(feed_cache.invalidate_contents, instances))
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(content_published, sender=Article)
+@receiver(post_save, sender=Newsletter)
+@receiver(post_delete, sender=Newsletter)
+@receiver(content_published, sender=Newsletter)
+def invalidate_content_feeds(sender, instance, **kwargs):
+    """
+    Invalidate cached feeds listing content that was published, edited or deleted.
+
+    ``approve()`` publishes with a plain UPDATE, so ``content_published`` is handled as well.
+    """
+    feed_cache.invalidate_content(instance)
+
+
+@receiver(content_bulk_published, sender=Article)
+@receiver(content_bulk_published, sender=Newsletter)
+def invalidate_bulk_content_feeds(sender, instances, **kwargs):
+    """
+    Invalidate cached feeds once for a bulk approval.
+    """
+    feed_cache.invalidate_contents(instances)
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_timeline(sender, instance, created, **kwargs):
+    """
+    Backfill the reader's timeline when a new subscription is created.
+    """
+    if created:
+        backfill_subscription(instance)
+        run_again_on_commit(
+            partial(backfill_subscription, instance), partial(feed_cache.invalidate_reader, instance.reader_id)
+        )
+    feed_cache.invalidate_reader(instance.reader_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def prune_timeline(sender, instance, **kwargs):
+    """
+    Prune the reader's timeline when a subscription is removed.
+    """
+    prune_subscription(instance)
+    feed_cache.invalidate_reader(instance.reader_id)
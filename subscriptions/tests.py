@@ -2,6 +2,300 @@
 Tests for the subscriptions application.
 Verifies subscription creation, uniqueness constraints, and cancellation logic.
 """
+import json
+from unittest import mock
+
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from articles.models import Article
+from news_project.testing import QueryBudgetMixin
+from publishers.models import Publisher
+from subscriptions import feed_cache
+from subscriptions.models import Subscription, TimelineEntry
+
+User = get_user_model()
+
+# getaddrinfo result of a host with one public address
+PUBLIC_ADDRESS = [(2, 1, 6, "", ("93.184.215.14", 443))]
+
+
+class TimelineFanOutTest(TestCase):
+    """
+    Test suite for the materialized reader timelines.
+    Validates fan-out on publication and backfill/prune on subscription changes.
+    """
+    def setUp(self):
+        """
+        Set up a reader, a journalist, an editor and a publisher.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+
+    def timeline(self):
+        """
+        Return the ids of the articles on the reader's timeline.
+        """
+        return set(
+            TimelineEntry.objects.filter(reader=self.reader).values_list("article_id", flat=True)
+        )
+
+    def test_approval_fans_out_to_subscribers(self):
+        """
+        Test that approving an article adds it to the timelines of subscribed readers only once.
+        """
+        Subscription.objects.create(reader=self.reader, publisher=self.publisher)
+        Subscription.objects.create(reader=self.reader, journalist=self.journalist)
+        article = Article.objects.create(
+            title="Pending", body="...", author=self.journalist, publisher=self.publisher
+        )
+        self.assertEqual(self.timeline(), set())
+
+        article.approve(self.editor)
+        self.assertEqual(self.timeline(), {article.id})
+        self.assertEqual(TimelineEntry.objects.get().published_at, article.published_at)
+
+        # Later edits do not fan out again
+        article.title = "Edited"
+        article.save()
+        self.assertEqual(TimelineEntry.objects.count(), 1)
+
+    def test_subscribe_backfills_approved_articles(self):
+        """
+        Test that subscribing backfills approved articles but not pending ones.
+        """
+        approved = Article.objects.create(
+            title="Approved", body="...", author=self.journalist, publisher=self.publisher, approved=True
+        )
+        Article.objects.create(
+            title="Pending", body="...", author=self.journalist, publisher=self.publisher
+        )
+
+        Subscription.objects.create(reader=self.reader, publisher=self.publisher)
+        self.assertEqual(self.timeline(), {approved.id})
+
+    def test_entries_missed_inside_transactions_are_added_on_commit(self):
+        """
+        Test that the fan-out and the backfill run again after commit, adding only what is missing.
+        """
+        # As if the subscription and the approval were committed concurrently: neither sees the other
+        with self.captureOnCommitCallbacks() as subscribed:
+            Subscription.objects.create(reader=self.reader, publisher=self.publisher)
+        article = Article.objects.create(
+            title="Pending", body="...", author=self.journalist, publisher=self.publisher
+        )
+        with self.captureOnCommitCallbacks() as approved:
+            article.approve(self.editor)
+        TimelineEntry.objects.all().delete()
+
+        (backfill,), (fan_out,) = subscribed, approved
+        backfill()
+        self.assertEqual(self.timeline(), {article.id})
+        with self.assertNumQueries(1):
+            fan_out()
+        self.assertEqual(TimelineEntry.objects.count(), 1)
+
+    def test_unsubscribe_keeps_articles_from_other_subscriptions(self):
+        """
+        Test that unsubscribing prunes a source but keeps articles still covered by another subscription.
+        """
+        other_journalist = User.objects.create_user(username="other", password="pw", role="journalist")
+        shared = Article.objects.create(
+            title="Shared", body="...", author=self.journalist, publisher=self.publisher, approved=True
+        )
+        publisher_only = Article.objects.create(
+            title="Publisher only", body="...", author=other_journalist, publisher=self.publisher, approved=True
+        )
+        publisher_sub = Subscription.objects.create(reader=self.reader, publisher=self.publisher)
+        Subscription.objects.create(reader=self.reader, journalist=self.journalist)
+        self.assertEqual(self.timeline(), {shared.id, publisher_only.id})
+
+        publisher_sub.delete()
+        self.assertEqual(self.timeline(), {shared.id})
+
+
+class SubscriptionViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Test suite asserting that the subscription views run a fixed number of queries.
+    """
+    def setUp(self):
+        """
+        Set up a reader with one publisher and one journalist subscription.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.created = 0
+        self.add_subscriptions()
+        self.client.force_login(self.reader)
+
+    def add_subscriptions(self, count=1):
+        """
+        Subscribe the reader to new publishers and journalists.
+        """
+        for _ in range(count):
+            self.created += 1
+            journalist = User.objects.create_user(
+                username=f"journalist{self.created}", password="pw", role="journalist"
+            )
+            publisher = Publisher.objects.create(name=f"Publisher {self.created}")
+            Subscription.objects.create(reader=self.reader, journalist=journalist)
+            Subscription.objects.create(reader=self.reader, publisher=publisher)
+
+    def test_subscription_list_budget(self):
+        """
+        Test the query budget of the subscription list.
+        """
+        self.assertQueryBudget("/subscriptions/", 3, lambda: self.add_subscriptions(5))
+
+
+class FeedCacheTest(TestCase):
+    """
+    Test suite for the per-reader feed cache and its invalidation.
+    """
+    def setUp(self):
+        """
+        Set up a reader subscribed to a publisher with one approved article.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.journalist = User.objects.create_user(username="journalist", password="pw", role="journalist")
+        self.editor = User.objects.create_user(username="editor", password="pw", role="editor")
+        self.publisher = Publisher.objects.create(name="Test Publisher")
+        self.subscription = Subscription.objects.create(reader=self.reader, publisher=self.publisher)
+        Article.objects.create(
+            title="First", body="...", author=self.journalist, publisher=self.publisher, approved=True
+        )
+        self.client.force_login(self.reader)
+
+    def feed_titles(self):
+        """
+        Return the titles in the reader's API feed.
+        """
+        response = self.client.get("/api/articles/")
+        return [item["title"] for item in json.loads(b"".join(response.streaming_content))]
+
+    def test_repeated_reads_hit_the_cache(self):
+        """
+        Test that the second identical read is served from the cache.
+        """
+        self.assertEqual(self.feed_titles(), ["First"])
+        before = feed_cache.stats()
+        self.assertEqual(self.feed_titles(), ["First"])
+        after = feed_cache.stats()
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertEqual(after["misses"], before["misses"])
+
+    def test_approval_invalidates_subscriber_feed(self):
+        """
+        Test that approving an article from a subscribed publisher invalidates the cached feed.
+        """
+        self.feed_titles()
+        article = Article.objects.create(
+            title="Second", body="...", author=self.journalist, publisher=self.publisher
+        )
+        article.approve(self.editor)
+        self.assertEqual(sorted(self.feed_titles()), ["First", "Second"])
+
+    def test_edit_and_unsubscribe_invalidate_feed(self):
+        """
+        Test that edits and unsubscribing invalidate the cached feed.
+        """
+        self.feed_titles()
+        article = Article.objects.get()
+        article.title = "Edited"
+        article.save()
+        self.assertEqual(self.feed_titles(), ["Edited"])
+
+        self.subscription.delete()
+        self.assertEqual(self.feed_titles(), [])
+
+    def test_unrelated_publication_keeps_cache(self):
+        """
+        Test that content from sources the reader does not follow leaves their feed cached.
+        """
+        self.feed_titles()
+        Article.objects.create(
+            title="Elsewhere", body="...", author=self.editor, approved=True,
+            publisher=Publisher.objects.create(name="Other"),
+        )
+        before = feed_cache.stats()
+        self.feed_titles()
+        self.assertEqual(feed_cache.stats()["hits"], before["hits"] + 1)
+
+
+class DigestPreferenceTest(TestCase):
+    """
+    Test suite for choosing between immediate emails and digests.
+    """
+    def setUp(self):
+        """
+        Log in a reader.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.client.login(username="reader", password="pw")
+
+    def test_preference_is_saved(self):
+        """
+        Test that a valid frequency is stored and an unknown one is ignored.
+        """
+        response = self.client.post("/subscriptions/emails/", {"digest_frequency": "daily"})
+        self.assertRedirects(response, "/subscriptions/", fetch_redirect_response=False)
+        self.reader.refresh_from_db()
+        self.assertEqual(self.reader.digest_frequency, "daily")
+
+        self.client.post("/subscriptions/emails/", {"digest_frequency": "weekly"})
+        self.reader.refresh_from_db()
+        self.assertEqual(self.reader.digest_frequency, "daily")
+
+
+class SubscriptionWebhookTest(TestCase):
+    """
+    Test suite for registering webhooks on subscriptions.
+    """
+    def setUp(self):
+        """
+        Log in a reader subscribed to a publisher.
+        """
+        self.reader = User.objects.create_user(username="reader", password="pw", role="reader")
+        self.subscription = Subscription.objects.create(
+            reader=self.reader, publisher=Publisher.objects.create(name="Test Publisher")
+        )
+        self.client.login(username="reader", password="pw")
+
+    def test_webhook_is_registered_with_a_secret(self):
+        """
+        Test that a valid URL is stored with a new secret, an invalid one is refused, and an empty one removes it.
+        """
+        url = f"/subscriptions/{self.subscription.pk}/webhook/"
+        with mock.patch("socket.getaddrinfo", return_value=PUBLIC_ADDRESS):
+            self.client.post(url, {"webhook_url": "https://example.com/hooks"})
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.webhook_url, "https://example.com/hooks")
+        self.assertEqual(len(self.subscription.webhook_secret), 64)
+
+        # Saving the same URL again keeps the secret receivers verify with
+        secret = self.subscription.webhook_secret
+        with mock.patch("socket.getaddrinfo", return_value=PUBLIC_ADDRESS):
+            self.client.post(url, {"webhook_url": "https://example.com/hooks"})
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.webhook_secret, secret)
+
+        self.client.post(url, {"webhook_url": "ftp://example.com/hooks"})
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.webhook_url, "https://example.com/hooks")
+
+        self.client.post(url, {"webhook_url": ""})
+        self.subscription.refresh_from_db()
+        self.assertEqual((self.subscription.webhook_url, self.subscription.webhook_secret), ("", ""))
 
-# Create your tests here.
+    def test_private_hosts_are_refused(self):
+        """
+        Test that webhooks on loopback, private or link-local addresses are not registered.
+        """
+        url = f"/subscriptions/{self.subscription.pk}/webhook/"
+        for webhook in ("http://127.0.0.1:8000/hooks", "http://10.1.2.3/", "http://169.254.169.254/latest/"):
+            self.client.post(url, {"webhook_url": webhook})
+        with mock.patch("socket.getaddrinfo", return_value=[(2, 1, 6, "", ("192.168.1.5", 443))]):
+            self.client.post(url, {"webhook_url": "https://intranet.example.com/hooks"})
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.webhook_url, "")
@@ -0,0 +1,144 @@
+"""
+Fan-out-on-write maintenance of reader timelines.
+Keeps TimelineEntry rows in step with article publication and subscription changes.
+
+An approval and a subscription committed at the same time cannot see each other from
+inside their transactions, so both would miss the entry. The signal handlers therefore
+run the fan-out and the backfill again once their transaction committed: whichever
+commits last then reads the other. Only missing rows are inserted, so the runs overlap safely.
+"""
+from collections import defaultdict
+
+from django.db.models import Q
+
+from articles.models import Article
+from .models import Subscription, TimelineEntry
+
+# Number of rows written per INSERT when filling timelines.
+BATCH_SIZE = 1000
+
+
+def _bulk_insert(entries):
+    """
+    Insert timeline entries in batches, skipping rows that already exist.
+    """
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out_article(article):
+    """
+    Add a newly published article to the timeline of every subscribed reader who lacks it.
+
+    Subscribers of the author are included whether or not the article has a publisher,
+    so independent articles reach them too.
+    """
+    sources = Q(journalist_id=article.author_id)
+    if article.publisher_id:
+        sources |= Q(publisher_id=article.publisher_id)
+
+    reader_ids = (
+        Subscription.objects.filter(sources)
+        .exclude(reader__timeline_entries__article_id=article.pk)
+        .values_list("reader_id", flat=True)
+        .distinct()
+    )
+    _bulk_insert(
+        TimelineEntry(
+            reader_id=reader_id,
+            article_id=article.pk,
+            published_at=article.published_at,
+        )
+        for reader_id in reader_ids.iterator(chunk_size=BATCH_SIZE)
+    )
+
+
+def fan_out_articles(articles):
+    """
+    Add many newly published articles to their subscribers' timelines.
+
+    The subscriptions to every author and publisher involved are read in one query.
+    """
+    author_ids = {article.author_id for article in articles}
+    publisher_ids = {article.publisher_id for article in articles if article.publisher_id}
+    readers = defaultdict(set)
+    for reader_id, publisher_id, journalist_id in (
+        Subscription.objects.filter(Q(journalist_id__in=author_ids) | Q(publisher_id__in=publisher_ids))
+        .values_list("reader_id", "publisher_id", "journalist_id")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        if publisher_id:
+            readers["publisher", publisher_id].add(reader_id)
+        else:
+            readers["journalist", journalist_id].add(reader_id)
+
+    _bulk_insert(
+        TimelineEntry(
+            reader_id=reader_id,
+            article_id=article.pk,
+            published_at=article.published_at,
+        )
+        for article in articles
+        for reader_id in readers["journalist", article.author_id] | readers["publisher", article.publisher_id]
+    )
+
+
+def backfill_subscription(subscription):
+    """
+    Add the approved articles of a newly subscribed source missing from the reader's timeline.
+    """
+    articles = Article.objects.filter(approved=True).exclude(
+        timeline_entries__reader_id=subscription.reader_id
+    )
+    if subscription.publisher_id:
+        articles = articles.filter(publisher_id=subscription.publisher_id)
+    else:
+        articles = articles.filter(author_id=subscription.journalist_id)
+
+    _bulk_insert(
+        TimelineEntry(
+            reader_id=subscription.reader_id,
+            article_id=article_id,
+            published_at=published_at,
+        )
+        for article_id, published_at in articles.values_list(
+            "id", "published_at"
+        ).iterator(chunk_size=BATCH_SIZE)
+    )
+
+
+def prune_subscription(subscription):
+    """
+    Remove a cancelled source from the reader's timeline.
+
+    Articles still reachable through another of the reader's subscriptions are kept.
+    """
+    remaining = Subscription.objects.filter(reader_id=subscription.reader_id).exclude(
+        pk=subscription.pk
+    )
+    entries = TimelineEntry.objects.filter(reader_id=subscription.reader_id)
+
+    if subscription.publisher_id:
+        entries = entries.filter(
+            article__publisher_id=subscription.publisher_id
+        ).exclude(
+            article__author_id__in=remaining.filter(
+                journalist__isnull=False
+            ).values("journalist_id")
+        )
+    else:
+        entries = entries.filter(
+            article__author_id=subscription.journalist_id
+        ).exclude(
+            article__publisher_id__in=remaining.filter(
+                publisher__isnull=False
+            ).values("publisher_id")
+        )
+
+    entries.delete()
@@ -9,4 +9,6 @@ urlpatterns = [
     path("subscriptions/", views.subscription_list, name="subscription-list"),
     path("subscribe/", views.subscribe, name="subscribe"),
     path("unsubscribe/<int:subscription_id>/", views.unsubscribe, name="unsubscribe"),
+    path("subscriptions/emails/", views.digest_preference, name="digest-preference"),
+    path("subscriptions/<int:subscription_id>/webhook/", views.subscription_webhook, name="subscription-webhook"),
 ]
@@ -6,6 +6,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
 from django.db.models import Q
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from notifications import webhooks
 from .models import Subscription
 from publishers.models import Publisher
 from django.contrib.auth import get_user_model
@@ -15,11 +18,27 @@ User = get_user_model()
 @login_required
 def subscription_list(request):
     """List all subscriptions for the current user."""
-    subscriptions = Subscription.objects.filter(reader=request.user)
+    subscriptions = Subscription.objects.filter(reader=request.user).select_related(
+        "publisher", "journalist"
+    )
     return render(request, "subscriptions/subscription_list.html", {
-        "subscriptions": subscriptions
+        "subscriptions": subscriptions,
+        "digest_choices": User.DIGEST_CHOICES,
     })
 
+@login_required
+def digest_preference(request):
+    """Choose between immediate emails and hourly or daily digests."""
+    if request.method == "POST":
+        frequency = request.POST.get("digest_frequency")
+        if frequency in dict(User.DIGEST_CHOICES):
+            request.user.digest_frequency = frequency
+            request.user.save(update_fields=["digest_frequency"])
+            messages.success(request, "Email preference updated.")
+        else:
+            messages.error(request, "Unknown email preference.")
+    return redirect("subscription-list")
+
 @login_required
 def subscribe(request):
     """Subscribe to a publisher or journalist."""
@@ -50,7 +69,11 @@ def subscribe(request):
 @login_required
 def unsubscribe(request, subscription_id):
     """Unsubscribe from a subscription."""
-    subscription = get_object_or_404(Subscription, id=subscription_id, reader=request.user)
+    subscription = get_object_or_404(
+        Subscription.objects.select_related("publisher", "journalist"),
+        id=subscription_id,
+        reader=request.user,
+    )
     
     if request.method == "POST":
         target = subscription.publisher or subscription.journalist
@@ -61,3 +84,27 @@ def unsubscribe(request, subscription_id):
     return render(request, "subscriptions/unsubscribe.html", {
         "subscription": subscription
     })
+
+
+@login_required
+def subscription_webhook(request, subscription_id):
+    """Register, replace or remove the webhook of a subscription."""
+    subscription = get_object_or_404(Subscription, id=subscription_id, reader=request.user)
+    if request.method == "POST":
+        url = request.POST.get("webhook_url", "").strip()
+        try:
+            if url:
+                URLValidator(schemes=["http", "https"])(url)
+                webhooks.check_webhook_url(url)
+        except ValidationError:
+            messages.error(request, "Enter a valid http or https webhook URL.")
+        except webhooks.UnsafeWebhookHost as exc:
+            messages.error(request, f"Webhooks must point at a public server: {exc}.")
+        else:
+            secret = subscription.set_webhook(url)
+            if url:
+                # Shown once: receivers need it to verify the X-Webhook-Signature header
+                messages.success(request, f"Webhook saved. Signing secret: {secret}")
+            else:
+                messages.success(request, "Webhook removed.")
+    return redirect("subscription-list")
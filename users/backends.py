@@ -0,0 +1,58 @@
+"""
+Authentication backends for the users application.
+Grants permissions by the role a user is currently acting as, not every role they hold.
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.db.models import Q
+
+from .membership import get_membership
+from .signals import ROLE_GROUPS
+
+
+class ActiveRoleBackend(ModelBackend):
+    """
+    ModelBackend whose group permissions come from the group of the active role.
+
+    The active role lives in the session (see ActiveRoleMiddleware), so a user registered
+    as reader and editor only has editor permissions while logged in as an editor. Groups
+    other than the role groups keep working as usual. Permissions are read from the
+    cached membership snapshot (see users.membership), so checks do not query.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        """
+        Return the permissions of the user's membership snapshot.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = set(get_membership(user_obj).permissions)
+        return user_obj._perm_cache
+
+    def load_permissions(self, user_obj):
+        """
+        Return the user's permissions read from the database in one query, bypassing the snapshot.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous:
+            return set()
+        permissions = Permission.objects.all()
+        if not user_obj.is_superuser:
+            permissions = permissions.filter(Q(user=user_obj) | self._group_permissions_q(user_obj))
+        return {
+            f"{app_label}.{codename}"
+            for app_label, codename in permissions.values_list("content_type__app_label", "codename")
+        }
+
+    def _group_permissions_q(self, user_obj):
+        """
+        Return the filter matching the permissions of the active role's group and of the user's other groups.
+        """
+        other_groups = Q(group__user=user_obj) & ~Q(group__name__in=ROLE_GROUPS.values())
+        return Q(group__name=ROLE_GROUPS.get(user_obj.role)) | other_groups
+
+    def _get_group_permissions(self, user_obj):
+        """
+        Return the permissions of the active role's group and of the user's other groups.
+        """
+        return Permission.objects.filter(self._group_permissions_q(user_obj))
@@ -0,0 +1,11 @@
+"""
+Template context processors for the users application.
+Makes the active role available to every template.
+"""
+
+
+def active_role(request):
+    """
+    Expose the role the user logged in with as ``active_role``.
+    """
+    return {"active_role": getattr(request, "role", None)}
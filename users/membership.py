@@ -0,0 +1,127 @@
+"""
+Cached per-user snapshot of publisher membership and permissions.
+Lets authorization checks test set membership instead of querying the Publisher M2M tables
+and the permission tables on every request.
+"""
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db.models import Value
+
+# Lifetime of a snapshot, in seconds; changes invalidate it explicitly (see users.signals)
+TIMEOUT = 3600
+
+# Version shared by every snapshot, bumped when a group's permissions change
+VERSION_KEY = "membership:v"
+
+
+@dataclass(frozen=True)
+class Membership:
+    """
+    What a user may do while acting as one role.
+
+    ``editor_of`` and ``journalist_of`` hold publisher ids; ``permissions`` holds
+    "app_label.codename" strings, as returned by ``User.get_all_permissions``.
+    """
+    editor_of: frozenset
+    journalist_of: frozenset
+    permissions: frozenset
+
+    def is_editor_of(self, publisher_id):
+        """
+        Return whether the user is an editor of the publisher.
+        """
+        return publisher_id in self.editor_of
+
+    def is_journalist_of(self, publisher_id):
+        """
+        Return whether the user is a journalist of the publisher.
+        """
+        return publisher_id in self.journalist_of
+
+
+def _version():
+    """
+    Return the current snapshot version, creating it if missing.
+
+    Like the feed cache versions, a recreated version starts from the current time,
+    so an evicted version never matches snapshots stored before.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _key(user_id, role, version):
+    """
+    Return the cache key of a user's snapshot for one role.
+    """
+    return f"membership:{version}:{user_id}:{role}"
+
+
+def _load(user):
+    """
+    Build a user's snapshot from the database, in two queries.
+    """
+    from publishers.models import Publisher
+    from .backends import ActiveRoleBackend
+
+    editor_of, journalist_of = set(), set()
+    memberships = {"editor": editor_of, "journalist": journalist_of}
+    rows = Publisher.editors.through.objects.filter(user_id=user.pk).values_list(
+        "publisher_id", Value("editor")
+    ).union(
+        Publisher.journalists.through.objects.filter(user_id=user.pk).values_list(
+            "publisher_id", Value("journalist")
+        ),
+        all=True,
+    )
+    for publisher_id, kind in rows:
+        memberships[kind].add(publisher_id)
+    return Membership(
+        editor_of=frozenset(editor_of),
+        journalist_of=frozenset(journalist_of),
+        permissions=frozenset(ActiveRoleBackend().load_permissions(user)),
+    )
+
+
+def get_membership(user):
+    """
+    Return the snapshot of a logged-in user for their active role.
+
+    Kept on the user object for the rest of the request and in the cache across requests.
+    """
+    try:
+        return user._membership
+    except AttributeError:
+        pass
+    key = _key(user.pk, user.role, _version())
+    membership = cache.get(key)
+    if membership is None:
+        membership = _load(user)
+        cache.set(key, membership, TIMEOUT)
+    user._membership = membership
+    return membership
+
+
+def invalidate(user_ids):
+    """
+    Drop the snapshots of the given users, for every role.
+    """
+    from .signals import ROLE_GROUPS
+
+    version = _version()
+    cache.delete_many([_key(user_id, role, version) for user_id in user_ids for role in ROLE_GROUPS])
+
+
+def invalidate_all():
+    """
+    Drop every snapshot, e.g. after a group's permissions changed.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
@@ -0,0 +1,55 @@
+"""
+Middleware for the users application.
+Resolves the role a user logged in with from the session instead of storing it on the user row.
+"""
+from django.contrib.auth.middleware import get_user as get_session_user
+from django.utils.functional import SimpleLazyObject
+
+# Session key holding the role picked at login
+ROLE_SESSION_KEY = "_active_role"
+
+
+def set_active_role(request, role):
+    """
+    Make ``role`` the active role of the logged-in user for the rest of their session.
+    """
+    request.session[ROLE_SESSION_KEY] = role
+    request.user.role = role
+
+
+def get_user(request):
+    """
+    Return the session's user with ``role`` set to the role they logged in with.
+
+    A role the user is not (or no longer) registered for falls back to the stored one.
+    """
+    user = get_session_user(request)
+    role = request.session.get(ROLE_SESSION_KEY)
+    if user.is_authenticated and role in user.registered_roles:
+        user.role = role
+    return user
+
+
+class ActiveRoleMiddleware:
+    """
+    Sets ``request.role`` to the active role (None when anonymous) and applies it to ``request.user``.
+
+    Both are lazy, like ``request.user`` itself, so requests that never look at the
+    user do not load it. Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        """
+        Store the next handler in the chain.
+        """
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """
+        Attach the lazy user and role, then handle the request.
+        """
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.role = SimpleLazyObject(
+            lambda: request.user.role if request.user.is_authenticated else None
+        )
+        return self.get_response(request)
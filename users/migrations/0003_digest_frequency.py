@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_is_editor_user_is_journalist_user_is_reader'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='digest_frequency',
+            field=models.CharField(choices=[('immediate', 'Immediately'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', max_length=10),
+        ),
+    ]
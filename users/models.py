@@ -23,10 +23,36 @@ class User(AbstractUser):
         default="reader",
     )
 
+    DIGEST_CHOICES = (
+        ("immediate", "Immediately"),
+        ("hourly", "Hourly digest"),
+        ("daily", "Daily digest"),
+    )
+
+    # How the reader is emailed about new content from their subscriptions
+    digest_frequency = models.CharField(
+        max_length=10,
+        choices=DIGEST_CHOICES,
+        default="immediate",
+    )
+
     is_reader = models.BooleanField(default=False)
     is_journalist = models.BooleanField(default=False)
     is_editor = models.BooleanField(default=False)
 
+    # Role the instance was loaded with, so saves can tell whether group membership must change
+    _loaded_role = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Build the instance and remember the role it was loaded with.
+        """
+        instance = super().from_db(db, field_names, values)
+        if "role" in field_names:
+            instance._loaded_role = values[field_names.index("role")]
+        return instance
+
     @property
     def registered_roles(self):
         """
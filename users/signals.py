@@ -4,56 +4,130 @@ Automatically assigns users to the correct Django Permission Groups based on the
 """
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_save
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, post_migrate, post_save
 from django.dispatch import receiver
 from articles.models import Article
+from publishers.models import Publisher
+from . import membership
 from .models import User
+from .throttle import forget_unknown
 
+# Group each role is a member of
+ROLE_GROUPS = {
+    "reader": "Readers",
+    "journalist": "Journalists",
+    "editor": "Editors",
+}
 
-def setup_groups():
+# Article permissions granted to each group
+GROUP_PERMISSIONS = {
+    "Readers": ["view_article"],
+    "Journalists": ["view_article", "add_article", "change_article", "delete_article"],
+    "Editors": ["view_article", "change_article", "delete_article"],
+}
+
+# Group name -> id, loaded once per process (see group_ids)
+_group_ids = None
+
+
+def setup_groups(using=DEFAULT_DB_ALIAS):
     """
     Set up user groups (Readers, Journalists, Editors) with appropriate permissions.
     Creates groups if they don't exist and assigns article-related permissions.
+    Runs after every ``migrate``; returns the id of each group by name.
     """
-    article_ct = ContentType.objects.get_for_model(Article)
+    global _group_ids
+    article_ct = ContentType.objects.db_manager(using).get_for_model(Article)
+    permissions = {
+        permission.codename: permission
+        for permission in Permission.objects.using(using).filter(
+            content_type=article_ct,
+            codename__in={codename for codenames in GROUP_PERMISSIONS.values() for codename in codenames},
+        )
+    }
 
-    reader_group, _ = Group.objects.get_or_create(name="Readers")
-    journalist_group, _ = Group.objects.get_or_create(name="Journalists")
-    editor_group, _ = Group.objects.get_or_create(name="Editors")
+    ids = {}
+    for name, codenames in GROUP_PERMISSIONS.items():
+        group, _ = Group.objects.using(using).get_or_create(name=name)
+        group.permissions.set([permissions[codename] for codename in codenames])
+        ids[name] = group.pk
+    _group_ids = ids
+    return ids
 
-    view_perm = Permission.objects.get(codename="view_article", content_type=article_ct)
-    add_perm = Permission.objects.get(codename="add_article", content_type=article_ct)
-    change_perm = Permission.objects.get(codename="change_article", content_type=article_ct)
-    delete_perm = Permission.objects.get(codename="delete_article", content_type=article_ct)
 
-    reader_group.permissions.set([view_perm])
+def group_ids():
+    """
+    Return the id of each role group by name, read from the database once per process.
+    """
+    global _group_ids
+    if _group_ids is None:
+        ids = dict(Group.objects.filter(name__in=GROUP_PERMISSIONS).values_list("name", "id"))
+        _group_ids = ids if len(ids) == len(GROUP_PERMISSIONS) else setup_groups()
+    return _group_ids
 
-    journalist_group.permissions.set([
-        view_perm, add_perm, change_perm, delete_perm
-    ])
 
-    editor_group.permissions.set([
-        view_perm, change_perm, delete_perm
-    ])
+@receiver(post_migrate)
+def create_groups(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Create the role groups once the article permissions exist, i.e. after the articles app migrated.
+
+    Also runs when tests flush the database, which recreates the groups with new ids.
+    """
+    if sender.label == "articles":
+        setup_groups(using)
 
 
 @receiver(post_save, sender=User)
-def assign_user_group(sender, instance, created, **kwargs):
+def assign_user_group(sender, instance, created, update_fields=None, **kwargs):
     """
     Signal handler to automatically assign a user to the appropriate group based on their role.
-    Triggered after a User instance is saved.
+    Triggered after a User instance is saved; membership is only rewritten when the role changed.
     """
-    setup_groups()
+    if created:
+        forget_unknown(instance.username)
+    if update_fields is not None and "role" not in update_fields:
+        return
+    group_name = ROLE_GROUPS.get(instance.role)
+    if not group_name or (not created and instance.role == instance._loaded_role):
+        return
 
-    role_group_map = {
-        "reader": "Readers",
-        "journalist": "Journalists",
-        "editor": "Editors",
-    }
+    instance.groups.set([group_ids()[group_name]])
+    instance._loaded_role = instance.role
 
-    group_name = role_group_map.get(instance.role)
 
-    if group_name:
-        group = Group.objects.get(name=group_name)
-        instance.groups.clear()
-        instance.groups.add(group)
+@receiver(post_save, sender=User)
+def invalidate_user_membership(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drop the membership snapshot of a user whose superuser or active flag may have changed.
+    """
+    if not created and (update_fields is None or {"is_active", "is_superuser"} & set(update_fields)):
+        membership.invalidate([instance.pk])
+
+
+@receiver(m2m_changed, sender=Publisher.editors.through)
+@receiver(m2m_changed, sender=Publisher.journalists.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_membership(sender, instance, action, pk_set, **kwargs):
+    """
+    Drop the membership snapshots of the users added to or removed from a publisher, group or permission.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, User):
+        membership.invalidate([instance.pk])
+    elif pk_set is not None:
+        membership.invalidate(pk_set)
+    else:
+        # Cleared from the publisher's or group's side: who was a member is gone
+        membership.invalidate_all()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    """
+    Drop every membership snapshot once a group's permissions changed.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        membership.invalidate_all()
@@ -1,4 +1,19 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from news_project.sessions import SessionStore
+from users.membership import get_membership
+from users.middleware import ROLE_SESSION_KEY
+from users.throttle import SlidingWindowLimiter, throttle
 from django.contrib.auth import get_user_model
 from articles.models import Article, Newsletter
 from publishers.models import Publisher
@@ -63,3 +78,354 @@ class UserRoleTests(TestCase):
         # Based on current logic, editor is not "reader" or "journalist"
         self.assertIsNone(self.editor.reader_subscriptions)
         self.assertIsNone(self.editor.journalist_articles)
+
+
+class RoleGroupTests(TestCase):
+    """
+    Test suite for the role groups and their membership.
+    """
+    def test_groups_exist_after_migrate(self):
+        """
+        Test that the role groups and their permissions are created by migrate.
+        """
+        editors = Group.objects.get(name="Editors")
+        self.assertEqual(
+            set(editors.permissions.values_list("codename", flat=True)),
+            {"view_article", "change_article", "delete_article"},
+        )
+
+    def test_membership_follows_role_changes_only(self):
+        """
+        Test that saving an unchanged role touches no group tables, while a new role moves the user.
+        """
+        user = User.objects.create_user(username="multi", role="reader", password="password")
+        self.assertEqual(list(user.groups.values_list("name", flat=True)), ["Readers"])
+
+        user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(1):
+            user.save(update_fields=["role"])
+        with self.assertNumQueries(1):
+            user.save()
+
+        user.role = "editor"
+        user.save(update_fields=["role"])
+        self.assertEqual(list(user.groups.values_list("name", flat=True)), ["Editors"])
+        self.assertTrue(User.objects.get(pk=user.pk).has_perm("articles.change_article"))
+
+
+class ActiveRoleTests(TestCase):
+    """
+    Test suite for the session-scoped role picked at login.
+    """
+    def setUp(self):
+        """
+        Create a user registered as reader and editor, stored with the reader role.
+        """
+        self.user = User.objects.create_user(
+            username="multi", password="password", role="reader", is_reader=True, is_editor=True,
+            last_login=timezone.now(),
+        )
+
+    def log_in(self, role):
+        """
+        Log in through the login form with the given role.
+        """
+        return self.client.post("/users/login/", {"username": "multi", "password": "password", "role": role})
+
+    def test_login_reads_the_user_once_and_keeps_the_stored_role(self):
+        """
+        Test that logging in issues a single user SELECT and only writes last_login.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.log_in("editor")
+        user_queries = [q["sql"] for q in queries if '"users_user"' in q["sql"]]
+        self.assertEqual(len(user_queries), 2)
+        self.assertTrue(user_queries[0].startswith("SELECT"))
+        self.assertTrue(user_queries[1].startswith('UPDATE "users_user" SET "last_login"'))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.role, "reader")
+
+    def test_login_invalidates_password_reset_links(self):
+        """
+        Test that a password reset token issued before a login no longer works after it.
+        """
+        # Tokens cover last_login to the second, so make it differ from the login about to happen
+        self.user.last_login = timezone.now() - timedelta(minutes=1)
+        self.user.save(update_fields=["last_login"])
+        token = default_token_generator.make_token(self.user)
+        self.log_in("reader")
+        self.user.refresh_from_db()
+        self.assertFalse(default_token_generator.check_token(self.user, token))
+
+    def test_permissions_follow_the_active_role(self):
+        """
+        Test that the role picked at login decides views, templates and permissions.
+        """
+        self.log_in("editor")
+        response = self.client.get("/editor/articles/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.role, "editor")
+        self.assertTrue(response.wsgi_request.user.has_perm("articles.change_article"))
+
+        self.client.logout()
+        self.log_in("reader")
+        response = self.client.get("/articles/")
+        self.assertEqual(response.context["active_role"], "reader")
+        self.assertFalse(response.wsgi_request.user.has_perm("articles.change_article"))
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    """
+    Test suite for the cache-backed sliding window limiter.
+    """
+    def test_previous_window_is_weighted_by_overlap(self):
+        """
+        Test that hits of the previous window count in proportion to their overlap.
+        """
+        now = [1000.0]
+        limiter = SlidingWindowLimiter("test", limit=4, window=10, clock=lambda: now[0])
+        self.assertTrue(all(limiter.hit("k") for _ in range(4)))
+        self.assertFalse(limiter.hit("k"))
+        self.assertEqual(limiter.retry_after("k"), 10)
+
+        # Half way through the next window, the 4 earlier hits weigh 2
+        now[0] = 1015.0
+        self.assertEqual(limiter.count("k"), 2)
+        self.assertTrue(limiter.hit("k"))
+        self.assertTrue(limiter.hit("k"))
+        self.assertFalse(limiter.hit("k"))
+        self.assertTrue(limiter.allowed("other"))
+
+
+    def test_concurrent_hits_cannot_both_pass_the_last_slot(self):
+        """
+        Test that a hit racing another worker's is decided by its own increment, not an earlier read.
+        """
+        limiter = SlidingWindowLimiter("test", limit=1, window=10, clock=lambda: 1000.0)
+        add = cache.add
+        raced = []
+
+        def racing_add(*args, **kwargs):
+            # Another worker records its hit just before this one
+            if not raced:
+                raced.append(None)
+                raced[0] = limiter.hit("k")
+            return add(*args, **kwargs)
+
+        with mock.patch("users.throttle.cache.add", side_effect=racing_add):
+            self.assertFalse(limiter.hit("k"))
+        self.assertEqual(raced, [True])
+        self.assertEqual(limiter.count("k"), 1)
+
+@override_settings(LOGIN_RATE_PER_IP=(5, 60), LOGIN_FAILURES_PER_USERNAME=(3, 300))
+class CredentialThrottleTests(TestCase):
+    """
+    Test suite for throttling the credential endpoints.
+    """
+    def setUp(self):
+        """
+        Create a user.
+        """
+        self.user = User.objects.create_user(username="victim", password="password", is_reader=True)
+
+    def verify(self, username, password, ip="10.0.0.1"):
+        """
+        Post credentials to the verification endpoint from the given address.
+        """
+        return self.client.post(
+            "/users/verify-credentials/", {"username": username, "password": password},
+            content_type="application/json", REMOTE_ADDR=ip,
+        )
+
+    def test_failed_passwords_lock_the_username_before_hashing(self):
+        """
+        Test that a username is rejected without hashing once it saw too many failures, from any IP.
+        """
+        for i in range(3):
+            self.assertFalse(self.verify("victim", "wrong", ip=f"10.0.0.{i}").json()["success"])
+        with mock.patch.object(User, "check_password") as check_password:
+            response = self.verify("victim", "password", ip="10.0.0.9")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        check_password.assert_not_called()
+
+    def test_password_checks_in_flight_hold_the_username_slots(self):
+        """
+        Test that concurrent checks reserve the username's slots before hashing, and successes give them back.
+        """
+        request = RequestFactory().post("/users/verify-credentials/", REMOTE_ADDR="10.0.0.9")
+        # Two checks still hashing on other workers
+        self.assertEqual(throttle(request, "victim"), 0)
+        self.assertEqual(throttle(request, "victim"), 0)
+        for _ in range(3):
+            self.assertTrue(self.verify("victim", "password").json()["success"])
+        self.assertFalse(self.verify("victim", "wrong").json()["success"])
+        with mock.patch.object(User, "check_password") as check_password:
+            self.assertEqual(self.verify("victim", "password").status_code, 429)
+        check_password.assert_not_called()
+
+    @override_settings(CLIENT_IP_HEADER="HTTP_X_FORWARDED_FOR")
+    def test_client_address_is_read_from_the_trusted_proxy_header(self):
+        """
+        Test that requests are limited on the address the proxy appended, not on what clients claim.
+        """
+        for i in range(5):
+            response = self.client.post(
+                "/users/verify-credentials/", {"username": f"nobody{i}", "password": "x"},
+                content_type="application/json", REMOTE_ADDR="10.0.0.1",
+                HTTP_X_FORWARDED_FOR=f"198.51.100.{i}, 203.0.113.7",
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.verify("victim", "password", ip="10.0.0.1").status_code, 200)
+        response = self.client.post(
+            "/users/verify-credentials/", {"username": "victim", "password": "password"},
+            content_type="application/json", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.7",
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_requests_are_limited_per_ip(self):
+        """
+        Test that an address is rejected after its quota, whatever usernames it tries.
+        """
+        for i in range(5):
+            self.assertEqual(self.verify(f"nobody{i}", "x").status_code, 200)
+        self.assertEqual(self.verify("victim", "password").status_code, 429)
+        self.assertTrue(self.verify("victim", "password", ip="10.0.0.2").json()["success"])
+
+    def test_malformed_bodies_are_rejected(self):
+        """
+        Test that JSON bodies other than an object of strings are answered with 400.
+        """
+        for body in ("[]", '"victim"', "1", '{"username": ["victim"], "password": "password"}'):
+            response = self.client.post(
+                "/users/verify-credentials/", body, content_type="application/json", REMOTE_ADDR="10.0.0.1",
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_unknown_usernames_are_cached(self):
+        """
+        Test that an unknown username is looked up once, and forgotten when the user is created.
+        """
+        with self.assertNumQueries(1):
+            self.client.get("/users/get-user-roles/", {"username": "ghost"})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/users/get-user-roles/", {"username": "ghost"}).json(), {"roles": []})
+
+        User.objects.create_user(username="ghost", password="password", is_journalist=True)
+        response = self.client.get("/users/get-user-roles/", {"username": "ghost"})
+        self.assertEqual(response.json(), {"roles": ["journalist"]})
+
+
+class MembershipTests(TestCase):
+    """
+    Test suite for the cached membership snapshot used by authorization checks.
+    """
+    def setUp(self):
+        """
+        Create an editor of one publisher with a pending article, logged in as editor.
+        """
+        self.editor = User.objects.create_user(username="editor", password="password", role="editor", is_editor=True)
+        self.publisher = Publisher.objects.create(name="Daily")
+        self.other = Publisher.objects.create(name="Weekly")
+        self.publisher.editors.add(self.editor)
+        journalist = User.objects.create_user(username="journalist", password="password", role="journalist")
+        self.article = Article.objects.create(title="Pending", body="...", author=journalist, publisher=self.other)
+        self.client.force_login(self.editor)
+
+    def snapshot(self):
+        """
+        Return the editor's snapshot as a fresh request would see it.
+        """
+        return get_membership(User.objects.get(pk=self.editor.pk))
+
+    def test_snapshot_is_reused_across_requests(self):
+        """
+        Test that a warm snapshot answers membership and permission checks without queries.
+        """
+        self.client.get("/editor/articles/")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/editor/articles/")
+        sql = "\n".join(query["sql"] for query in queries)
+        self.assertNotIn("publishers_publisher_editors", sql)
+        self.assertNotIn("auth_permission", sql)
+
+        membership = self.snapshot()
+        self.assertEqual(membership.editor_of, {self.publisher.pk})
+        self.assertIn("articles.change_article", membership.permissions)
+
+    def test_membership_changes_invalidate_the_snapshot(self):
+        """
+        Test that adding or removing publisher members, from either side, is seen at once.
+        """
+        self.client.post(f"/editor/articles/{self.article.pk}/approve/")
+        self.article.refresh_from_db()
+        self.assertFalse(self.article.approved)
+
+        self.other.editors.add(self.editor)
+        self.client.post(f"/editor/articles/{self.article.pk}/approve/")
+        self.article.refresh_from_db()
+        self.assertTrue(self.article.approved)
+
+        self.editor.editor_publishers.remove(self.other)
+        self.assertEqual(self.snapshot().editor_of, {self.publisher.pk})
+        self.publisher.editors.clear()
+        self.assertEqual(self.snapshot().editor_of, set())
+        self.editor.journalist_publishers.add(self.other)
+        self.assertEqual(self.snapshot().journalist_of, {self.other.pk})
+
+    def test_group_permission_changes_invalidate_the_snapshot(self):
+        """
+        Test that changing a role group's permissions reaches cached snapshots.
+        """
+        self.assertIn("articles.delete_article", self.snapshot().permissions)
+        group = Group.objects.get(name="Editors")
+        group.permissions.remove(*group.permissions.filter(codename="delete_article"))
+        self.assertNotIn("articles.delete_article", self.snapshot().permissions)
+
+
+@override_settings(SESSION_ENGINE="news_project.sessions")
+class SessionStoreTests(TestCase):
+    """
+    Test suite for the cache-first session engine and its write avoidance.
+    """
+    def setUp(self):
+        """
+        Create a reader and log them in through the login form.
+        """
+        User.objects.create_user(username="reader", password="password", role="reader", is_reader=True)
+        self.client.post("/users/login/", {"username": "reader", "password": "password", "role": "reader"})
+        self.session_key = self.client.cookies["sessionid"].value
+
+    def session_queries(self, url):
+        """
+        Request a page and return the SQL of the queries it ran on the session table.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return [query["sql"] for query in queries if '"django_session"' in query["sql"]]
+
+    def test_page_views_do_not_touch_the_session_table(self):
+        """
+        Test that a cached session is neither read from nor written to the database.
+        """
+        self.assertEqual(self.session_queries("/articles/"), [])
+
+        cache.clear()
+        queries = self.session_queries("/articles/")
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith("SELECT"))
+        self.assertEqual(self.session_queries("/articles/"), [])
+
+    def test_unchanged_sessions_are_not_saved(self):
+        """
+        Test that saving a session holding what was loaded writes nothing, and a change is written.
+        """
+        session = SessionStore(self.session_key)
+        session[ROLE_SESSION_KEY] = "reader"
+        with self.assertNumQueries(0):
+            session.save()
+
+        session[ROLE_SESSION_KEY] = "editor"
+        session.save()
+        stored = Session.objects.get(session_key=self.session_key).get_decoded()
+        self.assertEqual(stored[ROLE_SESSION_KEY], "editor")
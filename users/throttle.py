@@ -0,0 +1,205 @@
+"""
+Cache-backed rate limiting and lookups for credential checks.
+Rejects credential-stuffing bursts before any password is hashed and remembers unknown usernames.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# How long an unknown username is remembered, in seconds
+UNKNOWN_USERNAME_TIMEOUT = 300
+
+
+def _digest(value):
+    """
+    Return a cache-key-safe digest of client-supplied text.
+    """
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+class SlidingWindowLimiter:
+    """
+    Allows at most ``limit`` events per key within any ``window`` seconds.
+
+    Uses the sliding window counter approximation: the count of the current fixed window
+    plus the previous window's count weighted by how much of it still overlaps the
+    sliding window. Two cache keys per client. ``hit`` decides from the count its own
+    atomic ``add``/``incr`` returned, so concurrent workers cannot all slip under the
+    limit on the same stale read.
+    """
+
+    def __init__(self, scope, limit, window, clock=time.time):
+        """
+        :param scope: Prefix keeping the counters of different limiters apart.
+        """
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+
+    def _keys(self, key, now):
+        """
+        Return the cache keys of the current and previous windows, and the elapsed share of the current one.
+        """
+        index, offset = divmod(now, self.window)
+        prefix = f"throttle:{self.scope}:{_digest(key)}"
+        return f"{prefix}:{int(index)}", f"{prefix}:{int(index) - 1}", offset / self.window
+
+    def count(self, key):
+        """
+        Return the weighted number of events in the sliding window ending now.
+        """
+        current, previous, elapsed = self._keys(key, self.clock())
+        counts = cache.get_many([current, previous])
+        return counts.get(current, 0) + counts.get(previous, 0) * (1 - elapsed)
+
+    def allowed(self, key):
+        """
+        Return whether another event would stay within the limit, without recording it.
+        """
+        return self.count(key) < self.limit
+
+    def hit(self, key):
+        """
+        Record an event and return whether it was within the limit.
+
+        A rejected event is taken back, so it does not count against later ones.
+        """
+        current, previous, elapsed = self._keys(key, self.clock())
+        # Kept for two windows: it is the previous window's count during the next one
+        if cache.add(current, 1, self.window * 2):
+            in_current = 1
+        else:
+            try:
+                in_current = cache.incr(current)
+            except ValueError:
+                # Expired or evicted between add and incr
+                cache.set(current, 1, self.window * 2)
+                in_current = 1
+        if in_current + cache.get(previous, 0) * (1 - elapsed) <= self.limit:
+            return True
+        self._take_back(current)
+        return False
+
+    def refund(self, key):
+        """
+        Take back an event recorded by ``hit``, once it turned out not to count.
+
+        Taken from the current window: if the window rolled over since the hit and has
+        no events yet, there is nothing to take back and the refund is lost.
+        """
+        current, _previous, _elapsed = self._keys(key, self.clock())
+        self._take_back(current)
+
+    @staticmethod
+    def _take_back(counter):
+        """
+        Decrement a window's counter, unless it expired.
+        """
+        try:
+            cache.decr(counter)
+        except ValueError:
+            pass
+
+    def retry_after(self, key):
+        """
+        Return the whole seconds until the key is allowed again, at most one window.
+        """
+        now = self.clock()
+        current, previous, elapsed = self._keys(key, now)
+        counts = cache.get_many([current, previous])
+        in_current, in_previous = counts.get(current, 0), counts.get(previous, 0)
+        if in_current >= self.limit:
+            # Only the next window brings the count down far enough
+            return math.ceil(self.window * (1 - elapsed)) or 1
+        if not in_previous:
+            return 0
+        # The previous window's weight falls linearly until the total drops below the limit
+        target = 1 - (self.limit - in_current) / in_previous
+        return max(1, math.ceil((target - elapsed) * self.window))
+
+
+def ip_limiter():
+    """
+    Return the limiter of credential requests per client IP (LOGIN_RATE_PER_IP).
+    """
+    return SlidingWindowLimiter("ip", *settings.LOGIN_RATE_PER_IP)
+
+
+def username_limiter():
+    """
+    Return the limiter of failed password checks per username (LOGIN_FAILURES_PER_USERNAME).
+    """
+    return SlidingWindowLimiter("username", *settings.LOGIN_FAILURES_PER_USERNAME)
+
+
+def client_ip(request):
+    """
+    Return the address the request came from.
+
+    Behind a reverse proxy, CLIENT_IP_HEADER names the request header it sets (e.g.
+    ``HTTP_X_FORWARDED_FOR``); its last entry is the one the trusted proxy wrote, earlier
+    ones are client-supplied. Without the setting, or the header, REMOTE_ADDR is used.
+    """
+    header = settings.CLIENT_IP_HEADER and request.META.get(settings.CLIENT_IP_HEADER, "")
+    if header:
+        return header.rsplit(",", 1)[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def throttle(request, username):
+    """
+    Count a credential request and return the seconds to wait if it must be rejected, else 0.
+
+    Checked before anything is hashed: every request counts against the client IP, and
+    reserves one of the username's failed password checks, so concurrent requests cannot
+    all hash past a lock. The reservation is given back by ``refund_attempt`` when the
+    password turns out right or is never checked.
+    """
+    ip = ip_limiter()
+    if not ip.hit(client_ip(request)):
+        return ip.retry_after(client_ip(request))
+    accounts = username_limiter()
+    if username and not accounts.hit(username):
+        return accounts.retry_after(username)
+    return 0
+
+
+def refund_attempt(username):
+    """
+    Give back the failed password check ``throttle`` reserved for the username.
+    """
+    if username:
+        username_limiter().refund(username)
+
+
+def _unknown_key(username):
+    """
+    Return the cache key marking a username as unknown.
+    """
+    return f"auth:unknown:{_digest(username)}"
+
+
+def find_user(queryset, username):
+    """
+    Return the user with this username from ``queryset``, or None, in at most one query.
+
+    Usernames found missing are remembered for UNKNOWN_USERNAME_TIMEOUT seconds, so floods
+    of made-up names do not reach the database; creating the user forgets it (see users.signals).
+    """
+    if not username or cache.get(_unknown_key(username)):
+        return None
+    user = queryset.filter(username=username).first()
+    if user is None:
+        cache.set(_unknown_key(username), True, UNKNOWN_USERNAME_TIMEOUT)
+    return user
+
+
+def forget_unknown(username):
+    """
+    Stop treating a username as unknown.
+    """
+    cache.delete(_unknown_key(username))
@@ -4,11 +4,14 @@ Handles user authentication, registration, role selection, and profile viewing l
 """
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
-from django.contrib.auth import authenticate, login, logout, get_user_model
+from django.contrib.auth import login, logout, get_user_model
+from django.conf import settings
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
 from django.urls import reverse
 from .forms import SimpleUserRegistrationForm
+from .middleware import set_active_role
+from .throttle import find_user, refund_attempt, throttle
 from django.views.decorators.csrf import csrf_exempt
 import json
 
@@ -44,7 +47,8 @@ def register(request):
                     setattr(existing_user, role_field, True)
                     existing_user.role = role
                     existing_user.save()
-                    login(request, existing_user)
+                    login(request, existing_user, backend=settings.AUTHENTICATION_BACKENDS[0])
+                    set_active_role(request, role)
                     messages.success(request, f"Successfully registered as {role.capitalize()} and logged in!")
                     return redirect("article-list")
             else:
@@ -56,6 +60,7 @@ def register(request):
                 user.role = role
                 user.save()
                 login(request, user)
+                set_active_role(request, role)
                 messages.success(request, f"Registered as {role.capitalize()} and logged in!")
                 return redirect("article-list")
 
@@ -67,28 +72,33 @@ def custom_login(request):
     Authenticate a user and validate the selected role before login.
 
     Ensures that the user is registered for the chosen role before granting access.
+    The chosen role is kept in the session (see ActiveRoleMiddleware), so logging in
+    reads the user once and only writes last_login.
     """
+    status = 200
     if request.method == "POST":
         username = request.POST.get("username")
         password = request.POST.get("password")
         role = request.POST.get("role")
 
-        user_record = User.objects.filter(username=username).first()
-        if not user_record:
+        retry_after = throttle(request, username)
+        user = None if retry_after else find_user(User.objects.all(), username)
+        if retry_after:
+            messages.error(request, f"Too many attempts, please try again in {retry_after} seconds.")
+            status = 429
+        elif not user:
+            refund_attempt(username)
             messages.error(request, "username does not exist")
+        elif not (user.is_active and user.check_password(password)):
+            messages.error(request, "username or password incorrect, please try again")
         else:
-            user = authenticate(request, username=username, password=password)
-            if user is None:
-                messages.error(request, "username or password incorrect, please try again")
-            else:
-                if role and role in user.registered_roles:
-                    user.role = role
-                    user.save(update_fields=["role"])
-                    login(request, user)
-                    messages.success(request, f"Logged in as {role.capitalize()}.")
-                    return redirect("article-list")
-                else:
-                    messages.error(request, f"You are not registered as a {role.capitalize()}.")
+            refund_attempt(username)
+            if role and role in user.registered_roles:
+                login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
+                set_active_role(request, role)
+                messages.success(request, f"Logged in as {role.capitalize()}.")
+                return redirect("article-list")
+            messages.error(request, f"You are not registered as a {(role or '').capitalize()}.")
 
     return render(
         request,
@@ -97,17 +107,33 @@ def custom_login(request):
             "form": AuthenticationForm(),
             "roles": [("reader", "Reader"), ("journalist", "Journalist"), ("editor", "Editor")],
         },
+        status=status,
     )
 
 
+def too_many_attempts(retry_after):
+    """Return the JSON response rejecting a throttled credential request."""
+    response = JsonResponse(
+        {"success": False, "error": f"Too many attempts, please try again in {retry_after} seconds."},
+        status=429,
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
 def get_user_roles(request):
     """
     Return the roles associated with a given username.
 
     Used by the frontend to dynamically display available roles.
+    Throttled per client IP; unknown usernames are answered from the cache.
     """
     username = request.GET.get("username")
-    user = User.objects.filter(username=username).first()
+    retry_after = throttle(request, None)
+    if retry_after:
+        return too_many_attempts(retry_after)
+
+    user = find_user(User.objects.only("is_reader", "is_journalist", "is_editor"), username)
     if user:
         return JsonResponse({"roles": user.registered_roles})
     return JsonResponse({"roles": []})
@@ -119,17 +145,32 @@ def verify_credentials(request):
     Verify user credentials and return available roles.
 
     Used by AJAX requests to validate login details before role selection.
+    Throttled requests are rejected before the password is hashed, and the user
+    is read with a single query.
     """
     if request.method == "POST":
-        data = json.loads(request.body)
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"success": False, "error": "Invalid request"}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"success": False, "error": "Invalid request"}, status=400)
         username = data.get("username")
         password = data.get("password")
+        if any(value is not None and not isinstance(value, str) for value in (username, password)):
+            return JsonResponse({"success": False, "error": "Invalid request"}, status=400)
+
+        retry_after = throttle(request, username)
+        if retry_after:
+            return too_many_attempts(retry_after)
 
-        if not User.objects.filter(username=username).exists():
+        user = find_user(User.objects.all(), username)
+        if user is None:
+            refund_attempt(username)
             return JsonResponse({"success": False, "error": "username does not exist"})
 
-        user = authenticate(username=username, password=password)
-        if user:
+        if user.is_active and user.check_password(password):
+            refund_attempt(username)
             return JsonResponse(
                 {
                     "success": True,